@@ -0,0 +1,241 @@
+"""
+Look-ahead search AI for the computer player of War of Colors.
+
+`SearchAI` evaluates every card the computer can play, and every card a
+Wild card can choose, by simulating the rest of the round and a few more
+rounds from a copy of the game. The copy is made with
+`GameEngine.copy_state`, which shares the immutable Card objects, and the
+simulated futures are played by `GameEngine.resolve_round` and
+`GameEngine.play_round`, so the search follows the real rules.
+
+The computer does not know the player's hand, the order of the draw
+stack or, like the random computer, the card the player just played, so
+before each simulated future these unknown cards are dealt again at
+random (determinization). Only the cards a future of `horizon` rounds can
+reach are dealt: the player's card and hand and the top of the draw
+stack are swapped with random unknown cards, so the cost does not grow
+with the size of the deck. The plays are sampled with the UCB1 rule of
+Monte Carlo tree search until the time budget of the move is spent, and
+the most sampled play is chosen.
+
+Usage:
+    game.computer_strategy = ai.SearchAI(time_budget=0.05)
+    python tournament.py --games 200 --search-budget 0.02
+    python game.py --search-budget 0.05
+
+Libraries used:
+-math
+-random
+-time
+-engine
+
+Data structures used:
+-List
+-Tuple
+-Dictionary
+"""
+
+import math
+import random
+import time
+
+import engine
+
+# Safety limit on the rounds of a future simulated until the end of the game
+MAX_ROUNDS = 1000
+
+# Most cards a round can take from the top of the draw stack: a draw after
+# each triggered Watcher card, two for a Swap card and the two regular draws
+DRAWS_PER_ROUND = 6
+
+#ID: 5672969
+class SearchAI:
+    """A computer strategy that chooses its cards by simulating future rounds.
+
+    Attributes:
+        time_budget (float): Seconds of search per move.
+        horizon (int | None): Rounds simulated after the current one, until the end of the game if None.
+        exploration (float): The exploration constant of the UCB1 rule.
+        max_playouts (int | None): Stops the search after that many simulated futures if set.
+        determinize (bool): Whether to deal the cards unknown to the computer again before
+            each simulated future, if False the search sees the player's card and hand
+            and the draw stack.
+        rng (random.Random): The generator of the simulated futures, the game's own
+            generator is never used so the real game does not depend on the search.
+        scratch (engine.GameEngine | None): The engine the futures are simulated in.
+        playouts (int): The number of futures simulated for the last move.
+        values (dict[tuple[int, int], float]): The mean value of each play of the last move.
+        clock (Callable[[], float]): Returns the current time in seconds, read before each simulated future.
+    """
+
+    def __init__(self, time_budget: float = 0.05, horizon: int | None = 4, exploration: float = 1.0,
+                 max_playouts: int | None = None, determinize: bool = True, seed: int | None = None,
+                 clock=time.perf_counter) -> None:
+        """Initialises the search.
+
+        Args:
+            time_budget (float): Seconds of search per move.
+            horizon (int | None): Rounds simulated after the current one, until the end of the game if None.
+            exploration (float): The exploration constant of the UCB1 rule.
+            max_playouts (int | None): Stops the search after that many simulated futures if set.
+            determinize (bool): Whether to deal the cards unknown to the computer again
+                before each simulated future.
+            seed (int | None): The seed of the search's random generator.
+            clock (Callable[[], float]): Returns the current time in seconds, `time.perf_counter`
+                by default.
+        """
+        self.time_budget: float = time_budget
+        self.horizon: int | None = horizon
+        self.exploration: float = exploration
+        self.max_playouts: int | None = max_playouts
+        self.determinize: bool = determinize
+        self.rng = random.Random(seed)
+        self.scratch: engine.GameEngine | None = None
+        self.playouts: int = 0
+        self.values: dict = {}
+        self.clock = clock
+
+    def candidates(self, game: engine.GameEngine) -> list:
+        """Returns the different plays of the computer.
+
+        Args:
+            game (engine.GameEngine): The game to play in.
+
+        Returns:
+            list[tuple[int, int]]: The code of each playable card of the computer's hand
+                and, for a Wild card, the code of the card it chooses (0 otherwise).
+        """
+        plays = []
+        for code in dict.fromkeys(card.code for card in game.computer_hand):
+            if code >> 16 == engine.WATCHER:
+                continue
+            if code != engine.WILD_CODE:
+                plays.append((code, 0))
+                continue
+            source = game.draw_stack if game.draw_stack.has_regular() else game.discard_pile
+            choices = dict.fromkeys(card.code for card in source.largest_regular(4))
+            plays.extend((code, choice) for choice in choices or (0,))
+        return plays
+
+    def deal_unknown(self, game: engine.GameEngine) -> None:
+        """Deals the player's card and hand and the top of the draw stack again from the unknown cards.
+
+        The unknown cards are the player's card and hand and the whole draw
+        stack. A partial Fisher-Yates shuffle fills the player's card, the
+        hand and the top of the stack a future can draw with random unknown
+        cards, the cards deeper in the stack keep their order. Colorstorm,
+        Ascendancy and the Wild card only depend on which cards the stack
+        holds, so the whole stack is only shuffled when the future is
+        simulated until the end of the game.
+
+        Args:
+            game (engine.GameEngine): The copy of the game a future is simulated in.
+        """
+        played = [game.player_played_card] if game.player_played_card is not None else []
+        hand = played + game.player_hand.cards
+        stack = game.draw_stack
+        if stack.tombstones:
+            stack.compact()
+
+        # Slots after the hand are the draw stack from its top card down
+        known = len(hand)
+        total = known + len(stack)
+        last = total - 1
+        reach = total if self.horizon is None else min(total, known + DRAWS_PER_ROUND * (self.horizon + 1))
+        randrange = self.rng.randrange
+        for i in range(reach):
+            j = randrange(i, total)
+            if j == i:
+                continue
+            if j < known:
+                hand[i], hand[j] = hand[j], hand[i]
+            elif i < known:
+                hand[i] = stack.replace(last - j, hand[i])
+            else:
+                stack.swap(last - i, last - j)
+
+        if played:
+            game.player_played_card = hand[0]
+        game.player_hand = engine.Hand(hand[len(played):])
+
+    def playout(self, game: engine.GameEngine, play: tuple) -> int:
+        """Simulates one future of a play.
+
+        Args:
+            game (engine.GameEngine): The real game, it is not changed.
+            play (tuple[int, int]): The play, see `candidates`.
+
+        Returns:
+            int: How much the computer's lead grew during the simulated future.
+        """
+        scratch = self.scratch
+        scratch.copy_state(game)
+        card, used_wild = scratch.play_card_by_code(scratch.computer_hand, *play)
+        if self.determinize:
+            self.deal_unknown(scratch)
+
+        scratch.computer_played_card = card
+        scratch.resolve_round(used_wild, scratch.player_used_wild, scratch.last_player_wild_choice)
+        scratch.player_used_wild = False
+        scratch.last_player_wild_choice = None
+
+        for _ in range(self.horizon if self.horizon is not None else MAX_ROUNDS):
+            if not scratch.play_round():
+                break
+        return ((scratch.computer_score - game.computer_score)
+                - (scratch.player_score - game.player_score))
+
+    def choose(self, game: engine.GameEngine) -> tuple[engine.Card | None, bool]:
+        """Chooses and plays the computer's card, see `GameEngine.computer_play_card`.
+
+        Every play is simulated once, then the plays are sampled with the UCB1
+        rule. The time budget is checked before every simulated future, so a
+        move takes at most the budget and one future; if the budget is spent
+        before any future, a random play is chosen.
+
+        Args:
+            game (engine.GameEngine): The game to play in.
+
+        Returns:
+            tuple[Card | None, bool]: The played Card object and whether it was chosen with a Wild card.
+        """
+        plays = self.candidates(game)
+        self.playouts = 0
+        self.values = {}
+        if not plays:
+            return game.auto_play_card(game.computer_hand)
+        if len(plays) == 1:
+            return game.play_card_by_code(game.computer_hand, *plays[0])
+
+        if self.scratch is None or self.scratch.deck_spec is not game.deck_spec:
+            self.scratch = engine.GameEngine(game.card_factory, game.deck_spec)
+            self.scratch.rng = self.rng
+
+        totals = [0] * len(plays)
+        visits = [0] * len(plays)
+        lowest = highest = 0
+        deadline = self.clock() + self.time_budget
+        while self.clock() < deadline and self.playouts != self.max_playouts:
+            if self.playouts < len(plays):
+                i = self.playouts
+            else:
+                # UCB1 on values scaled by the range seen so far
+                scale = self.exploration * max(highest - lowest, 1)
+                log_playouts = math.log(self.playouts)
+                i = max(range(len(plays)), key=lambda j: totals[j] / visits[j]
+                        + scale * math.sqrt(log_playouts / visits[j]))
+
+            value = self.playout(game, plays[i])
+            totals[i] += value
+            visits[i] += 1
+            lowest = min(lowest, value)
+            highest = max(highest, value)
+            self.playouts += 1
+
+        sampled = [i for i in range(len(plays)) if visits[i]]
+        if not sampled:
+            return game.play_card_by_code(game.computer_hand, *self.rng.choice(plays))
+        self.values = {plays[i]: totals[i] / visits[i] for i in sampled}
+        best = max(sampled, key=lambda i: (visits[i], totals[i] / visits[i]))
+        return game.play_card_by_code(game.computer_hand, *plays[best])
+#ID: 5672969
@@ -0,0 +1,222 @@
+"""
+Packed bundle of the card images of War of Colors.
+
+The build step decodes every PNG file of the CARDS folder once, scales it
+to the card size of the game and packs the raw pixels of all the images
+into a single bundle file with an index. The game memory-maps the bundle
+and wraps the pixels of each card in a Surface with
+`pygame.image.frombuffer`, so no PNG is decoded or scaled at startup and
+opening the bundle costs the same whatever the number of cards.
+
+A bundle is a fixed header, the index and the pixels:
+-header: 4 byte magic, u16 version, u16 card width, u16 card height, u16 image count
+-index: for each image its file name (UTF-8, at most 32 bytes, NUL
+ padded) and the u64 position of its pixels in the bundle
+-pixels: width * height * 4 bytes per image, in "BGRA" order, which is
+ the 32-bit ARGB format `Surface.convert_alpha` produces on most displays
+
+The bundle has to be built again when the images or the card size change.
+The game falls back to the PNG files for the images that are not in the
+bundle, or for all of them if there is no bundle or its card size differs.
+
+Usage:
+    python assets.py build
+    python assets.py build --folder CARDS --output CARDS/cards.bundle
+
+Libraries used:
+-argparse
+-mmap
+-os
+-struct
+-time
+-pygame
+
+Data structures used:
+-bytes/memoryview
+-Dictionary
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+
+import pygame
+
+MAGIC = b"WOCB"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHHH")
+NAME_SIZE = 32
+ENTRY = struct.Struct(f"<{NAME_SIZE}sQ")
+
+# Bundle the game looks for next to the card images
+DEFAULT_BUNDLE = os.path.join("CARDS", "cards.bundle")
+
+def image_files(folder: str) -> list:
+    """Returns the PNG files of a folder, sorted by name."""
+    return [filename for filename in sorted(os.listdir(folder)) if filename.lower().endswith(".png")]
+
+#ID: 5672969
+# Pack the card images into a bundle
+def build_bundle(folder: str, path: str, size: tuple) -> int:
+    """Decodes, scales and packs every PNG file of a folder into a bundle.
+
+    The images are scaled like `CardAtlas.add` does after converting them,
+    so the bundled pixels are the same as the ones of the PNG files.
+    No display is needed.
+
+    Args:
+        folder (str): The folder that contains the card image files.
+        path (str): The bundle file, it is overwritten.
+        size (tuple): The (width, height) the images are scaled to.
+
+    Returns:
+        int: The number of images packed.
+
+    Raises:
+        ValueError: If a file name is longer than NAME_SIZE bytes, the index
+            would cut it and the image could not be found by its name.
+    """
+    filenames = image_files(folder)
+    for filename in filenames:
+        if len(filename.encode()) > NAME_SIZE:
+            raise ValueError(f"{filename} is longer than {NAME_SIZE} bytes, rename it to bundle it")
+    pixels = []
+    for filename in filenames:
+        image = pygame.image.load(os.path.join(folder, filename))
+        if not image.get_flags() & pygame.SRCALPHA:
+            opaque = image
+            image = pygame.Surface(opaque.get_size(), pygame.SRCALPHA, 32)
+            image.blit(opaque, (0, 0))
+        pixels.append(pygame.image.tobytes(pygame.transform.scale(image, size), "BGRA"))
+
+    offset = HEADER.size + ENTRY.size * len(filenames)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], len(filenames)))
+        for filename, data in zip(filenames, pixels):
+            file.write(ENTRY.pack(filename.encode(), offset))
+            offset += len(data)
+        for data in pixels:
+            file.write(data)
+    return len(filenames)
+
+class CardBundle:
+    """A bundle of card images, memory-mapped for reading.
+
+    Only the header and the index are read when the bundle is opened, the
+    pixels of an image are paged in when its Surface is first drawn.
+    Surfaces returned by `surface` keep a view into the mapping, the
+    bundle can only be closed once they are gone.
+
+    Attributes:
+        file: The bundle file.
+        map (mmap.mmap): The memory mapping of the file.
+        view (memoryview): A view of the whole mapping.
+        size (tuple): The (width, height) of the images.
+        offsets (dict[str, int]): The position of the pixels of each image, keyed by file name.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Opens and maps a bundle file.
+
+        Args:
+            path (str): The bundle file.
+
+        Raises:
+            ValueError: If the file is not a bundle of this version.
+        """
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, width, height, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} card bundle")
+
+        self.size: tuple = (width, height)
+        self.offsets: dict = {}
+        for i in range(count):
+            name, offset = ENTRY.unpack_from(self.map, HEADER.size + i * ENTRY.size)
+            self.offsets[name.rstrip(b"\0").decode()] = offset
+
+    def __len__(self) -> int:
+        """Returns the number of images in the bundle."""
+        return len(self.offsets)
+
+    def __contains__(self, filename: str) -> bool:
+        """Returns True if the bundle holds the image of that file."""
+        return filename in self.offsets
+
+    def surface(self, filename: str) -> pygame.Surface:
+        """Returns the image of a file as a Surface over the mapped pixels, without copying them.
+
+        Args:
+            filename (str): The image file name the bundle was built from.
+
+        Returns:
+            pygame.Surface: The scaled image with per-pixel alpha.
+        """
+        offset = self.offsets[filename]
+        width, height = self.size
+        return pygame.image.frombuffer(self.view[offset:offset + 4 * width * height], self.size, "BGRA")
+
+    def close(self) -> None:
+        """Unmaps and closes the bundle file."""
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "CardBundle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+# Open the bundle of the game
+def open_bundle(path: str, size: tuple) -> CardBundle | None:
+    """Opens a bundle if it exists and holds images of the given size.
+
+    Args:
+        path (str): The bundle file.
+        size (tuple): The (width, height) the game draws the cards with.
+
+    Returns:
+        CardBundle | None: The bundle, or None if the PNG files have to be used.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle = CardBundle(path)
+    except ValueError:
+        return None
+    if bundle.size != tuple(size):
+        bundle.close()
+        return None
+    return bundle
+#ID: 5672969
+
+def main() -> None:
+    """Builds the card image bundle."""
+    # The card size is the one of the front end, importing it does not start pygame
+    from game import CARD_WIDTH, CARD_HEIGHT
+
+    parser = argparse.ArgumentParser(description="Pack the War of Colors card images into a bundle.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="pack the card images, scaled to the card size")
+    build_parser.add_argument("--folder", default="CARDS", help="folder of the card PNG files")
+    build_parser.add_argument("--output", default=DEFAULT_BUNDLE, help="bundle file, it is overwritten")
+
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    try:
+        count = build_bundle(args.folder, args.output, (CARD_WIDTH, CARD_HEIGHT))
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"Packed {count} images of {CARD_WIDTH}x{CARD_HEIGHT} into {args.output} "
+          f"in {time.perf_counter() - start_time:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Vectorized batch simulation of the regular-card path of War of Colors.
+
+Thousands of games are played side by side with NumPy: the hands, draw
+stacks and discard piles of all games are int arrays of card codes (see
+`engine.Card.code`) and every round of every game is resolved in one
+vectorized step. Only decks of regular cards are supported, the rules
+are the color match of `GameEngine.resolve_round` and `calculate_points`
+with its repeat-number bonus, whose size can be changed to compare
+scoring variants.
+
+Usage:
+    python batch.py --games 100000 --seed 1
+    python batch.py --games 1000000 --repeat-bonus 0 2 4
+
+Libraries used:
+-argparse
+-time
+-collections.Counter
+-numpy
+-engine
+-tournament
+
+Data structures used:
+-NumPy arrays
+-Dictionary
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+import engine
+import tournament
+
+# Round winners in the winner arrays
+NO_WINNER = 0
+PLAYER = 1
+COMPUTER = 2
+
+# Standard deck without special cards
+REGULAR_DECK = engine.DeckSpec(special_cards={})
+
+#ID: 5670726
+def card_numbers(codes: np.ndarray) -> np.ndarray:
+    """Returns the numbers of an array of card codes."""
+    return codes & 0xFF
+
+def card_colors(codes: np.ndarray) -> np.ndarray:
+    """Returns the color codes of an array of card codes."""
+    return (codes >> 8) & 0xFF
+
+def calculate_points(player_numbers: np.ndarray, computer_numbers: np.ndarray,
+                     previous_player_numbers: np.ndarray, previous_computer_numbers: np.ndarray,
+                     winners: np.ndarray, repeat_bonus: int = 2) -> np.ndarray:
+    """
+    Calculates the points of many rounds at once, like `engine.calculate_points`.
+
+    Parameters:
+        player_numbers (np.ndarray): The numbers of the cards played by the player.
+        computer_numbers (np.ndarray): The numbers of the cards played by the computer.
+        previous_player_numbers (np.ndarray): The numbers of the player's previous cards, -1 if none.
+        previous_computer_numbers (np.ndarray): The numbers of the computer's previous cards, -1 if none.
+        winners (np.ndarray): PLAYER or COMPUTER for each round.
+        repeat_bonus (int): Points added when the winner repeats the number of their previous card.
+
+    Returns:
+        np.ndarray: Total points for each round.
+    """
+    total_points = player_numbers + computer_numbers
+
+    # Bonus of the winner for playing the same number twice in a row
+    player_bonus = (winners == PLAYER) & (player_numbers == previous_player_numbers)
+    computer_bonus = (winners == COMPUTER) & (computer_numbers == previous_computer_numbers)
+    total_points += np.where(player_bonus | computer_bonus, repeat_bonus, 0)
+
+    return total_points
+#ID: 5670726
+
+#ID: 5672969
+class BatchGames:
+    """Many games of regular cards played side by side in NumPy arrays.
+
+    Index 0 of the second axis of `hands`, `hand_counts`, `scores` and
+    `previous_numbers` is the player, index 1 is the computer. Both sides
+    play a random card of their hand each round, like `simulate_game`.
+
+    Attributes:
+        games (int): The number of games.
+        repeat_bonus (int): Points of the repeat-number bonus.
+        rng (np.random.Generator): The random generator of all games.
+        deck (np.ndarray): The card codes of one unshuffled deck.
+        draw_stack (np.ndarray): The draw stack of each game, top card at draw_counts - 1.
+        draw_counts (np.ndarray): The number of cards left in each draw stack.
+        discard_pile (np.ndarray): The discard pile of each game.
+        discard_counts (np.ndarray): The number of cards in each discard pile.
+        hands (np.ndarray): The hands of each game, the first hand_counts cards are held.
+        hand_counts (np.ndarray): The number of cards in each hand.
+        scores (np.ndarray): The scores of each game.
+        previous_numbers (np.ndarray): The number of the previous card of each side, -1 if none.
+        rounds (np.ndarray): The rounds played in each game.
+        finished (np.ndarray): Whether each game is over.
+    """
+
+    def __init__(self, games: int, deck_spec: engine.DeckSpec = REGULAR_DECK,
+                 seed: int | None = None, repeat_bonus: int = 2, hand_size: int = 5) -> None:
+        """Shuffles a deck for every game and deals the hands.
+
+        Args:
+            games (int): The number of games.
+            deck_spec (engine.DeckSpec): The deck, it must only have regular cards.
+            seed (int | None): The seed of the random generator.
+            repeat_bonus (int): Points of the repeat-number bonus.
+            hand_size (int): The number of cards dealt to each side.
+
+        Raises:
+            ValueError: If the deck has special cards or too few cards to deal.
+        """
+        if any(deck_spec.special_cards.values()):
+            raise ValueError("Batch games only support decks of regular cards")
+        deck = np.array([card.code for card in deck_spec.build()], dtype=np.int32)
+        if len(deck) < 2 * hand_size:
+            raise ValueError("The deck has too few cards to deal both hands")
+
+        self.games: int = games
+        self.repeat_bonus: int = repeat_bonus
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.deck: np.ndarray = deck
+
+        self.draw_stack: np.ndarray = self.rng.permuted(np.tile(deck, (games, 1)), axis=1)
+        self.draw_counts: np.ndarray = np.full(games, len(deck) - 2 * hand_size)
+        self.discard_pile: np.ndarray = np.zeros((games, len(deck)), dtype=np.int32)
+        self.discard_counts: np.ndarray = np.zeros(games, dtype=np.int64)
+
+        # Deal the top cards of each stack, the player first
+        top = self.draw_stack[:, len(deck) - 2 * hand_size:]
+        self.hands: np.ndarray = np.stack([top[:, hand_size:][:, ::-1], top[:, :hand_size][:, ::-1]], axis=1)
+        self.hand_counts: np.ndarray = np.full((games, 2), hand_size)
+
+        self.scores: np.ndarray = np.zeros((games, 2), dtype=np.int64)
+        self.previous_numbers: np.ndarray = np.full((games, 2), -1)
+        self.rounds: np.ndarray = np.zeros(games, dtype=np.int64)
+        self.finished: np.ndarray = np.zeros(games, dtype=bool)
+
+    def refill(self, games: np.ndarray, side: int, slots: np.ndarray) -> None:
+        """Fills the slots of played cards of one side, drawing a card if any are left.
+
+        Args:
+            games (np.ndarray): The indices of the games.
+            side (int): 0 for the player, 1 for the computer.
+            slots (np.ndarray): The hand position of the played card in each game.
+        """
+        draw = self.draw_counts[games] > 0
+        drawing, shrinking = games[draw], games[~draw]
+
+        self.draw_counts[drawing] -= 1
+        self.hands[drawing, side, slots[draw]] = self.draw_stack[drawing, self.draw_counts[drawing]]
+
+        self.hand_counts[shrinking, side] -= 1
+        last = self.hand_counts[shrinking, side]
+        self.hands[shrinking, side, slots[~draw]] = self.hands[shrinking, side, last]
+
+    def step(self) -> int:
+        """Plays one round in every game that is not over.
+
+        Returns:
+            int: The number of games that played a round.
+        """
+        self.check_game_over()
+        games = np.flatnonzero(~self.finished)
+        if len(games) == 0:
+            return 0
+
+        # Both sides play a random card of their hand
+        player_slots = self.rng.integers(0, self.hand_counts[games, 0])
+        computer_slots = self.rng.integers(0, self.hand_counts[games, 1])
+        player_cards = self.hands[games, 0, player_slots]
+        computer_cards = self.hands[games, 1, computer_slots]
+
+        # Comparing numbers if colors match
+        player_numbers = card_numbers(player_cards)
+        computer_numbers = card_numbers(computer_cards)
+        same_color = card_colors(player_cards) == card_colors(computer_cards)
+        winners = np.where(same_color & (player_numbers > computer_numbers), PLAYER,
+                           np.where(same_color & (player_numbers < computer_numbers), COMPUTER, NO_WINNER))
+        points = calculate_points(player_numbers, computer_numbers, self.previous_numbers[games, 0],
+                                  self.previous_numbers[games, 1], winners, self.repeat_bonus)
+        self.scores[games, 0] += np.where(winners == PLAYER, points, 0)
+        self.scores[games, 1] += np.where(winners == COMPUTER, points, 0)
+
+        # Move played cards to the discard pile, then draw new cards
+        self.discard_pile[games, self.discard_counts[games]] = player_cards
+        self.discard_pile[games, self.discard_counts[games] + 1] = computer_cards
+        self.discard_counts[games] += 2
+        self.refill(games, 0, player_slots)
+        self.refill(games, 1, computer_slots)
+
+        self.previous_numbers[games, 0] = player_numbers
+        self.previous_numbers[games, 1] = computer_numbers
+        self.rounds[games] += 1
+        self.check_game_over()
+        return len(games)
+
+    def check_game_over(self) -> None:
+        """Ends the games like `GameEngine.check_game_over`.
+
+        A single card left between both hands is scored as a leftover
+        card, a game also ends when both hands are empty.
+        """
+        player_counts = self.hand_counts[:, 0]
+        computer_counts = self.hand_counts[:, 1]
+        for side, leftover in ((0, (player_counts == 1) & (computer_counts == 0)),
+                               (1, (computer_counts == 1) & (player_counts == 0))):
+            games = np.flatnonzero(leftover & ~self.finished)
+            cards = self.hands[games, side, 0]
+            self.scores[games, side] += card_numbers(cards)
+            self.discard_pile[games, self.discard_counts[games]] = cards
+            self.discard_counts[games] += 1
+            self.hand_counts[games, side] = 0
+            self.finished[games] = True
+
+        self.finished |= (player_counts == 0) & (computer_counts == 0)
+
+    def run(self, max_rounds: int = 1000) -> "BatchGames":
+        """Plays every game until it is over.
+
+        Args:
+            max_rounds (int): Safety limit on the number of rounds.
+
+        Returns:
+            BatchGames: The batch itself, holding the final state of the games.
+        """
+        for _ in range(max_rounds):
+            if not self.step():
+                break
+        return self
+
+    def winners(self) -> np.ndarray:
+        """Returns PLAYER, COMPUTER or NO_WINNER for a tie, for each game."""
+        return np.where(self.scores[:, 0] > self.scores[:, 1], PLAYER,
+                        np.where(self.scores[:, 1] > self.scores[:, 0], COMPUTER, NO_WINNER))
+
+    def stats(self) -> dict:
+        """Returns the statistics of the games in the format of `tournament.new_stats`."""
+        winners = self.winners()
+        return {
+            "games": self.games,
+            "player_wins": int(np.count_nonzero(winners == PLAYER)),
+            "computer_wins": int(np.count_nonzero(winners == COMPUTER)),
+            "ties": int(np.count_nonzero(winners == NO_WINNER)),
+            "player_score": int(self.scores[:, 0].sum()),
+            "computer_score": int(self.scores[:, 1].sum()),
+            "rounds": int(self.rounds.sum()),
+            "special_cards": Counter(),
+        }
+#ID: 5672969
+
+def main() -> None:
+    """Parses the command line and plays a batch of games for each scoring variant."""
+    parser = argparse.ArgumentParser(description="Play War of Colors games of regular cards in vectorized batches.")
+    parser.add_argument("--games", type=int, default=100000, help="number of games per variant")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    parser.add_argument("--repeat-bonus", type=int, nargs="+", default=[2],
+                        help="repeat-number bonus of each scoring variant")
+    parser.add_argument("--decks", type=int, default=1, help="decks shuffled together")
+    parser.add_argument("--colors", type=int, default=4, help="colors of regular cards")
+    parser.add_argument("--max-number", type=int, default=10, help="largest regular card number")
+    args = parser.parse_args()
+
+    try:
+        deck_spec = engine.DeckSpec.generate(args.colors, args.max_number, args.decks)
+    except ValueError as error:
+        parser.error(str(error))
+    deck_spec.special_cards = {}
+    for repeat_bonus in args.repeat_bonus:
+        start_time = time.perf_counter()
+        batch = BatchGames(args.games, deck_spec, args.seed, repeat_bonus).run()
+        print(f"Repeat-number bonus: {repeat_bonus}")
+        print(tournament.format_report(batch.stats(), time.perf_counter() - start_time))
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""
+Benchmarks for War of Colors.
+
+Usage:
+    python benchmark.py deck [--rounds 20000] [--multipliers 1 10 100]
+    python benchmark.py sort [--sizes 50 1000 10000 100000]
+    python benchmark.py snapshot [--games 200]
+    python benchmark.py startup [--runs 5] [--target 600]
+    python benchmark.py throughput [--games 2000] [--repeats 5]
+
+Benchmarks:
+-deck: round latency of headless games as the deck grows
+-sort: engine.sort_by_number against engine.quicksort on sorted, reverse and random stacks
+-snapshot: saving and restoring game states with snapshot.py against copy.deepcopy
+-startup: time to the first frame of game.py in fresh processes, against a target
+-throughput: headless games per second with the standard deck and a deck full of special cards
+
+Libraries used:
+-argparse
+-copy
+-math
+-os
+-random
+-sys
+-statistics
+-subprocess
+-tempfile
+-time
+-engine
+-snapshot
+"""
+
+import argparse
+import copy
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import engine
+import snapshot
+
+#ID: 5672969
+# Round latency for growing decks
+def bench_deck(rounds: int = 20000, multipliers: tuple = (1, 10, 100), seed: int = 0) -> list:
+    """Measures the latency of `GameEngine.play_round` for decks of growing size.
+
+    For each multiplier m the deck is m standard decks shuffled together,
+    headless games are played until at least `rounds` rounds were timed.
+
+    Args:
+        rounds (int): The minimum number of rounds timed for each deck size.
+        multipliers (tuple): How many standard decks are shuffled together for each measurement.
+        seed (int): The seed the seeds of the games are drawn from.
+
+    Returns:
+        list[dict]: One result per deck size with the card count and latency statistics in microseconds.
+    """
+    results = []
+    for decks in multipliers:
+        game = engine.GameEngine(deck_spec=engine.DeckSpec(decks=decks), seed=seed)
+        timings = []
+        games = 0
+        while len(timings) < rounds:
+            game.new_game()
+            games += 1
+            while True:
+                start = time.perf_counter_ns()
+                played = game.play_round()
+                timings.append(time.perf_counter_ns() - start)
+                if not played:
+                    break
+
+        timings.sort()
+        results.append({
+            "cards": game.deck_spec.size(),
+            "games": games,
+            "rounds": len(timings),
+            "mean": statistics.fmean(timings) / 1000,
+            "p50": timings[len(timings) // 2] / 1000,
+            "p95": timings[int(len(timings) * 0.95)] / 1000,
+            "max": timings[-1] / 1000,
+        })
+    return results
+
+def print_deck_results(results: list) -> None:
+    """Prints the results of `bench_deck` as a table.
+
+    Args:
+        results (list[dict]): The results of `bench_deck`.
+    """
+    print(f"{'cards':>7} {'games':>6} {'rounds':>7} {'mean us':>9} {'p50 us':>8} {'p95 us':>8} {'max us':>9}")
+    for result in results:
+        print(f"{result['cards']:>7} {result['games']:>6} {result['rounds']:>7} {result['mean']:>9.1f} "
+              f"{result['p50']:>8.1f} {result['p95']:>8.1f} {result['max']:>9.1f}")
+
+# Sorting draw stacks of growing size
+SORT_ORDERS = ("sorted", "reverse", "random")
+
+def make_stack(size: int, order: str, seed: int = 0) -> list:
+    """Builds a draw stack of regular and special cards from enough shuffled decks.
+
+    Args:
+        size (int): The number of cards in the stack.
+        order (str): "sorted", "reverse" or "random" order of the card numbers.
+        seed (int): The seed of the shuffle.
+
+    Returns:
+        list: The cards of the stack.
+    """
+    deck_spec = engine.DeckSpec(decks=math.ceil(size / engine.DEFAULT_DECK.size()))
+    cards = engine.shuffle(deck_spec.build(), random.Random(seed))[:size]
+    if order == "sorted":
+        cards.sort(key=engine.card_number)
+    elif order == "reverse":
+        cards.sort(key=engine.card_number, reverse=True)
+    return cards
+
+def time_sort(sort, cards: list, repeats: int) -> float | None:
+    """Returns the best time of sorting a copy of the cards, or None if the sort hit the recursion limit.
+
+    Args:
+        sort: The sorting function, called with a list of cards.
+        cards (list): The cards to sort, they are copied before every run.
+        repeats (int): The number of timed runs.
+
+    Returns:
+        float | None: The best time in milliseconds.
+    """
+    best = None
+    for _ in range(repeats):
+        stack = list(cards)
+        start = time.perf_counter_ns()
+        try:
+            sort(stack)
+        except RecursionError:
+            return None
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_sort(sizes: tuple = (50, 1000, 10000, 100000), repeats: int = 5, seed: int = 0) -> list:
+    """Compares `engine.sort_by_number` with the recursive `engine.quicksort`.
+
+    Quicksort takes cards[0] as pivot, so sorted and reverse stacks hit its
+    O(n^2) worst case, and the many cards of equal number of large stacks
+    make it recurse once per card. It is reported as failed once it exceeds
+    the recursion limit and skipped for larger stacks of the same order.
+
+    Args:
+        sizes (tuple): The stack sizes to sort.
+        repeats (int): The number of timed runs per measurement, the best one is kept.
+        seed (int): The seed of the shuffles.
+
+    Returns:
+        list[dict]: One result per size and order with both times in milliseconds,
+            None if the sort hit the recursion limit and "skipped" if it was not run.
+    """
+    results = []
+    quicksort_failed = set()
+    for size in sorted(sizes):
+        for order in SORT_ORDERS:
+            cards = make_stack(size, order, seed)
+            if order in quicksort_failed:
+                quicksort = "skipped"
+            else:
+                quicksort = time_sort(engine.quicksort, cards, repeats)
+                if quicksort is None:
+                    quicksort_failed.add(order)
+            results.append({
+                "cards": size,
+                "order": order,
+                "sort_by_number": time_sort(engine.sort_by_number, cards, repeats),
+                "quicksort": quicksort,
+            })
+    return results
+
+def print_sort_results(results: list) -> None:
+    """Prints the results of `bench_sort` as a table.
+
+    Args:
+        results (list[dict]): The results of `bench_sort`.
+    """
+    def cell(value) -> str:
+        if value is None:
+            return f"{'RecursionError':>14}"
+        if isinstance(value, str):
+            return f"{value:>14}"
+        return f"{value:>14.3f}"
+
+    print(f"(recursion limit {sys.getrecursionlimit()})")
+    print(f"{'cards':>7} {'order':>8} {'sort ms':>14} {'quicksort ms':>14}")
+    for result in results:
+        print(f"{result['cards']:>7} {result['order']:>8} {cell(result['sort_by_number'])} {cell(result['quicksort'])}")
+
+# Saving and restoring game states
+def bench_snapshot(games: int = 200, seed: int = 0) -> list:
+    """Measures snapshots of every position of headless games against copying the engine.
+
+    Every round of the games is snapshotted with and without the random
+    generator state, then each snapshot is restored from bytes and from a
+    memory-mapped library. `copy.deepcopy` of the engine is the baseline.
+
+    Args:
+        games (int): The number of games whose positions are measured.
+        seed (int): The seed the seeds of the games are drawn from.
+
+    Returns:
+        list[dict]: One result per method with the mean time in microseconds
+            and the mean size of a saved state in bytes, None if not applicable.
+    """
+    game = engine.GameEngine(seed=seed)
+    positions = []
+    for _ in range(games):
+        game.new_game()
+        positions.append(copy.deepcopy(game))
+        while game.play_round():
+            positions.append(copy.deepcopy(game))
+
+    def mean_time(function, items) -> float:
+        start = time.perf_counter_ns()
+        for item in items:
+            function(item)
+        return (time.perf_counter_ns() - start) / len(items) / 1000
+
+    results = []
+    target = engine.GameEngine()
+    for include_rng in (True, False):
+        label = "with RNG" if include_rng else "without RNG"
+        snapshots = [snapshot.snapshot_game(position, include_rng) for position in positions]
+        results.append({"method": f"snapshot_game {label}",
+                        "us": mean_time(lambda position: snapshot.snapshot_game(position, include_rng), positions),
+                        "bytes": statistics.fmean(map(len, snapshots))})
+        results.append({"method": f"restore_game {label}",
+                        "us": mean_time(lambda buffer: snapshot.restore_game(target, buffer), snapshots),
+                        "bytes": None})
+
+        handle, path = tempfile.mkstemp(suffix=".snap")
+        os.close(handle)
+        try:
+            snapshot.write_library(path, snapshots)
+            with snapshot.SnapshotLibrary(path) as library:
+                results.append({"method": f"library restore {label}",
+                                "us": mean_time(lambda index: library.restore(target, index), range(len(library))),
+                                "bytes": None})
+        finally:
+            os.remove(path)
+
+    results.append({"method": "copy.deepcopy", "us": mean_time(copy.deepcopy, positions[:2000]), "bytes": None})
+    return results
+
+def print_snapshot_results(results: list) -> None:
+    """Prints the results of `bench_snapshot` as a table.
+
+    Args:
+        results (list[dict]): The results of `bench_snapshot`.
+    """
+    print(f"{'method':<32} {'mean us':>9} {'bytes':>7}")
+    for result in results:
+        size = "" if result["bytes"] is None else f"{result['bytes']:.0f}"
+        print(f"{result['method']:<32} {result['us']:>9.1f} {size:>7}")
+
+# Time to the first frame of the front end
+STARTUP_TARGET = 600  # Milliseconds from the start of the process to the first frame
+
+# Run in a fresh interpreter, prints the time of each startup phase in seconds
+STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+import engine
+engine_imported = time.perf_counter()
+import game
+game_imported = time.perf_counter()
+game.start()
+window_ready = time.perf_counter()
+game.game_engine.new_game()
+game.board_renderer.render()
+first_frame = time.perf_counter()
+print(engine_imported - started, game_imported - engine_imported, window_ready - game_imported,
+      first_frame - window_ready)
+"""
+
+STARTUP_PHASES = ("import engine", "import game", "window and images", "first frame")
+
+def bench_startup(runs: int = 5) -> list:
+    """Measures the startup of the front end, each run in a fresh process.
+
+    The video driver is the dummy driver of SDL unless SDL_VIDEODRIVER is
+    set, so the benchmark also runs without a screen. The total of a run
+    is the wall clock time from starting the interpreter to the end of the
+    first frame, it includes the startup of Python itself.
+
+    Args:
+        runs (int): The number of processes started.
+
+    Returns:
+        list[dict]: One result per startup phase and one for the total,
+            with the median and the best time in milliseconds.
+    """
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    folder = os.path.dirname(os.path.abspath(__file__))
+
+    timings = {phase: [] for phase in STARTUP_PHASES + ("total",)}
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=folder, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        timings["total"].append((time.perf_counter() - start) * 1000)
+        for phase, seconds in zip(STARTUP_PHASES, output.split()):
+            timings[phase].append(float(seconds) * 1000)
+
+    return [{"phase": phase, "median": statistics.median(times), "best": min(times)}
+            for phase, times in timings.items()]
+
+def print_startup_results(results: list, target: float = STARTUP_TARGET) -> bool:
+    """Prints the results of `bench_startup` as a table and checks the total against the target.
+
+    Args:
+        results (list[dict]): The results of `bench_startup`.
+        target (float): The time to the first frame to stay under, in milliseconds.
+
+    Returns:
+        bool: True if the median total is under the target.
+    """
+    print(f"{'phase':<20} {'median ms':>10} {'best ms':>9}")
+    for result in results:
+        print(f"{result['phase']:<20} {result['median']:>10.1f} {result['best']:>9.1f}")
+    met = results[-1]["median"] <= target
+    print(f"Time to first frame target {target:.0f} ms: {'met' if met else 'MISSED'}")
+    return met
+
+# Headless simulation throughput
+SPECIAL_HEAVY_DECK = {"colorstorm": 4, "ascendancy": 4, "twopoints": 8, "joker": 4, "swap": 4,
+                      "wild": 1, "watcher": 1}
+
+def bench_throughput(games: int = 2000, repeats: int = 5, seed: int = 0) -> list:
+    """Measures how many headless games per second `GameEngine.play_round` plays.
+
+    The same seeded games are played `repeats` times and the best run is
+    kept. The special heavy deck has about four times the special cards of
+    the standard deck, so more rounds are resolved by a `SpecialRule`.
+
+    Args:
+        games (int): The number of games of a run.
+        repeats (int): The number of timed runs per deck.
+        seed (int): The seed of the first game, the games use the following seeds.
+
+    Returns:
+        list[dict]: One result per deck with the games and rounds per second.
+    """
+    results = []
+    for name, deck_spec in (("standard", engine.DEFAULT_DECK),
+                            ("special heavy", engine.DeckSpec(special_cards=SPECIAL_HEAVY_DECK))):
+        game = engine.GameEngine(deck_spec=deck_spec)
+        best = None
+        for _ in range(repeats):
+            rounds = 0
+            start = time.perf_counter()
+            for index in range(games):
+                game.new_game(seed + index)
+                while game.play_round():
+                    rounds += 1
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append({"deck": name, "games/s": games / best, "rounds/s": rounds / best})
+    return results
+
+def print_throughput_results(results: list) -> None:
+    """Prints the results of `bench_throughput` as a table.
+
+    Args:
+        results (list[dict]): The results of `bench_throughput`.
+    """
+    print(f"{'deck':<14} {'games/s':>9} {'rounds/s':>10}")
+    for result in results:
+        print(f"{result['deck']:<14} {result['games/s']:>9.0f} {result['rounds/s']:>10.0f}")
+#ID: 5672969
+
+def main() -> None:
+    """Parses the command line and runs the chosen benchmark."""
+    parser = argparse.ArgumentParser(description="War of Colors benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    deck_parser = subparsers.add_parser("deck", help="round latency as the deck grows")
+    deck_parser.add_argument("--rounds", type=int, default=20000, help="rounds timed per deck size")
+    deck_parser.add_argument("--multipliers", type=int, nargs="+", default=[1, 10, 100],
+                             help="standard decks shuffled together")
+    deck_parser.add_argument("--seed", type=int, default=0, help="random seed")
+
+    sort_parser = subparsers.add_parser("sort", help="sort_by_number against quicksort")
+    sort_parser.add_argument("--sizes", type=int, nargs="+", default=[50, 1000, 10000, 100000],
+                             help="draw stack sizes")
+    sort_parser.add_argument("--repeats", type=int, default=5, help="timed runs per measurement")
+    sort_parser.add_argument("--seed", type=int, default=0, help="random seed")
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="snapshot and restore against deepcopy")
+    snapshot_parser.add_argument("--games", type=int, default=200, help="games whose positions are measured")
+    snapshot_parser.add_argument("--seed", type=int, default=0, help="random seed")
+
+    startup_parser = subparsers.add_parser("startup", help="time to the first frame of the front end")
+    startup_parser.add_argument("--runs", type=int, default=5, help="fresh processes started")
+    startup_parser.add_argument("--target", type=float, default=STARTUP_TARGET,
+                                help="time to first frame target in milliseconds")
+
+    throughput_parser = subparsers.add_parser("throughput", help="headless games per second")
+    throughput_parser.add_argument("--games", type=int, default=2000, help="games of a timed run")
+    throughput_parser.add_argument("--repeats", type=int, default=5, help="timed runs per deck, the best is kept")
+    throughput_parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+
+    args = parser.parse_args()
+    if args.benchmark == "deck":
+        print_deck_results(bench_deck(args.rounds, tuple(args.multipliers), args.seed))
+    elif args.benchmark == "sort":
+        print_sort_results(bench_sort(tuple(args.sizes), args.repeats, args.seed))
+    elif args.benchmark == "snapshot":
+        print_snapshot_results(bench_snapshot(args.games, args.seed))
+    elif args.benchmark == "startup":
+        if not print_startup_results(bench_startup(args.runs), args.target):
+            sys.exit(1)
+    elif args.benchmark == "throughput":
+        print_throughput_results(bench_throughput(args.games, args.repeats, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2449 @@
+"""
+Display-free game engine for War of Colors.
+
+This module holds the rules of the game without any pygame dependency,
+so rounds can be resolved and whole games simulated on machines without
+a display. The pygame front end in game.py is layered on top of it.
+
+Libraries used:
+-random
+-collections.Counter
+
+Data structures used:
+-List
+-Tuple
+-Dictionary(Counter)
+-class
+
+Algorithms used:
+-Fisher-Yates Shuffle algorithm
+-Quicksort algorithm
+-Stable sort by number with an already-sorted fast path
+-Bucket sort by color and number (Colorstorm reorder)
+-Max-Heap (custom class)
+-Top-k index of regular cards by number (custom class)
+-Round Resolution Logic
+-Game State Machine
+"""
+
+import random
+from bisect import insort
+from collections import Counter
+from itertools import islice
+from operator import attrgetter, le
+
+# Game state
+SELECTING_CARD = 0
+WAITING_FOR_COMPUTER = 1
+SHOWING_RESULT = 2
+GAME_OVER = 3
+WILD_CARD = 4
+LAST_ROUND = 5
+
+#ID: 5672969
+# Interned color and card type codes
+class CodeTable:
+    """Maps names to small integer codes, shared by every card.
+
+    Cards store the codes instead of the names, new names get the next
+    free code the first time they are seen.
+
+    Attributes:
+        names (list[str]): The name of each code.
+        codes (dict[str, int]): The code of each name.
+        max_code (int | None): The largest code the table can give, no limit if None.
+    """
+
+    def __init__(self, names: list, max_code: int | None = None) -> None:
+        """Initialises the table with the names of the first codes.
+
+        Args:
+            names (list[str]): The names known in advance, in code order.
+            max_code (int | None): The largest code the table can give, no limit if None.
+        """
+        self.names: list = []
+        self.codes: dict = {}
+        self.max_code: int | None = max_code
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        """Returns the code of a name, adding the name if it is new.
+
+        Args:
+            name (str): The name.
+
+        Returns:
+            int: The code of the name.
+
+        Raises:
+            ValueError: If the name is new and every code up to max_code is taken.
+        """
+        code = self.codes.get(name)
+        if code is None:
+            if self.max_code is not None and len(self.names) > self.max_code:
+                raise ValueError(f"cannot add {name!r}, all {self.max_code + 1} codes are taken")
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+# Card numbers and color codes each have one byte of the card code, see Card.code
+MAX_NUMBER = 0xFF
+MAX_COLOR_CODE = 0xFF
+
+# Special cards have no color, which is code 0
+COLOR_CODES = CodeTable(["", "Red", "Blue", "Green", "Yellow"], MAX_COLOR_CODE)
+CARD_TYPE_CODES = CodeTable(["regular", "wild", "watcher", "colorstorm", "ascendancy", "twopoints", "joker", "swap"])
+REGULAR = CARD_TYPE_CODES.code("regular")
+WILD = CARD_TYPE_CODES.code("wild")
+WATCHER = CARD_TYPE_CODES.code("watcher")
+WILD_CODE = WILD << 16  # Code of the Wild card, see Card.code
+#ID: 5672969
+
+# Card class
+#ID: 5672969, 5671165
+class Card:
+    """A card of the game.
+
+    Cards only hold the rules data in slots, with the color and card type
+    stored as interned codes. Images, positions and selection belong to
+    the front end and are kept outside the card.
+
+    Attributes:
+        color_code (int): The code of the color in COLOR_CODES.
+        number (int): The number of the card, 0 for special cards.
+        type_code (int): The code of the card type in CARD_TYPE_CODES.
+    """
+
+    __slots__ = ("color_code", "number", "type_code")
+
+    def __init__(self, color, number, card_type="regular"):
+        """ Initializes the card with the given color, number, and card type"""
+        self.color_code = COLOR_CODES.code(color)
+        self.number = number
+        self.type_code = CARD_TYPE_CODES.code(card_type)  #regular, wild, watcher, colorstorm, ascendancy, add two points
+
+    @property
+    def color(self) -> str:
+        """The color of the card, an empty string for special cards."""
+        return COLOR_CODES.names[self.color_code]
+
+    @property
+    def card_type(self) -> str:
+        """The type of the card: regular, wild, watcher, colorstorm, ascendancy, twopoints, joker or swap."""
+        return CARD_TYPE_CODES.names[self.type_code]
+
+    @property
+    def code(self) -> int:
+        """The card packed into one integer: number in the low byte, then the color and type codes.
+
+        Numbers above MAX_NUMBER would spill into the color byte, `DeckSpec`
+        and `COLOR_CODES` refuse numbers and colors that do not fit.
+        """
+        return (self.type_code << 16) | (self.color_code << 8) | self.number
+
+    @classmethod
+    def from_code(cls, code: int) -> "Card":
+        """Builds a card from its packed integer code.
+
+        Args:
+            code (int): The code returned by `Card.code`.
+
+        Returns:
+            Card: A new card with the same color, number and card type.
+        """
+        card = object.__new__(cls)
+        card.color_code = (code >> 8) & 0xFF
+        card.number = code & 0xFF
+        card.type_code = code >> 16
+        return card
+
+    def __copy__(self) -> "Card":
+        """Returns a copy of the card without going through the constructor."""
+        card = object.__new__(type(self))
+        card.color_code = self.color_code
+        card.number = self.number
+        card.type_code = self.type_code
+        return card
+
+    def __deepcopy__(self, memo: dict) -> "Card":
+        """Returns a copy of the card, its attributes are immutable."""
+        return self.__copy__()
+
+    def __reduce__(self):
+        """Pickles the card by its names, codes are only valid inside one process."""
+        return (type(self), (self.color, self.number, self.card_type))
+
+    #ID: 5672969
+    def __str__(self):
+        if self.card_type == "regular":
+            return f"{self.color} {self.number}"
+        else:
+            return self.card_type.capitalize()
+    #ID: 5672969
+
+    #ID: 5671165
+    #Comparison methods needed for MaxHeap
+    def __lt__(self, other: object) -> bool:
+        """Less than method to compare cards according to their number.
+
+        Args:
+            other (object): Another card to compare with.
+
+        Returns:
+            bool: True if self is less than other, otherwise False.
+        """
+        if not isinstance(other, Card):
+            return NotImplemented
+
+        if self.number < other.number:
+            return True
+        else:
+            return False
+
+    def __gt__(self, other: object) -> bool:
+        """Greater than method to compare cards according to their number.
+
+        Args:
+            other (object): Another card to compare with.
+
+        Returns:
+            bool: True if self is greater than other, otherwise False.
+        """
+        if not isinstance(other, Card):
+            return NotImplemented
+
+        if self.number > other.number:
+            return True
+        else:
+            return False
+
+    def __eq__(self, other: object) -> bool:
+        """Equality method to compare cards according to their color, number and card type.
+
+        Args:
+            other (object): Another card to compare with.
+
+        Returns:
+            bool: True if all attributes are equal, otherwise False.
+        """
+        if not isinstance(other, Card):
+            return False
+
+        if (self.color_code == other.color_code and 
+            self.number == other.number and 
+            self.type_code == other.type_code):
+            return True
+        else:
+            return False
+        
+    def __ne__(self, other: object) -> bool:
+        """Inequality method to compare cards according to their color, number and card type.
+
+        Args:
+            other (object): Another card to compare with.
+
+        Returns:
+            bool: True if any attribute doesn't match, otherwise False.
+        """
+        if self.__eq__(other):
+            return False
+        else:
+            return True
+    #ID: 5671165
+#ID: 5672969, 5671165
+
+
+#ID: 5671165
+#MaxHeap Class
+class MaxHeap:
+    """A max-heap data structure implementation for storing 
+    cards objects used for implementing Wild card.
+
+    This class adds elements to the MaxHeap list,
+    retrieves the largest element, and finds the top four largest values.
+    It uses a binary heap data structure that is stored in a list 
+    and starts at index 1.
+
+    The Wild card no longer builds a heap from a pile for every play, it
+    asks the `RegularCardIndex` of the pile instead. The index offers the
+    same numbers but cards with equal numbers in the order they reached
+    the pile, not in the order of the heap, so a seed can offer other
+    cards of those numbers than the first version of the game did.
+
+    Attributes:
+        heap_list (List[Card]): The initial list that represents the heap.
+        count (int): Number of elements in the heap (excluding 0 index).
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty max heap attributes with a
+        counter that starts at index 0.
+        """
+        self.heap_list: list = [None]
+        self.count: int = 0
+
+    def parent_idx(self, idx: int) -> int:
+        """Returns the index of the parent node.
+
+        Args:
+            idx (int): Index of the child node.
+
+        Returns:
+            int: Index of the parent node.
+        """
+        return idx // 2
+
+    def left_child_idx(self, idx: int) -> int:
+        """Returns the index of the left child node.
+
+        Args:
+            idx (int): Index of the parent node.
+
+        Returns:
+            int: Index of the left child node.
+        """
+        return idx * 2
+
+    def right_child_idx(self, idx: int) -> int:
+        """Returns the index of the right child node.
+
+        Args:
+            idx (int): Index of the parent node.
+
+        Returns:
+            int: Index of the right child node.
+        """
+        return idx * 2 + 1
+    
+    def child_present(self, idx: int) -> bool:
+        """Check if the given node index has at least one 
+        child (specifically, the left child's presence).
+
+        Args:
+            idx (int): Index of the parent node.
+
+        Returns:
+            bool: Returns True if the left child exists, otherwise False.
+        """
+        return self.left_child_idx(idx) <= self.count
+
+    def add(self, element: object) -> None:
+        """Adds a new element to the heap list and restores the heap property.
+
+        Args:
+            element (object): The element to be added to the heap list.
+
+        Returns:
+            None
+        """
+        self.count += 1
+        self.heap_list.append(element)
+        self.heapify_up()
+    
+    def heapify_up(self) -> None:
+        """Restores the max-heap property by moving the last 
+        element up to its correct position.
+        """
+        idx = self.count
+        while self.parent_idx(idx) > 0:
+            parent_idx = self.parent_idx(idx)
+            if self.heap_list[parent_idx] < self.heap_list[idx]:
+                self.heap_list[parent_idx], self.heap_list[idx] = self.heap_list[idx], self.heap_list[parent_idx]
+                idx = parent_idx
+            else:
+                break
+    
+    def retrieve_max(self) -> object:
+        """Removes the heap elements to restore the max-heap property 
+        and returns the maximum element from the heap.
+
+        Returns:
+            object: The maximum element, or None if the heap is empty.
+        """
+        if self.count == 0:
+            return None
+        max_value = self.heap_list[1]
+        self.heap_list[1] = self.heap_list[self.count]
+        self.count -= 1
+        self.heap_list.pop()
+        self.heapify_down()
+        return max_value
+
+    def heapify_down(self) -> None:
+        """Moves the top element to its correct position to maintain heap property.
+        """
+        idx = 1
+        while self.child_present(idx):
+            larger_child_idx = self.get_larger_child_idx(idx)
+            if self.heap_list[idx] < self.heap_list[larger_child_idx]:
+                self.heap_list[idx], self.heap_list[larger_child_idx] = self.heap_list[larger_child_idx], self.heap_list[idx]
+                idx = larger_child_idx
+            else:
+                break
+
+    def get_larger_child_idx(self, idx: int) -> int:
+        """Returns the index of the larger child node.
+
+        Args:
+            idx (int): Index of the parent node.
+
+        Returns:
+            int: Index of the child with the larger value.
+        """
+        if self.right_child_idx(idx) > self.count:
+            return self.left_child_idx(idx)
+        else:
+            left_child = self.heap_list[self.left_child_idx(idx)]
+            right_child = self.heap_list[self.right_child_idx(idx)]
+
+        if left_child > right_child:
+            return self.left_child_idx(idx)
+        else:
+            return self.right_child_idx(idx)
+
+    def get_largest_four(self) -> list:
+        """Returns the top four largest elements in the heap without modifying the original heap.
+
+        Returns:
+            list: A list of up to four largest elements in descending order.
+        """
+        if self.count == 0:
+            return []
+
+        temp_heap = MaxHeap()
+        temp_heap.heap_list = self.heap_list[:]
+        temp_heap.count = self.count
+
+        largest = []
+        for _ in range(min(4, self.count)):
+            largest.append(temp_heap.retrieve_max())
+        return largest
+#ID: 5671165
+
+#ID: 5671165
+class Queue:
+    """Fixed size queue implementation using a ring buffer.
+        
+    The slots are allocated once and a head index points at the newest
+    card, so adding a card overwrites the oldest one instead of shifting
+    the list. Index 0 is the newest card, like the front of the queue.
+    The queue also keeps the sum of the card numbers and how many of the
+    newest cards share the newest card's color, so the Watcher checks on
+    the whole window are O(1).
+    
+    Attributes:
+        size (int): The maximum number of elements in the queue.
+        slots (List[Card | None]): The preallocated slots of the ring buffer.
+        head (int): The slot of the newest card.
+        count (int): The number of cards in the queue.
+        number_total (int): The sum of the numbers of the cards in the queue.
+        color_run (int): How many of the newest cards share the color of the newest card.
+    """
+    def __init__(self, size: int) -> None:
+        """Initialise queue attributes with a fixed size.
+
+        Args:
+            size (int): The Card objects the queue countains.
+        """
+        self.size: int = size
+        self.slots: list = [None] * size
+        self.head: int = -1
+        self.count: int = 0
+        self.number_total: int = 0
+        self.color_run: int = 0
+
+    def enqueue(self, card) -> None:
+        """Add a Card object to the front of the queue.
+
+        If the queue is full of cards, the first object intered the queue
+        is removed before inserting the new one.
+
+        Args:
+            card: The Card object needs to be added in the queue.
+        """
+        newest = self.slots[self.head] if self.count else None
+        self.head = (self.head + 1) % self.size
+        if self.count == self.size:
+            self.number_total -= self.slots[self.head].number
+        else:
+            self.count += 1
+        self.slots[self.head] = card
+        self.number_total += card.number
+
+        if newest is not None and newest.color_code == card.color_code:
+            self.color_run = min(self.color_run + 1, self.count)
+        else:
+            self.color_run = 1
+
+    def last_share_color(self, k: int | None = None) -> bool:
+        """Checks if the k newest cards all have the same color.
+
+        Args:
+            k (int | None): The number of cards to check, the whole window if None.
+
+        Returns:
+            bool: True if the queue holds at least k cards and the newest k share a color.
+        """
+        if k is None:
+            k = self.size
+        return self.count >= k and self.color_run >= k
+
+    def clear(self) -> None:
+        """Remove all Card objects from the queue.
+        """
+        for i in range(self.size):
+            self.slots[i] = None
+        self.head = -1
+        self.count = 0
+        self.number_total = 0
+        self.color_run = 0
+
+    def copy(self) -> "Queue":
+        """Returns a copy of the queue holding the same Card objects.
+
+        Returns:
+            Queue: The copy.
+        """
+        queue = Queue.__new__(Queue)
+        queue.size = self.size
+        queue.slots = list(self.slots)
+        queue.head = self.head
+        queue.count = self.count
+        queue.number_total = self.number_total
+        queue.color_run = self.color_run
+        return queue
+
+    def __getitem__(self, index: int):
+        """Method that gits Card object index from the queue.
+
+        Args:
+            index (int): The index of the Card object needs to be found, 0 is the newest.
+
+        Returns:
+            The Card object at that index.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("queue index out of range")
+        return self.slots[(self.head - index) % self.size]
+
+    def __len__(self) -> int:
+        """Method to get the length of a queue.
+
+        Returns:
+            The length of the queue.
+        """
+        return self.count
+#ID: 5671165
+
+#ID: 5671165
+#Shuffling algorithm
+def shuffle(array: list, rng=random) -> list:
+    """Shuffles the cards inside the deck in place using the Fisher-Yates algorithm.
+    
+    Args:
+        array (list): The list of unshuffled deck of cards.
+        rng: The random generator, a `random.Random` or the global random module.
+        
+    Returns:
+        list: The shuffled deck of cards as a list.
+    """
+    for i in range(len(array) - 1, 0, -1):
+        j = rng.randint(0, i)
+        # Swap the card at index i with a random card at index j
+        array[i], array[j] = array[j], array[i]
+    return array
+#ID: 5671165
+
+#ID: 5671165
+#Check if a list or cards objects has a regular cards
+def has_regular(cards: list[Card]) -> bool:
+    """Checks whether the given list of cards contains any regular cards.
+
+    A regular card is categorised by the attribute `card_type` equal to "regular".
+    This is used for the Wild card implementation.
+
+    Args:
+        cards (list[Card]): A list of Card objects to be checked.
+
+    Returns:
+        bool: True if at least one card is regular, otherwise False.
+    """
+    if isinstance(cards, (CardPile, Hand)):
+        return cards.has_regular()
+
+    for card in cards:
+        if card.type_code == REGULAR:
+            return True
+    return False
+#ID: 5671165
+
+#ID: 5671165
+class RegularCardIndex:
+    """Index of the regular cards of a pile grouped by their numbers.
+
+    The index is updated whenever a card is added to or removed from the pile,
+    so the largest regular cards needed by the Wild card are found 
+    in O(k) without scanning the pile. Reordering a pile does not change it.
+    A Card object is in at most one pile at a time, so cards are keyed by identity.
+
+    Attributes:
+        buckets (dict[int, dict[int, Card]]): Regular cards keyed by number, then by card identity.
+        numbers (list[int]): The numbers that have at least one card, in ascending order.
+        count (int): The number of regular cards in the pile.
+    """
+
+    def __init__(self) -> None:
+        """Initialises an empty index."""
+        self.buckets: dict = {}
+        self.numbers: list = []
+        self.count: int = 0
+
+    def add(self, card: Card) -> None:
+        """Adds a card to the index, non regular cards are ignored.
+
+        Args:
+            card (Card): The card added to the pile.
+        """
+        if card.type_code != REGULAR:
+            return
+        self.count += 1
+        bucket = self.buckets.get(card.number)
+        if bucket is None:
+            bucket = self.buckets[card.number] = {}
+            insort(self.numbers, card.number)
+        bucket[id(card)] = card
+
+    def extend(self, cards) -> None:
+        """Adds several cards to the index, like `add` with the numbers sorted once at the end.
+
+        Args:
+            cards: The cards added to the pile.
+        """
+        buckets = self.buckets
+        for card in cards:
+            if card.type_code != REGULAR:
+                continue
+            self.count += 1
+            bucket = buckets.get(card.number)
+            if bucket is None:
+                bucket = buckets[card.number] = {}
+            bucket[id(card)] = card
+        if len(self.numbers) != len(buckets):
+            self.numbers = sorted(buckets)
+
+    def remove(self, card: Card) -> None:
+        """Removes a card from the index, non regular cards are ignored.
+
+        Args:
+            card (Card): The card removed from the pile.
+        """
+        if card.type_code != REGULAR:
+            return
+        self.count -= 1
+        bucket = self.buckets[card.number]
+        del bucket[id(card)]
+        if not bucket:
+            del self.buckets[card.number]
+            self.numbers.remove(card.number)
+
+    def __iter__(self):
+        """Iterates over the indexed cards by ascending number, then in the order they were added."""
+        for number in self.numbers:
+            yield from self.buckets[number].values()
+
+    def clear(self) -> None:
+        """Removes every card from the index."""
+        self.buckets = {}
+        self.numbers = []
+        self.count = 0
+
+    def copy(self) -> "RegularCardIndex":
+        """Returns a copy of the index holding the same Card objects, in the same order."""
+        index = RegularCardIndex.__new__(RegularCardIndex)
+        index.buckets = {number: dict(bucket) for number, bucket in self.buckets.items()}
+        index.numbers = list(self.numbers)
+        index.count = self.count
+        return index
+
+    def largest(self, k: int) -> list:
+        """Returns the k largest regular cards.
+
+        Args:
+            k (int): The number of cards to return.
+
+        Returns:
+            list: Up to k cards in descending order of their numbers, cards with
+                equal numbers in the order they were added to the index. A MaxHeap
+                built from the same pile can order those differently.
+        """
+        largest = []
+        for number in reversed(self.numbers):
+            for card in self.buckets[number].values():
+                largest.append(card)
+                if len(largest) == k:
+                    return largest
+        return largest
+
+class CardPile:
+    """A pile of cards, used for the draw stack and the discard pile.
+
+    The top of the pile is the end of the `cards` list. Every change of the
+    pile goes through its methods, which keep its `RegularCardIndex` up to date.
+
+    A Card object is in at most one place of a game at a time (a hand, a pile
+    or the table), so a pile never holds the same object twice.
+    Cards can be removed from any position in constant time: the position of
+    each card is tracked by identity, and a removed card leaves a tombstone
+    (None) in the list, so the order of the other cards is preserved.
+    Tombstones are skipped when drawing from the top and the list is
+    compacted once more than half of it is tombstones. The positions are
+    only rebuilt when a card is removed after a reorder or a sort.
+
+    Attributes:
+        cards (list[Card | None]): The cards of the pile, the top card is the last one.
+        positions (dict[int, int] | None): Position in `cards` of each card, keyed by card
+            identity, None until it is needed after a reorder.
+        live (int): The number of cards in the pile, tombstones excluded.
+        tombstones (int): The number of tombstones in `cards`.
+        regular_index (RegularCardIndex): Index of the regular cards of the pile.
+        listener (Callable | None): Called with the pile after every change of its
+            number of cards, see `GameEngine.cards_changed`.
+    """
+
+    def __init__(self, cards=(), regular_cards=None) -> None:
+        """Initialises the pile with the given cards.
+
+        Args:
+            cards: The cards of the pile, the top card last.
+            regular_cards: The regular cards of the pile in the order of its index
+                (see `RegularCardIndex.__iter__`), the order of `cards` if None.
+                A restored pile then offers the Wild card choices in the same order.
+        """
+        self.regular_index = RegularCardIndex()
+        self.listener = None
+        self.reorder(list(cards))
+        self.regular_index.extend(self.cards if regular_cards is None else regular_cards)
+
+    def __len__(self) -> int:
+        """Returns the number of cards in the pile."""
+        return self.live
+
+    def __iter__(self):
+        """Iterates over the cards from the bottom to the top of the pile."""
+        if self.tombstones:
+            return (card for card in self.cards if card is not None)
+        return iter(self.cards)
+
+    def __getitem__(self, index: int) -> Card:
+        """Returns the card at the given position, -1 is the top card."""
+        if self.tombstones:
+            self.compact()
+        return self.cards[index]
+
+    def append(self, card: Card) -> None:
+        """Puts a card on top of the pile.
+
+        Args:
+            card (Card): The card to add.
+        """
+        if self.positions is not None:
+            self.positions[id(card)] = len(self.cards)
+        self.cards.append(card)
+        self.live += 1
+        self.regular_index.add(card)
+        if self.listener is not None:
+            self.listener(self)
+
+    def extend(self, cards) -> None:
+        """Puts several cards on top of the pile, in the given order.
+
+        Args:
+            cards: The cards to add.
+        """
+        for card in cards:
+            self.append(card)
+
+    def pop(self) -> Card:
+        """Removes and returns the top card of the pile.
+
+        Returns:
+            Card: The top card.
+        """
+        cards = self.cards
+        card = cards.pop()
+        while card is None:
+            self.tombstones -= 1
+            card = cards.pop()
+        if self.positions is not None:
+            del self.positions[id(card)]
+        self.live -= 1
+        self.regular_index.remove(card)
+        if self.listener is not None:
+            self.listener(self)
+        if self.tombstones > 16 and self.tombstones * 2 > len(cards):
+            self.compact()
+        return card
+
+    def remove(self, card: Card) -> bool:
+        """Removes a card from the pile in constant time, comparing by identity.
+
+        Args:
+            card (Card): The card to remove.
+
+        Returns:
+            bool: True if the card was in the pile.
+        """
+        cards = self.cards
+        if self.positions is None:
+            self.positions = {id(pile_card): i for i, pile_card in enumerate(cards) if pile_card is not None}
+        idx = self.positions.pop(id(card), None)
+        if idx is None:
+            return False
+
+        cards[idx] = None
+        self.tombstones += 1
+        self.live -= 1
+        self.regular_index.remove(card)
+        if self.listener is not None:
+            self.listener(self)
+        if self.tombstones > 16 and self.tombstones * 2 > len(cards):
+            self.compact()
+        return True
+
+    def replace(self, index: int, card: Card) -> Card:
+        """Puts a card in the place of the card at a position of the pile.
+
+        Args:
+            index (int): The position, 0 is the bottom card and -1 the top card.
+            card (Card): The card to put there.
+
+        Returns:
+            Card: The card that was at that position.
+        """
+        if self.tombstones:
+            self.compact()
+        cards = self.cards
+        if index < 0:
+            index += len(cards)
+        replaced = cards[index]
+        cards[index] = card
+        if self.positions is not None:
+            del self.positions[id(replaced)]
+            self.positions[id(card)] = index
+        self.regular_index.remove(replaced)
+        self.regular_index.add(card)
+        return replaced
+
+    def swap(self, i: int, j: int) -> None:
+        """Exchanges the cards at two positions of the pile, the index is not changed.
+
+        Args:
+            i (int): The first position, 0 is the bottom card and -1 the top card.
+            j (int): The second position.
+        """
+        if self.tombstones:
+            self.compact()
+        cards = self.cards
+        if i < 0:
+            i += len(cards)
+        if j < 0:
+            j += len(cards)
+        cards[i], cards[j] = cards[j], cards[i]
+        if self.positions is not None:
+            self.positions[id(cards[i])] = i
+            self.positions[id(cards[j])] = j
+
+    def compact(self) -> None:
+        """Removes the tombstones from the card list and updates the card positions."""
+        positions = self.positions
+        self.reorder([card for card in self.cards if card is not None])
+        if positions is not None:
+            for i, card in enumerate(self.cards):
+                positions[id(card)] = i
+            self.positions = positions
+
+    def reorder(self, cards: list) -> None:
+        """Replaces the order of the pile with the same cards in a new order.
+
+        Args:
+            cards (list[Card]): The cards of the pile in their new order, top card last.
+        """
+        self.cards = cards
+        self.positions = None
+        self.live = len(cards)
+        self.tombstones = 0
+
+    def sort_by_number(self) -> None:
+        """Sorts the pile in place in ascending order of the card numbers, keeping the order of equal cards."""
+        if self.tombstones:
+            self.compact()
+        if not is_sorted_by_number(self.cards):
+            self.cards.sort(key=card_number)
+            self.positions = None
+
+    def clear(self) -> None:
+        """Removes every card from the pile."""
+        self.reorder([])
+        self.regular_index.clear()
+        if self.listener is not None:
+            self.listener(self)
+
+    def copy(self) -> "CardPile":
+        """Returns a copy of the pile holding the same Card objects.
+
+        Cards are never changed once built, so piles of different engines
+        can share them. The listener is not copied.
+
+        Returns:
+            CardPile: The copy, with its own card list and index.
+        """
+        pile = CardPile.__new__(CardPile)
+        pile.listener = None
+        pile.cards = list(self.cards)
+        pile.positions = None if self.positions is None else dict(self.positions)
+        pile.live = self.live
+        pile.tombstones = self.tombstones
+        pile.regular_index = self.regular_index.copy()
+        return pile
+
+    def has_regular(self) -> bool:
+        """Returns True if the pile has at least one regular card."""
+        return self.regular_index.count > 0
+
+    def largest_regular(self, k: int) -> list:
+        """Returns the k largest regular cards of the pile.
+
+        Args:
+            k (int): The number of cards to return.
+
+        Returns:
+            list: Up to k cards in descending order of their numbers.
+        """
+        return self.regular_index.largest(k)
+#ID: 5671165
+
+#ID: 5672969
+# Hand of cards with counts by card type and color
+class Hand:
+    """The cards held by the player or the computer.
+
+    Behaves like the list the hands used to be (indexing, len, iteration,
+    append, pop and remove) and keeps the number of cards of each card
+    type and of the regular cards of each color up to date on every
+    change, so questions such as "is there a Watcher card in this hand?"
+    are O(1) however large the hand is.
+
+    Attributes:
+        cards (list[Card]): The cards of the hand in the order they were received.
+        type_counts (dict[int, int]): The number of cards of each card type code.
+        color_counts (dict[int, int]): The number of regular cards of each color code.
+        listener (Callable | None): Called with the hand after every change of its
+            cards, see `GameEngine.cards_changed`.
+    """
+
+    def __init__(self, cards=()) -> None:
+        """Initialises the hand with the given cards.
+
+        Args:
+            cards: The first cards of the hand.
+        """
+        self.cards: list = []
+        self.type_counts: dict = {}
+        self.color_counts: dict = {}
+        self.listener = None
+        for card in cards:
+            self.append(card)
+
+    def __len__(self) -> int:
+        """Returns the number of cards in the hand."""
+        return len(self.cards)
+
+    def __iter__(self):
+        """Iterates over the cards of the hand."""
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        """Returns the card at a position of the hand."""
+        return self.cards[index]
+
+    def add_to_counts(self, card: Card) -> None:
+        """Adds a card to the type and color counts."""
+        self.type_counts[card.type_code] = self.type_counts.get(card.type_code, 0) + 1
+        if card.type_code == REGULAR:
+            self.color_counts[card.color_code] = self.color_counts.get(card.color_code, 0) + 1
+
+    def remove_from_counts(self, card: Card) -> None:
+        """Removes a card from the type and color counts."""
+        self.type_counts[card.type_code] -= 1
+        if card.type_code == REGULAR:
+            self.color_counts[card.color_code] -= 1
+
+    def append(self, card: Card) -> None:
+        """Adds a card to the end of the hand.
+
+        Args:
+            card (Card): The card to add.
+        """
+        self.cards.append(card)
+        self.add_to_counts(card)
+        if self.listener is not None:
+            self.listener(self)
+
+    def pop(self, index: int = -1) -> Card:
+        """Removes and returns the card at the given position, the last one by default.
+
+        Args:
+            index (int): The position of the card.
+
+        Returns:
+            Card: The removed card.
+        """
+        card = self.cards.pop(index)
+        self.remove_from_counts(card)
+        if self.listener is not None:
+            self.listener(self)
+        return card
+
+    def remove(self, card: Card) -> None:
+        """Removes a card from the hand, comparing by identity.
+
+        Games of several decks have equal cards, the given object is the
+        one that leaves the hand.
+
+        Args:
+            card (Card): The card to remove.
+
+        Raises:
+            ValueError: If the card is not in the hand.
+        """
+        for i, hand_card in enumerate(self.cards):
+            if hand_card is card:
+                self.pop(i)
+                return
+        raise ValueError(f"{card} is not in the hand")
+
+    def clear(self) -> None:
+        """Removes every card from the hand."""
+        self.cards = []
+        self.type_counts = {}
+        self.color_counts = {}
+        if self.listener is not None:
+            self.listener(self)
+
+    def copy(self) -> "Hand":
+        """Returns a copy of the hand holding the same Card objects, without the listener."""
+        hand = Hand.__new__(Hand)
+        hand.listener = None
+        hand.cards = list(self.cards)
+        hand.type_counts = dict(self.type_counts)
+        hand.color_counts = dict(self.color_counts)
+        return hand
+
+    def count_type(self, type_code: int) -> int:
+        """Returns the number of cards of a card type code."""
+        return self.type_counts.get(type_code, 0)
+
+    def count_color(self, color_code: int) -> int:
+        """Returns the number of regular cards of a color code."""
+        return self.color_counts.get(color_code, 0)
+
+    def has_regular(self) -> bool:
+        """Returns True if the hand has at least one regular card."""
+        return self.type_counts.get(REGULAR, 0) > 0
+
+    def playable_count(self) -> int:
+        """Returns the number of cards that can be played, every card except Watcher cards."""
+        return len(self.cards) - self.type_counts.get(WATCHER, 0)
+
+    def index_of_type(self, type_code: int) -> int:
+        """Returns the position of the first card of a card type code.
+
+        The hand is only searched if the counts show such a card is held.
+
+        Args:
+            type_code (int): The card type code.
+
+        Returns:
+            int: The position of the card, -1 if the hand has no card of that type.
+        """
+        if not self.type_counts.get(type_code):
+            return -1
+        for i, card in enumerate(self.cards):
+            if card.type_code == type_code:
+                return i
+        return -1
+#ID: 5672969
+
+#ID: 5672969
+# Deck specification
+DEFAULT_COLORS = ["Red", "Blue", "Green", "Yellow"]
+DEFAULT_SPECIAL_CARDS = {
+    "wild": 1,
+    "watcher": 1,
+    "colorstorm": 1,
+    "ascendancy": 1,
+    "twopoints": 2,
+    "joker": 1,
+    "swap": 1,
+}
+
+class DeckSpec:
+    """Describes which cards make up the deck of a game.
+
+    The standard deck has the regular cards 1-10 in four colors and eight
+    special cards. Variants can use more colors, a larger number range,
+    other special card counts and several decks shuffled together.
+
+    Attributes:
+        colors (list[str]): The colors of the regular cards.
+        numbers (list[int]): The numbers of the regular cards in each color.
+        special_cards (dict[str, int]): How many cards of each special card type one deck has.
+        decks (int): How many copies of the deck are shuffled together.
+    """
+
+    def __init__(self, colors: list | None = None, numbers=range(1, 11),
+                 special_cards: dict | None = None, decks: int = 1) -> None:
+        """Initialises the deck specification.
+
+        Args:
+            colors (list[str] | None): The colors of the regular cards, the four standard colors if None.
+            numbers: The numbers of the regular cards in each color.
+            special_cards (dict[str, int] | None): Special card counts per deck, the standard ones if None.
+            decks (int): How many copies of the deck are shuffled together.
+
+        Raises:
+            ValueError: If a number or the number of colors does not fit in a card code.
+        """
+        self.colors: list = list(DEFAULT_COLORS if colors is None else colors)
+        self.numbers: list = list(numbers)
+        if any(not 0 <= number <= MAX_NUMBER for number in self.numbers):
+            raise ValueError(f"card numbers must be between 0 and {MAX_NUMBER}")
+        if len(set(self.colors)) > MAX_COLOR_CODE:
+            raise ValueError(f"a deck can have at most {MAX_COLOR_CODE} colors")
+        self.special_cards: dict = dict(DEFAULT_SPECIAL_CARDS if special_cards is None else special_cards)
+        self.decks: int = decks
+
+    @classmethod
+    def generate(cls, colors: int = 4, max_number: int = 10, decks: int = 1) -> "DeckSpec":
+        """Builds a deck specification from card counts, used for larger variants.
+
+        Colors after the four standard ones are named "Color5", "Color6" and so on.
+
+        Args:
+            colors (int): The number of colors.
+            max_number (int): The largest regular card number, numbers start at 1.
+            decks (int): How many copies of the deck are shuffled together.
+
+        Returns:
+            DeckSpec: The deck specification.
+        """
+        names = DEFAULT_COLORS[:colors] + [f"Color{i}" for i in range(len(DEFAULT_COLORS) + 1, colors + 1)]
+        return cls(names, range(1, max_number + 1), decks=decks)
+
+    def size(self) -> int:
+        """Returns the number of cards in the deck.
+
+        Returns:
+            int: The number of cards.
+        """
+        return self.decks * (len(self.colors) * len(self.numbers) + sum(self.special_cards.values()))
+
+    def build(self, card_factory=Card) -> list:
+        """Builds the unshuffled cards of the deck.
+
+        Args:
+            card_factory: The class used to build each card.
+
+        Returns:
+            list: The cards of the deck.
+        """
+        deck = []
+        for _ in range(self.decks):
+            # Add regular cards in deck list
+            for color in self.colors:
+                for number in self.numbers:
+                    deck.append(card_factory(color, number))
+
+            # Add special cards
+            for card_type, count in self.special_cards.items():
+                for _ in range(count):
+                    deck.append(card_factory("", 0, card_type))
+        return deck
+
+DEFAULT_DECK = DeckSpec()
+#ID: 5672969
+
+#ID: 5672969
+# Initialize the deck
+def init_deck(card_factory=Card, deck_spec: DeckSpec = DEFAULT_DECK, rng=random) -> list:
+    """Initializes the deck of cards.
+
+    Args:
+        card_factory: The class used to build each card.
+        deck_spec (DeckSpec): The cards that make up the deck.
+        rng: The random generator used to shuffle the deck.
+
+    Returns:
+        list: The shuffled deck of cards.
+    """
+    deck = deck_spec.build(card_factory)
+    shuffle(deck, rng)
+
+    return deck
+#ID: 5672969
+
+#ID: 5670726
+# Calculates points
+def calculate_points(player_card: Card, computer_card: Card,
+                       previous_player_card: Card = None,
+                       previous_computer_card: Card = None,
+                       winner: str = "") -> int:
+
+    """
+    Calculates total points for the round including any applicable bonus.
+
+    Parameters:
+        player_card (Card): The card played by the player.
+        computer_card (Card): The card played by the computer.
+        previous_player_card (Card): Previous card played by the player.
+        previous_computer_card (Card): Previous card played by the computer.
+        winner (str): Either "player" or "computer".
+
+    Returns:
+        int: Total points for the round.
+    """
+
+    total_points = player_card.number + computer_card.number
+
+    # Check for player's bonus
+    if winner == "player" and previous_player_card:
+        if player_card.number == previous_player_card.number:
+            total_points += 2
+
+    #check for computer's bonus
+    if winner == "computer" and previous_computer_card:
+        if computer_card.number == previous_computer_card.number:
+            total_points += 2
+
+    return total_points
+#ID: 5670726
+
+#ID: 5670726
+card_number = attrgetter("number")
+
+def quicksort(cards: list) -> list:
+    """
+    Sorts a lists of Cards objects in ascending order using Quicksort.
+
+    Cards with equal numbers come out in the reverse of their order in the
+    input, because the pivot goes after the equal cards that follow it.
+
+    Parameters:
+        cards (list of cards): The list of Card objects to sort.
+
+    Returns:
+        list: A new list of cards sorted by their numbers
+    """
+
+    if len(cards) <= 1:
+        return cards
+    else:
+        pivot = cards[0]
+        less = [card for card in cards[1:] if card.number <= pivot.number]
+        greater = [card for card in cards[1:] if card.number > pivot.number]
+        return quicksort(less) + [pivot] + quicksort(greater)
+
+def is_sorted_by_number(cards: list) -> bool:
+    """
+    Checks in one linear pass if a list of Card objects is in ascending order of their numbers.
+
+    Parameters:
+        cards (list of cards): The list of Card objects to check.
+
+    Returns:
+        bool: True if no card has a larger number than the card after it.
+    """
+    numbers = list(map(card_number, cards))
+    return all(map(le, numbers, islice(numbers, 1, None)))
+
+def sort_by_number(cards: list) -> list:
+    """
+    Sorts a list of Card objects in place in ascending order of their numbers.
+
+    Already sorted lists, such as a draw stack sorted by an earlier
+    Ascendancy, are detected in one linear pass and left untouched.
+    Otherwise the built-in Timsort is used: it is stable, iterative and
+    O(n log n) in the worst case, unlike the recursive quicksort which
+    degrades to O(n^2) on sorted input and exceeds the recursion limit on
+    large decks.
+
+    Cards with equal numbers keep their order, where quicksort reverses
+    them, so Ascendancy and Colorstorm leave equal cards in a different
+    order than the first version of the game and a seed does not replay
+    the same game as it did then.
+
+    Parameters:
+        cards (list of cards): The list of Card objects to sort.
+
+    Returns:
+        list: The same list, sorted by the numbers of the cards
+    """
+    if not is_sorted_by_number(cards):
+        cards.sort(key=card_number)
+    return cards
+
+def colorstorm_order(cards, rng=random) -> list:
+    """
+    Returns the cards grouped by color in a random color order, each color in ascending order of numbers.
+
+    Card numbers are small integers, so a bucket sort is used instead of
+    sorting each color group: one pass drops every card into the bucket of
+    its color and number, then the buckets are copied in the shuffled color
+    order and ascending number order into a single output list. This is
+    O(n) and keeps the order of equal cards. Colors are shuffled in the
+    order they first appear in the stack.
+
+    Parameters:
+        cards (list or CardPile): The cards of the draw stack, top card last.
+        rng: The random generator used to shuffle the colors.
+
+    Returns:
+        list: A new list with the cards in their Colorstorm order
+    """
+    buckets = {}
+    for card in cards: # Group cards by color and number
+        by_number = buckets.get(card.color_code)
+        if by_number is None:
+            by_number = buckets[card.color_code] = {}
+        bucket = by_number.get(card.number)
+        if bucket is None:
+            by_number[card.number] = [card]
+        else:
+            bucket.append(card)
+
+    color_order = list(buckets) # shuffle color groups randomly
+    shuffle(color_order, rng)
+
+    reordered = [None] * len(cards) # Rebuild the draw stack
+    position = 0
+    for color in color_order:
+        by_number = buckets[color]
+        for number in sorted(by_number):
+            bucket = by_number[number]
+            reordered[position:position + len(bucket)] = bucket
+            position += len(bucket)
+    return reordered
+#ID: 5670726
+
+#ID: 5670726
+# Resolution of a round with special cards
+class SpecialRule:
+    """How a round is resolved when a given pair of card types is played.
+
+    A rule is a list of effect steps and message templates, compiled once
+    per pair of card types into `SPECIAL_RULES`. The played cards are
+    discarded first, then each step is called as
+    step(game, player_card, computer_card) and may return the result message.
+    The message of the rule, if any, replaces the messages of the steps.
+
+    Attributes:
+        steps (tuple): The effect steps, in the order they are applied.
+        message (str | None): Template of the result message, formatted with the
+            played cards as `player` and `computer` (for example "{computer.number}").
+        fallback_message (str | None): The result message if neither the steps nor
+            the rule set one and the result message of the round is still empty.
+    """
+
+    __slots__ = ("steps", "message", "fallback_message")
+
+    def __init__(self, steps: tuple = (), message: str | None = None, fallback_message: str | None = None) -> None:
+        """Initialises the rule.
+
+        Args:
+            steps (tuple): The effect steps, in the order they are applied.
+            message (str | None): Template of the result message.
+            fallback_message (str | None): The result message if none was set.
+        """
+        self.steps: tuple = tuple(steps)
+        self.message: str | None = message
+        self.fallback_message: str | None = fallback_message
+#ID: 5670726
+
+#ID: 5672969, 5671165, 5670726
+# Game engine
+class GameEngine:
+    """Holds the complete state of one game and applies the game rules to it.
+
+    The engine owns the hands, the draw stack, the discard pile, the scores
+    and the Watcher histories that used to live in module globals of game.py.
+    It never touches pygame, so the pygame front end and headless
+    simulations share exactly the same rules.
+
+    Attributes:
+        card_factory: The class used to build the cards of the deck.
+        deck_spec (DeckSpec): The cards that make up the deck.
+        card_pool (list[Card] | None): The cards of the deck in build order, built by
+            the first deal and dealt again by every later game.
+        card_pool_source (tuple | None): The (card_factory, deck_spec) the pool was built from.
+        player_hand (Hand): Cards in the player's hand.
+        computer_hand (Hand): Cards in the computer's hand.
+        draw_stack (CardPile): Cards left to draw, the top card is the last one.
+        discard_pile (CardPile): Played and discarded cards.
+        player_score (int): The player's score.
+        computer_score (int): The computer's score.
+        game_state (int): The current state of the game state machine.
+        player_played_card (Card | None): The card played by the player this round.
+        computer_played_card (Card | None): The card played by the computer this round.
+        previous_player_card (Card | None): The player's card of the previous round.
+        previous_computer_card (Card | None): The computer's card of the previous round.
+        result_message (str): A message summarizing the round result.
+        played_card_message (str): Info about which cards were played.
+        top_four_cards (list[Card]): The cards offered to the player by a Wild card.
+        player_used_wild (bool): True if the player's card was chosen with a Wild card.
+        last_player_wild_choice (Card | None): The card the player chose with a Wild card.
+        draw_stack_reordered (bool): True if Colorstorm or Ascendancy reordered the draw stack
+            in the round being resolved.
+        watcher_window (int): The number of cards in the Watcher histories.
+        seed_rng (random.Random): The generator the seed of each new game is drawn from.
+        game_seed (int | None): The seed of the current game, recorded when the cards are dealt.
+        rng (random.Random): The generator of every random choice of the current game.
+        recorder (gamelog.GameRecorder | None): Records the games to a binary log if set.
+        computer_strategy (ai.SearchAI | None): Chooses the computer's cards if set,
+            `auto_play_card` chooses them randomly if None.
+        player_auto_played (bool): True while a round whose player card was chosen by
+            `auto_play_card` is resolved, so the log can tell it from a person's choice.
+        player_card_history (Queue): The last cards played by the player.
+        computer_card_history (Queue): The last cards played by the computer.
+        leftover_points (int): Points of the last processed leftover card.
+        watcher_message (str): Message about Watcher cards triggered this round.
+        rounds_played (int): Number of rounds played by `play_round` this game.
+        special_card_counts (Counter): How often each special card was played or triggered
+            in rounds played by `play_round` this game.
+        watched_cards (tuple): The hands and draw stack whose change events the engine
+            listens to, (player hand, computer hand, draw stack).
+        game_over_pending (bool): Whether a hand or the draw stack changed since the
+            last evaluation of `check_game_over`.
+    """
+
+    def __init__(self, card_factory=Card, deck_spec: DeckSpec = DEFAULT_DECK, watcher_window: int = 2,
+                 seed: int | None = None) -> None:
+        """Initialises an engine with empty hands and piles.
+
+        Args:
+            card_factory: The class used to build the cards of the deck.
+            deck_spec (DeckSpec): The cards that make up the deck.
+            watcher_window (int): How many of the opponent's last cards must share a color
+                to trigger a Watcher card.
+            seed (int | None): The seed the seeds of the games are drawn from, taken from
+                the operating system if None.
+        """
+        self.card_factory = card_factory
+        self.deck_spec = deck_spec
+        self.watcher_window = watcher_window
+        self.card_pool = None
+        self.card_pool_source = None
+
+        # Random generators, nothing in the engine uses the global random module
+        self.seed_rng = random.Random(seed)
+        self.game_seed: int | None = None
+        self.rng = random.Random()
+
+        # Optional game log and computer strategy
+        self.recorder = None
+        self.player_auto_played: bool = False
+        self.computer_strategy = None
+
+        # Game variables
+        self.player_hand = Hand()
+        self.computer_hand = Hand()
+        self.draw_stack = CardPile()
+        self.discard_pile = CardPile()
+        self.player_score: int = 0
+        self.computer_score: int = 0
+        self.game_state: int = SELECTING_CARD
+
+        # Played cards
+        self.player_played_card = None
+        self.computer_played_card = None
+        self.previous_player_card = None
+        self.previous_computer_card = None
+        self.result_message: str = ""
+        self.played_card_message: str = ""
+
+        # Wild card variables
+        self.top_four_cards: list = []
+        self.player_used_wild: bool = False
+        self.last_player_wild_choice = None
+
+        # Special card variables
+        self.draw_stack_reordered: bool = False
+
+        # Watcher card variables
+        self.player_card_history = None
+        self.computer_card_history = None
+        self.leftover_points: int = 0
+        self.watcher_message: str = ""
+
+        # Headless statistics
+        self.rounds_played: int = 0
+        self.special_card_counts: Counter = Counter()
+
+        # Game over detection
+        self.watched_cards: tuple = (None, None, None)
+        self.game_over_pending: bool = True
+
+    #ID: 5672969
+    # Start a new game
+    def new_game(self, seed: int | None = None) -> None:
+        """Deals a new game and resets every round and Watcher variable.
+
+        Args:
+            seed (int | None): The seed of the game, see `deal_cards`.
+
+        Returns:
+            None
+        """
+        self.deal_cards(seed)
+        self.initialise_watcher_history()
+        self.game_state = SELECTING_CARD
+        self.player_played_card = None
+        self.computer_played_card = None
+        self.previous_player_card = None
+        self.previous_computer_card = None
+        self.player_used_wild = False
+        self.last_player_wild_choice = None
+        self.leftover_points = 0
+        self.result_message = ""
+        self.played_card_message = ""
+        self.watcher_message = ""
+        self.rounds_played = 0
+        self.special_card_counts = Counter()
+
+    # Cards of the deck
+    def deck_cards(self) -> list:
+        """Returns the unshuffled cards of the deck, reusing the Card objects of the previous games.
+
+        The deck is built once per card factory and deck spec. Every card of
+        a game comes from it and cards are immutable, so when the next game
+        is dealt the cards of the hands, piles and played cards are all
+        collected back by taking the pool again, in build order, which keeps
+        the shuffle of a seed the same as with a newly built deck.
+        A deck spec changed in place after the first deal is not seen,
+        assign a new DeckSpec instead.
+
+        Returns:
+            list: A new list of the cards of the pool.
+        """
+        source = self.card_pool_source
+        if self.card_pool is None or source[0] is not self.card_factory or source[1] is not self.deck_spec:
+            self.card_pool = self.deck_spec.build(self.card_factory)
+            self.card_pool_source = (self.card_factory, self.deck_spec)
+        return list(self.card_pool)
+
+    # Deal cards
+    def deal_cards(self, seed: int | None = None) -> None:
+        """Deals the cards to the player and computer.
+        
+        This method initializes the game by dealing cards to both the player
+        and computer, resetting scores, and preparing the draw stack and discard pile.
+        The cards of the previous game are shuffled again, see `deck_cards`.
+        The random generator of the game is reseeded first and the seed is
+        recorded in `game_seed`, so dealing again with the same seed and
+        making the same choices replays the game exactly.
+
+        Args:
+            seed (int | None): The seed of the game, drawn from `seed_rng` if None.
+        
+        Returns:
+            None
+        """
+        if seed is None:
+            seed = self.seed_rng.getrandbits(64)
+        self.game_seed = seed
+        self.rng.seed(seed)
+
+        # Reset scores when starting a new game
+        self.player_score = 0
+        self.computer_score = 0
+        
+        self.draw_stack = CardPile(shuffle(self.deck_cards(), self.rng))
+        self.player_hand = Hand(self.draw_stack.pop() for _ in range(5))
+        self.computer_hand = Hand(self.draw_stack.pop() for _ in range(5))
+        self.discard_pile = CardPile()
+        self.top_four_cards = []
+
+        if self.recorder is not None:
+            self.recorder.record_game_start(self)
+    #ID: 5672969
+
+    #ID: 5671165
+    #Adds a card to the discard pile
+    def discard_card(self, card: Card) -> None:
+        """Adds a Card instance to the discard pile.
+
+        Args:
+            card (Card): The card instance to be added to the discard pile.
+
+        Returns:
+            None
+        """
+        self.discard_pile.append(card)
+
+    #Give the player one card
+    def player_draw_card(self) -> None:
+        """Draws one card from the draw stack and assigns it to the player.
+
+        This method takes the top card from the draw stack and appends it to
+        the player's hand.
+
+        Returns:
+            None
+        """
+        if self.draw_stack:
+            self.player_hand.append(self.draw_stack.pop())
+
+    #Give the computer one card
+    def computer_draw_card(self) -> None:
+        """Draws one card from the draw stack and assigns it to the computer.
+
+        This method takes the top card from the draw stack and appends it to
+        the computer's hand.
+
+        Returns:
+            None
+        """
+        if self.draw_stack:
+            self.computer_hand.append(self.draw_stack.pop())
+
+    #Calculate leftover cards
+    def process_leftover_card(self, card: Card, owner: str) -> None:
+        """Processes a leftover card at the end of the game and calculates their scores.
+
+        This method calculates the point of a leftover card based on its type 
+        and gives it to the appropriate player (player or computer). 
+        The card is then added to the discard pile. 
+
+        Args:
+            card (Card): The leftover card to process.
+            owner (str): The owner of the card "player" or "computer".
+
+        Returns:
+            None
+        """
+        if card.card_type == "regular":
+            self.leftover_points = card.number
+        elif card.card_type in ("wild", "watcher", "joker"):
+            self.leftover_points = 10
+        elif card.card_type in ("colorstorm", "ascendancy", "swap"):
+            self.leftover_points = 0
+        elif card.card_type in ("twopoints", "twopoints2"):
+            self.leftover_points = 2
+        if owner == "player":
+            self.player_score += self.leftover_points
+        else:
+            self.computer_score += self.leftover_points
+
+        self.discard_pile.append(card)
+    #ID: 5671165
+
+    #ID: 5672969
+    # Change events of the hands and draw stack
+    def cards_changed(self, cards) -> None:
+        """Listener of the hands and the draw stack, marks the game over check as pending.
+
+        Args:
+            cards (Hand | CardPile): The hand or pile that changed.
+
+        Returns:
+            None
+        """
+        self.game_over_pending = True
+
+    def watch_cards(self) -> None:
+        """Listens to the change events of the current hands and draw stack.
+
+        Hands and piles can be replaced by assignment (a new deal, a Swap
+        card, a copied or restored game), so the engine subscribes to the
+        new ones and marks the check as pending when they are not the
+        ones it listens to. The replaced ones are unsubscribed, so a hand
+        or pile kept from an earlier game no longer reaches the engine.
+
+        Returns:
+            None
+        """
+        cards = (self.player_hand, self.computer_hand, self.draw_stack)
+        watched = self.watched_cards
+        if cards[0] is watched[0] and cards[1] is watched[1] and cards[2] is watched[2]:
+            return
+        for hand_or_pile in watched:
+            if (hand_or_pile is not None and hand_or_pile.listener == self.cards_changed
+                    and not any(hand_or_pile is current for current in cards)):
+                hand_or_pile.listener = None
+        for hand_or_pile in cards:
+            hand_or_pile.listener = self.cards_changed
+        self.watched_cards = cards
+        self.game_over_pending = True
+
+    def check_game_over(self) -> None:
+        """Checks the end of the game and processes leftover cards.
+
+        This method checks if the game has ended according to:
+        - One card remains between both hands.
+        - Both players have one card remaining, and at least one is a Watcher card.
+        - No cards in the draw stack or either hand.
+
+        The conditions only depend on the hands and the draw stack, so they
+        are only evaluated again after one of them published a change event.
+
+        Returns:
+            None
+        """
+        self.watch_cards()
+        if not self.game_over_pending:
+            return
+        self.game_over_pending = False
+
+        player_hand = self.player_hand
+        computer_hand = self.computer_hand
+        game_state = self.game_state
+
+        #One card remains between both hands
+        if len(player_hand) == 1 and len(computer_hand) == 0:
+            self.result_message = "Game ended with 1 leftover card."
+            self.played_card_message = self.played_cards_info()
+            self.process_leftover_card(player_hand.pop(), "player")
+            self.game_state = LAST_ROUND
+
+        elif len(computer_hand) == 1 and len(player_hand) == 0:
+            self.result_message = "Game ended with 1 leftover card."
+            self.played_card_message = self.played_cards_info()
+            self.process_leftover_card(computer_hand.pop(), "computer")
+            self.game_state = LAST_ROUND
+
+        #Both players have one card remaining, and at least one is a Watcher card
+        elif len(player_hand) == 1 and len(computer_hand) == 1:
+            if player_hand[0].card_type == "watcher":
+                self.result_message = "Game ended with 2 leftover cards."
+                self.played_card_message = self.played_cards_info()
+                self.process_leftover_card(player_hand.pop(), "player")
+                self.process_leftover_card(computer_hand.pop(), "computer")
+                self.game_state = LAST_ROUND
+
+            elif computer_hand[0].card_type == "watcher":
+                self.result_message = "Game ended with 2 leftover cards."
+                self.played_card_message = self.played_cards_info()
+                self.process_leftover_card(computer_hand.pop(), "computer")
+                self.process_leftover_card(player_hand.pop(), "player")
+                self.game_state = LAST_ROUND
+
+        #No cards in the draw stack or either hand
+        elif len(self.draw_stack) == 0 and len(player_hand) == 0 and len(computer_hand) == 0:
+            self.result_message = "Game ended. No cards left to play or draw."
+            self.game_state = LAST_ROUND
+
+        if self.game_state == LAST_ROUND and self.recorder is not None:
+            self.recorder.record_game_end(self, game_state)
+    #ID: 5672969
+
+    def played_cards_info(self) -> str:
+        """Returns the message naming the cards played this round."""
+        return f"Player played: {self.player_played_card} | Computer played: {self.computer_played_card}"
+
+    #ID: 5671165
+    #Initialize Watcher queues
+    def initialise_watcher_history(self) -> None:
+        """Initialise history queues for Watcher card.
+
+        Build fixed size queues to track the last `watcher_window` cards played
+        by both the player and the computer (two in the standard rules). These
+        histories are used by the Watcher card logic. 
+
+        Returns:
+            None
+        """
+        self.player_card_history = Queue(self.watcher_window)
+        self.computer_card_history = Queue(self.watcher_window)
+
+    def watcher_bonus(self, history: Queue) -> int:
+        """Returns the points of a triggered Watcher card.
+
+        The bonus is the average number of the watched cards, rounded up.
+
+        Args:
+            history (Queue): The card history watched by the Watcher card.
+
+        Returns:
+            int: The bonus points.
+        """
+        return (history.number_total + len(history) - 1) // len(history)
+
+    # Wild card logic implementation
+    def wild_card_logic(self) -> None:
+        """Selects the top four regular cards for the wild card effect.
+
+        This method chooses a pile (draw stack or discard pile) when 
+        the Wild card is played based on regular card availability.
+        The regular card index of the pile gives the four largest 
+        values from regular cards.
+        These cards are stored in the attribute `top_four_cards`, 
+        which will be shown to the player
+        when a wild card is played.
+        """
+        source = self.draw_stack if self.draw_stack.has_regular() else self.discard_pile
+
+        self.top_four_cards = source.largest_regular(4)
+
+    # Player chooses one of the Wild card options
+    def choose_wild_card(self, card: Card) -> None:
+        """Sets the card chosen by the player with the Wild card as the player's played card.
+
+        The card is taken out of the draw stack or discard pile it was offered from.
+
+        Args:
+            card (Card): One of the cards in `top_four_cards`.
+
+        Returns:
+            None
+        """
+        # Set the selected card as the player played card
+        self.player_played_card = card
+        # Track the player's Wild card selection for info
+        self.last_player_wild_choice = card
+        # Mark that the player used the Wild card
+        self.player_used_wild = True
+        self.top_four_cards.remove(card)
+        # Takes the chosen card out of the pile it was offered from
+        if not self.draw_stack.remove(card):
+            self.discard_pile.remove(card)
+        self.game_state = WAITING_FOR_COMPUTER
+    #ID: 5671165
+
+    #ID: 5672969, 5671165
+    # Pick a card to play from a hand
+    def auto_play_card(self, hand: Hand) -> tuple[Card | None, bool]:
+        """Randomly selects a card to play from the given hand.
+
+        A random card is chosen from the hand, ignoring Watcher cards.
+        If a wild card is selected, it is played and discarded.
+        One of the largest four regular cards of the draw stack or discard pile
+        is then chosen randomly, using the regular card index of the pile, and
+        taken out of that pile. That card is returned as the played card.
+
+        Args:
+            hand (Hand): The hand to play from, the chosen card is removed from it.
+
+        Returns:
+            tuple[Card | None, bool]: Contains:
+                - The selected Card object.
+                - A boolean indicator to tell whether the card was chosen as a result of using the Wild card (True), 
+                or from the hand (False).
+        """
+        if not hand:
+            return None, False
+        
+        if not hand.playable_count():
+            return None, False
+
+        #Filter the hand only if Watcher card in hand
+        if hand.count_type(WATCHER):
+            card = self.rng.choice(list(filter(lambda card: card.type_code != WATCHER, hand)))
+        else:
+            card = self.rng.choice(hand)
+        hand.remove(card)
+
+        #ID: 5671165
+        if card.card_type == "wild":
+            # Play and discard the wild card
+            self.discard_card(card)
+
+            # Choose source pile(draw stack or discard pile) based on regular card availability
+            source = self.draw_stack if self.draw_stack.has_regular() else self.discard_pile
+
+            # Find the largest four cards
+            largest_four = source.largest_regular(4)
+            if not largest_four:
+                return None, False
+            
+            # Take the chosen card out of its pile
+            chosen_card = self.rng.choice(largest_four)
+            source.remove(chosen_card)
+            return chosen_card, True
+        #ID: 5671165
+
+        return card, False 
+
+    # Play a chosen card from a hand
+    def play_card_by_code(self, hand: Hand, code: int, wild_choice: int = 0) -> tuple[Card | None, bool]:
+        """Plays the card of a hand with the given code, like `auto_play_card` with a chosen card.
+
+        Args:
+            hand (Hand): The hand to play from, the card is removed from it.
+            code (int): The code of the card to play, see `Card.code`.
+            wild_choice (int): For a Wild card, the code of the chosen card among the
+                largest four regular cards of the draw stack or discard pile.
+
+        Returns:
+            tuple[Card | None, bool]: The played Card object and whether it was chosen with a Wild card.
+
+        Raises:
+            ValueError: If the hand has no card with that code or the Wild card choice is not offered.
+        """
+        card = hand.pop([hand_card.code for hand_card in hand].index(code))
+        if card.type_code != WILD:
+            return card, False
+
+        self.discard_card(card)
+        source = self.draw_stack if self.draw_stack.has_regular() else self.discard_pile
+        largest_four = source.largest_regular(4)
+        if not largest_four:
+            return None, False
+
+        for chosen_card in largest_four:
+            if chosen_card.code == wild_choice:
+                source.remove(chosen_card)
+                return chosen_card, True
+        raise ValueError(f"Card {wild_choice} is not offered by the Wild card")
+
+    # Computer plays a card
+    def computer_play_card(self) -> tuple[Card | None, bool]:
+        """Computer selects a card to play.
+
+        The computer's strategy chooses the card if one is set, see `ai.SearchAI`.
+        Otherwise the computer randomly selects a card from the computer's hand,
+        see `auto_play_card` for the Wild and Watcher card handling.
+
+        Returns:
+            tuple[Card | None, bool]: The selected Card object and whether it was chosen with a Wild card.
+        """
+        if self.computer_strategy is not None:
+            return self.computer_strategy.choose(self)
+        return self.auto_play_card(self.computer_hand)
+    #ID: 5672969, 5671165
+
+    #ID: 5670726
+    # Effects of the special cards, the steps of a SpecialRule
+    def special_two_points_player(self, player_card: Card, computer_card: Card) -> None:
+        """Two points card of the player: the player gets 2 points."""
+        self.player_score += 2
+
+    def special_two_points_computer(self, player_card: Card, computer_card: Card) -> None:
+        """Two points card of the computer: the computer gets 2 points."""
+        self.computer_score += 2
+
+    def special_joker_player(self, player_card: Card, computer_card: Card) -> None:
+        """Joker of the player: the number of the computer's regular card, 5 points for a special card."""
+        self.player_score += computer_card.number if computer_card.card_type == "regular" else 5
+
+    def special_joker_computer(self, player_card: Card, computer_card: Card) -> None:
+        """Joker of the computer: the number of the player's regular card, 5 points for a special card."""
+        self.computer_score += player_card.number if player_card.card_type == "regular" else 5
+
+    def special_swap(self, player_card: Card, computer_card: Card) -> None:
+        """Swap card: both sides draw a card, then the hands are exchanged."""
+        if self.draw_stack:
+            self.player_draw_card()
+        if self.draw_stack:
+            self.computer_draw_card()
+        self.player_hand, self.computer_hand = self.computer_hand, self.player_hand
+
+    def special_colorstorm_or_ascendancy(self, player_card: Card, computer_card: Card) -> str:
+        """Colorstorm and Ascendancy played together: one of them is randomly chosen and applied."""
+        if len(self.draw_stack) < 3:
+            return "Not enough cards in the draw stack to activate special card."
+        if self.rng.choice(["colorstorm", "ascendancy"]) == "colorstorm":
+            self.draw_stack.reorder(colorstorm_order(self.draw_stack, self.rng))
+        else:
+            self.draw_stack.sort_by_number()
+        self.draw_stack_reordered = True
+        return "Colorstorm and Ascendancy played! One card is activated, but it's a mystery."
+
+    def special_colorstorm(self, player_card: Card, computer_card: Card) -> str:
+        """Colorstorm card: the draw stack is reordered by color."""
+        if len(self.draw_stack) < 3:
+            return "Colorstorm played! There is no enough cards to reorder in the draw stack"
+        self.draw_stack.reorder(colorstorm_order(self.draw_stack, self.rng))
+        self.draw_stack_reordered = True
+        return "Colorstorm played! Draw stack reordered by color"
+
+    def special_ascendancy(self, player_card: Card, computer_card: Card) -> str:
+        """Ascendancy card: the draw stack is sorted in ascending order of the numbers."""
+        if len(self.draw_stack) < 2:
+            return "Ascendancy played! There is no enough cards to sort the draw stack"
+        self.draw_stack.sort_by_number()
+        self.draw_stack_reordered = True
+        return "Ascendancy played! Draw stack is sorted in ascending order"
+    #ID: 5670726
+
+    #ID: 5670726
+    # Evaluate the round
+    def resolve_round(
+        self,
+        computer_used_wild: bool = False,
+        player_used_wild: bool = False,
+        player_wild_card: Card | None = None
+    ) -> tuple[list[Card], str, str]:
+        """Handles a single round of the game.
+
+          Compares player and computer cards.
+          Applies scoring and bonus logic.
+          Updates the discard pile, game state, and tracks previously played cards.
+
+        Args:
+            computer_used_wild (bool): True if the computer played the Wild card.
+            player_used_wild (bool): True if the player played the Wild card.
+            player_wild_card (Card): The card selected by the player using the Wild card.
+
+        Returns:
+            tuple:
+                 discard_pile (CardPile): The updated discard pile.
+                 result_message (str): A message summarizing the round result.
+                 played_info (str): Detailed info about which cards were played.
+        """
+        player_played_card = self.player_played_card
+        computer_played_card = self.computer_played_card
+        player_score, computer_score = self.player_score, self.computer_score
+        player_bonus = computer_bonus = 0
+        self.draw_stack_reordered = False
+
+        self.watcher_message = ""
+
+        if not player_played_card or not computer_played_card: # Check if both player played a card
+            self.record_round(computer_used_wild, player_used_wild, player_score, computer_score)
+            return self.discard_pile, self.result_message, "No cards played."
+        
+        played_info = f"Player played: {player_played_card}" # Show the cards played
+        if player_used_wild and player_wild_card:
+            played_info += f" (using Wild card)"
+
+        played_info += f" | Computer played: {computer_played_card}" # Show the cards played
+        if computer_used_wild:
+            played_info += " (using Wild card)"
+
+        #Track last played cards for Watcher implementation
+        self.player_card_history.enqueue(player_played_card)
+        self.computer_card_history.enqueue(computer_played_card)
+
+        #Player Watcher card watching computer history
+        if self.computer_card_history.last_share_color():
+            i = self.player_hand.index_of_type(WATCHER)
+            if i >= 0:
+                bonus = player_bonus = self.watcher_bonus(self.computer_card_history)
+                self.player_score += bonus
+                self.watcher_message += f"Player's Watcher triggered! +{bonus} points."
+                self.discard_card(self.player_hand.pop(i))
+                self.player_draw_card()
+
+        #Computer Watcher card watching computer history
+        if self.player_card_history.last_share_color():
+            i = self.computer_hand.index_of_type(WATCHER)
+            if i >= 0:
+                bonus = computer_bonus = self.watcher_bonus(self.player_card_history)
+                self.computer_score += bonus
+                self.watcher_message += f"Computer's Watcher triggered! +{bonus} points."
+                self.discard_card(self.computer_hand.pop(i))
+                self.computer_draw_card()
+
+        # Special cards are resolved by the rule of the pair of played card types
+        rule = special_rule(player_played_card.type_code, computer_played_card.type_code)
+        if rule is not None:
+            self.discard_card(player_played_card)
+            self.discard_card(computer_played_card)
+
+            for step in rule.steps:
+                message = step(self, player_played_card, computer_played_card)
+                if message is not None:
+                    self.result_message = message
+            if rule.message is not None:
+                self.result_message = rule.message.format(player=player_played_card, computer=computer_played_card)
+            elif rule.fallback_message is not None and not self.result_message:
+                self.result_message = rule.fallback_message
+
+            draw_order = ["player", "computer"]
+            draw_order = shuffle(draw_order, self.rng) # Makes drawing cards order random
+            for who in draw_order:
+                if self.draw_stack:
+                    if who == "player" and len(self.player_hand) < 5:
+                        self.player_draw_card()
+                    elif who == "computer" and len(self.computer_hand) < 5:
+                        self.computer_draw_card()
+
+            self.record_round(computer_used_wild, player_used_wild, player_score, computer_score,
+                              player_bonus, computer_bonus, self.draw_stack_reordered)
+            return self.discard_pile, self.result_message, played_info
+
+        # Comparing numbers if colors match
+        if player_played_card.color_code == computer_played_card.color_code:
+            if player_played_card.number > computer_played_card.number:
+                winner = "player"
+            elif player_played_card.number < computer_played_card.number:
+                winner = "computer"
+            else:
+                winner = "tie"
+
+            if winner != "tie":
+                points = calculate_points(player_played_card, computer_played_card, 
+                                          self.previous_player_card, self.previous_computer_card, winner=winner)
+                if winner == "player":
+                    self.player_score += points
+                else:
+                    self.computer_score += points
+                round_message = f"{winner.capitalize()} wins the round and gets {points} points!"
+            else:
+                round_message = "It's a tie! No points awarded."
+        else:
+            round_message = "Colours don't match! No points awarded."
+
+        #Illustrate Watcher card message if executed
+        if self.watcher_message:
+            self.result_message += " " + self.watcher_message
+
+        self.result_message += round_message
+
+        # Move played cards to discard pile
+        self.discard_card(player_played_card)
+        self.discard_card(computer_played_card)
+
+        # Draw new cards 
+        if self.draw_stack and len(self.player_hand) < 5:
+            self.player_draw_card()
+        if self.draw_stack and len(self.computer_hand) < 5:
+            self.computer_draw_card()
+
+        # The round is logged before a game end is
+        self.record_round(computer_used_wild, player_used_wild, player_score, computer_score,
+                          player_bonus, computer_bonus)
+        self.check_game_over()
+
+        self.previous_player_card = player_played_card
+        self.previous_computer_card = computer_played_card
+
+        return self.discard_pile, self.result_message, played_info
+    #ID: 5670726
+
+    #ID: 5672969
+    # Log the round
+    def record_round(self, computer_used_wild: bool, player_used_wild: bool, player_score: int,
+                     computer_score: int, player_bonus: int = 0, computer_bonus: int = 0,
+                     draw_stack_reordered: bool = False) -> None:
+        """Writes the resolved round to the game log if a recorder is attached.
+
+        Args:
+            computer_used_wild (bool): True if the computer played the Wild card.
+            player_used_wild (bool): True if the player played the Wild card.
+            player_score (int): The player's score before the round.
+            computer_score (int): The computer's score before the round.
+            player_bonus (int): The points of the player's triggered Watcher card.
+            computer_bonus (int): The points of the computer's triggered Watcher card.
+            draw_stack_reordered (bool): True if Colorstorm or Ascendancy reordered the draw stack.
+
+        Returns:
+            None
+        """
+        if self.recorder is None:
+            return
+        self.recorder.record_round(self, self.player_auto_played, player_used_wild, computer_used_wild,
+                                   draw_stack_reordered, self.player_score - player_score,
+                                   self.computer_score - computer_score, player_bonus, computer_bonus)
+    #ID: 5672969
+
+    #ID: 5672969
+    # Play one round without a display
+    def play_round(self) -> bool:
+        """Plays one complete round with both sides choosing their cards automatically.
+
+        This method follows the same steps as the pygame main loop: the game over
+        check before the player selects a card, the player's play (including the
+        Wild card choice), the computer's play and the round resolution.
+        The player side uses the same random strategy as the computer.
+
+        Returns:
+            bool: True if a round was played, False if the game is over.
+        """
+        self.check_game_over()
+        if self.game_state in (LAST_ROUND, GAME_OVER):
+            return False
+
+        # A hand with no playable card (only Watcher cards) can never be played out
+        if not self.player_hand.playable_count():
+            self.end_with_leftovers()
+            return False
+
+        self.player_played_card = None
+        self.computer_played_card = None
+        self.result_message = ""
+
+        self.player_auto_played = True
+        player_card, used_wild = self.auto_play_card(self.player_hand)
+        self.player_played_card = player_card
+        self.player_used_wild = used_wild
+        self.last_player_wild_choice = player_card if used_wild else None
+
+        computer_card, computer_used_wild = self.computer_play_card()
+        self.computer_played_card = computer_card
+        _, _, self.played_card_message = self.resolve_round(computer_used_wild, self.player_used_wild,
+                                                            self.last_player_wild_choice)
+        self.player_used_wild = False
+        self.last_player_wild_choice = None
+        self.player_auto_played = False
+        self.count_special_cards(player_card, computer_card, used_wild, computer_used_wild)
+        return True
+
+    # Track special cards for simulation statistics
+    def count_special_cards(self, player_card: Card | None, computer_card: Card | None,
+                            player_used_wild: bool, computer_used_wild: bool) -> None:
+        """Adds the special cards of the last round to `special_card_counts`.
+
+        Args:
+            player_card (Card | None): The card played by the player.
+            computer_card (Card | None): The card played by the computer.
+            player_used_wild (bool): True if the player's card was chosen with a Wild card.
+            computer_used_wild (bool): True if the computer's card was chosen with a Wild card.
+
+        Returns:
+            None
+        """
+        self.rounds_played += 1
+        for card in (player_card, computer_card):
+            if card is not None and card.card_type != "regular":
+                self.special_card_counts[card.card_type] += 1
+        self.special_card_counts["wild"] += player_used_wild + computer_used_wild
+        self.special_card_counts["watcher"] += self.watcher_message.count("Watcher triggered")
+
+    # End a game that can not continue
+    def end_with_leftovers(self) -> None:
+        """Ends the game by processing every card left in both hands as leftover cards.
+
+        Returns:
+            None
+        """
+        game_state = self.game_state
+        while self.player_hand:
+            self.process_leftover_card(self.player_hand.pop(), "player")
+        while self.computer_hand:
+            self.process_leftover_card(self.computer_hand.pop(), "computer")
+        self.result_message = "Game ended. No playable cards left."
+        self.game_state = LAST_ROUND
+        if self.recorder is not None:
+            self.recorder.record_game_end(self, game_state)
+
+    def copy_state(self, other: "GameEngine") -> None:
+        """Copies the state of the game of another engine into this one.
+
+        The hands, piles and Watcher histories are copied and share their
+        Card objects with the other engine, which is cheap enough for a
+        search to copy the game before every simulated future. The random
+        generators, the recorder and the computer strategy are not copied.
+
+        Args:
+            other (GameEngine): The engine holding the game to copy, it must use the same deck.
+
+        Returns:
+            None
+        """
+        self.watcher_window = other.watcher_window
+        self.game_seed = other.game_seed
+        self.player_hand = other.player_hand.copy()
+        self.computer_hand = other.computer_hand.copy()
+        self.draw_stack = other.draw_stack.copy()
+        self.discard_pile = other.discard_pile.copy()
+        self.player_score = other.player_score
+        self.computer_score = other.computer_score
+        self.game_state = other.game_state
+
+        self.player_played_card = other.player_played_card
+        self.computer_played_card = other.computer_played_card
+        self.previous_player_card = other.previous_player_card
+        self.previous_computer_card = other.previous_computer_card
+        self.result_message = other.result_message
+        self.played_card_message = other.played_card_message
+
+        self.top_four_cards = list(other.top_four_cards)
+        self.player_used_wild = other.player_used_wild
+        self.last_player_wild_choice = other.last_player_wild_choice
+
+        if other.player_card_history is not None:
+            self.player_card_history = other.player_card_history.copy()
+            self.computer_card_history = other.computer_card_history.copy()
+        self.leftover_points = other.leftover_points
+        self.watcher_message = other.watcher_message
+
+        self.rounds_played = other.rounds_played
+        self.special_card_counts = Counter(other.special_card_counts)
+
+    def winner(self) -> str:
+        """Returns the winner according to the current scores.
+
+        Returns:
+            str: "player", "computer" or "tie".
+        """
+        if self.player_score > self.computer_score:
+            return "player"
+        elif self.computer_score > self.player_score:
+            return "computer"
+        return "tie"
+    #ID: 5672969
+#ID: 5672969, 5671165, 5670726
+
+#ID: 5670726
+# Special card rules of each pair of played card types
+def compile_special_rule(player_type: str, computer_type: str) -> SpecialRule | None:
+    """Compiles the rule of the standard special cards for a pair of played card types.
+
+    The rules score, name and deal the round like the if-chain of the first
+    version of `resolve_round`, with the steps in the same order so the
+    random generator is drawn from the same way. Only the draw stack order
+    of equal numbers differs: Colorstorm and Ascendancy sort with the stable
+    `sort_by_number`, where the first version's quicksort reordered them.
+
+    Args:
+        player_type (str): The card type played by the player.
+        computer_type (str): The card type played by the computer.
+
+    Returns:
+        SpecialRule | None: The rule, or None if neither card is a special card
+            and the round is resolved by comparing the cards.
+    """
+    types = (player_type, computer_type)
+    twopoints_player = player_type == "twopoints"
+    twopoints_computer = computer_type == "twopoints"
+    colorstorm_played = "colorstorm" in types
+    ascendancy_played = "ascendancy" in types
+    swap_player = player_type == "swap"
+    swap_computer = computer_type == "swap"
+
+    # A Joker cancels the other special cards, the player's Joker comes first
+    if player_type == "joker":
+        if computer_type == "regular":
+            return SpecialRule((GameEngine.special_joker_player,),
+                               "Player played joker and gets {computer.number} points!")
+        return SpecialRule((GameEngine.special_joker_player,),
+                           f"Player played joker and gets 5 points! {computer_type.capitalize()} is not activated")
+    if computer_type == "joker":
+        if player_type == "regular":
+            return SpecialRule((GameEngine.special_joker_computer,),
+                               "Computer played joker and gets {player.number} points!")
+        return SpecialRule((GameEngine.special_joker_computer,),
+                           f"computer played joker and gets 5 points! {player_type.capitalize()} is not activated")
+
+    steps = []
+    if twopoints_player:
+        steps.append(GameEngine.special_two_points_player)
+    if twopoints_computer:
+        steps.append(GameEngine.special_two_points_computer)
+    if swap_player or swap_computer:
+        steps.append(GameEngine.special_swap)
+    if colorstorm_played and ascendancy_played:
+        steps.append(GameEngine.special_colorstorm_or_ascendancy)
+    if colorstorm_played:
+        steps.append(GameEngine.special_colorstorm)
+    if ascendancy_played:
+        steps.append(GameEngine.special_ascendancy)
+    if not steps:
+        return None
+
+    # Messages of the combinations, the first one that applies is used
+    combinations = (
+        (twopoints_player and twopoints_computer, "Both players used Two points card! Each gets 2 points."),
+        (twopoints_player and colorstorm_played,
+         "Two points and Colorstorm Cards are played! Player gets 2 points and Draw stack is reordered"),
+        (twopoints_player and ascendancy_played,
+         "Two points and Ascendancy Cards are played! Player gets 2 points and Draw stack is sorted"),
+        (twopoints_computer and swap_player,
+         "Two points and Swap cards are played! Computer gets 2 points and hands are swapped"),
+        (swap_player and ascendancy_played, "Swap and Ascendancy are played! Draw stack is sorted and hands are swapped"),
+        (swap_player and colorstorm_played,
+         "Swap and Colorstorm are played! Draw stack is reordered and hands are swapped"),
+        (twopoints_computer and colorstorm_played,
+         "Two points and Colorstorm are played! Computer gets 2 points and draw stack is reordered"),
+        (twopoints_computer and ascendancy_played,
+         "Two points and Ascendancy are played! Computer gets 2 points and draw stack is sorted"),
+        (twopoints_player and swap_computer,
+         "Two points and Swap are Played! Player gets 2 points and hands are swapped"),
+        (swap_computer and ascendancy_played,
+         "Swap and Ascendancy are played! Draw stack is sorted and hands are swapped"),
+        (swap_computer and colorstorm_played,
+         "Swap and Colorstorm are played! Draw stack is reordered and hands are swapped"),
+        (twopoints_player, "Player used two points card and gets 2 points"),
+        (twopoints_computer, "Computer used two points card and gets 2 points"),
+    )
+    message = next((text for applies, text in combinations if applies), None)
+
+    fallback_message = None
+    if swap_player:
+        fallback_message = "Player used Swap! Hands have been exchanged"
+    elif swap_computer:
+        fallback_message = "Computer used Swap! Hands have been exchanged"
+    return SpecialRule(steps, message, fallback_message)
+
+# Rule of each (player type code, computer type code) pair, None for a round of compared cards
+SPECIAL_RULES: dict = {}
+
+def register_special_rule(player_type: str, computer_type: str, rule: SpecialRule | None) -> None:
+    """Sets the rule of a pair of played card types, replacing the compiled one.
+
+    A new special card is added by registering its rule against every card
+    type it can meet, on both sides, and giving it a count in the DeckSpec.
+
+    Args:
+        player_type (str): The card type played by the player.
+        computer_type (str): The card type played by the computer.
+        rule (SpecialRule | None): The rule, None to resolve the round by comparing the cards.
+    """
+    SPECIAL_RULES[(CARD_TYPE_CODES.code(player_type), CARD_TYPE_CODES.code(computer_type))] = rule
+
+def special_rule(player_type_code: int, computer_type_code: int) -> SpecialRule | None:
+    """Returns the rule of a pair of played card type codes.
+
+    The pairs of card types added after import, by new deck specs, are
+    compiled on their first lookup.
+
+    Args:
+        player_type_code (int): The type code of the player's card.
+        computer_type_code (int): The type code of the computer's card.
+
+    Returns:
+        SpecialRule | None: The rule, None if the round is resolved by comparing the cards.
+    """
+    key = (player_type_code, computer_type_code)
+    if key not in SPECIAL_RULES:
+        names = CARD_TYPE_CODES.names
+        SPECIAL_RULES[key] = compile_special_rule(names[player_type_code], names[computer_type_code])
+    return SPECIAL_RULES[key]
+
+def compile_special_rules() -> None:
+    """Compiles the rules of every pair of the card types known so far into `SPECIAL_RULES`."""
+    for player_type in CARD_TYPE_CODES.names:
+        for computer_type in CARD_TYPE_CODES.names:
+            register_special_rule(player_type, computer_type, compile_special_rule(player_type, computer_type))
+
+compile_special_rules()
+#ID: 5670726
+
+#ID: 5672969
+# Simulate a whole game without a display
+def simulate_game(engine: GameEngine | None = None, max_rounds: int = 1000, seed: int | None = None) -> GameEngine:
+    """Plays a complete game headlessly, both sides use the computer's strategy.
+
+    Args:
+        engine (GameEngine | None): The engine to play with, a new one is created if None.
+        max_rounds (int): Safety limit on the number of rounds.
+        seed (int | None): The seed of the game, drawn from the engine's seed generator if None.
+
+    Returns:
+        GameEngine: The engine holding the final state of the game.
+    """
+    if engine is None:
+        engine = GameEngine()
+    engine.new_game(seed)
+
+    for _ in range(max_rounds):
+        if not engine.play_round():
+            break
+    return engine
+#ID: 5672969
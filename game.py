@@ -1,34 +1,53 @@
 """
+Pygame front end for War of Colors.
+
+The game rules and state live in engine.py, this module draws the
+game and handles user input on top of a GameEngine instance.
+Importing it does not start pygame: `start` opens the window and loads
+the card images behind a splash screen the first time it is needed.
+
+Usage:
+    python game.py
+    python game.py --record games.log
+    python game.py --replay games.log --speed 4
+    python game.py --search-budget 0.05
+
 Libraries used:
 -pygame
+-argparse
 -os
--random
 -sys
 -time
--collections.defaultdict
+-concurrent.futures.ThreadPoolExecutor
+-engine
+-assets
+-gamelog
+-ai
 
 Data structures used:
 -List
 -Tuple
--Dictionary(defaultdict)
+-Dictionary(card image cache)
 -class
 
 Algorithms used:
--Fisher-Yates Shuffle algorithm
--Quicksort algorithm
--Max-Heap (custom class)
--Round Resolution Logic
+-Card Selection & Collision Detection
 -Game State Machine
 """
 
 import pygame
+import argparse
 import os
-import random
 import sys
 import time
-from collections import defaultdict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-pygame.init()
+import ai
+import assets
+import engine
+import gamelog
+from engine import SELECTING_CARD, WAITING_FOR_COMPUTER, SHOWING_RESULT, GAME_OVER, WILD_CARD, LAST_ROUND
 
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
@@ -36,6 +55,13 @@ CARD_WIDTH = 120
 CARD_HEIGHT = 180
 CARD_SPACING = 20
 
+# Frame loop settings
+FPS = 60  # Frame rate cap of the main loop
+IDLE_WAIT = True  # Sleep until the next event while nothing changes on screen
+COMPUTER_DELAY = 500  # Milliseconds before the computer plays its card
+COMPUTER_TURN_EVENT = pygame.USEREVENT + 1
+REPLAY_DELAY = 1000  # Milliseconds each replayed round stays on screen at speed 1
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -45,765 +71,469 @@ BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
-# Setting up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("War of Colors")
-
-# Game variables
-player_hand = []
-computer_hand = []
-draw_stack = []
-discard_pile = []
-player_score = 0
-computer_score = 0
-
-# Game state
-SELECTING_CARD = 0
-WAITING_FOR_COMPUTER = 1
-SHOWING_RESULT = 2
-GAME_OVER = 3
-WILD_CARD = 4
-LAST_ROUND = 5
-game_state = SELECTING_CARD
+# The display is set up by start(), importing this module does not open a window
+screen = None
 
 #ID: 5670726
-score_font = pygame.font.SysFont(None, 36)
-message_font = pygame.font.SysFont(None, 36)
-played_card_font = pygame.font.SysFont(None, 30)
-message = ""
-played_card_message = ""
-#ID: 5670726
-
-# Played cards
-player_played_card = None
-computer_played_card = None
+# Font registry
+class FontRegistry:
+    """Registry of the fonts used by the game, each size is looked up only once.
 
-#ID: 5670726
-previous_player_card = None
-previous_computer_card = None
-result_message = ""
-#ID: 5670726
-
-#ID: 5671165
-# Wild card global variables
-top_four_cards = []
-player_used_wild = False
-last_player_wild_choice = None
-#ID: 5671165
+    Attributes:
+        fonts (dict[int, pygame.font.Font]): Loaded fonts keyed by size.
+    """
 
-#ID: 5671165
-# Watcher card global variables
-player_card_history = None
-computer_card_history = None
-leftover_points = 0
-watcher_message = ""
-#ID: 5671165
+    def __init__(self, sizes: tuple = ()) -> None:
+        """Initialises the registry and loads the fonts of the given sizes.
 
-# Card class
-#ID: 5672969, 5671165
-class Card:
-    def __init__(self, color, number, card_type="regular"):
-        """ Initializes the card with the given color, number, and card type"""
-        self.color = color
-        self.number = number
-        self.card_type = card_type  #regular, wild, watcher, colorstorm, ascendancy, add two points
-        self.selected = False
-        
-        # Load the image
-        if card_type == "wild":
-            self.image = pygame.image.load(os.path.join("CARDS", "WILD.png"))
-        elif card_type == "watcher":
-            self.image = pygame.image.load(os.path.join("CARDS", "WATCHER.png"))
-        elif card_type == "colorstorm":
-            self.image = pygame.image.load(os.path.join("CARDS", "COLORSTORM.png"))
-        elif card_type == "ascendancy":
-            self.image = pygame.image.load(os.path.join("CARDS", "ASCENDANCY.png"))
-        elif card_type == "twopoints":
-            self.image = pygame.image.load(os.path.join("CARDS", "TWOPOINTS.png"))
-        elif card_type == "twopoints2":
-            self.image = pygame.image.load(os.path.join("CARDS", "TWOPOINTS2.png"))
-        elif card_type == "joker":
-            self.image = pygame.image.load(os.path.join("CARDS", "JOKER.png"))
-        elif card_type == "swap":
-            self.image = pygame.image.load(os.path.join("CARDS", "SWAP.png"))
-        else:
-            self.image = pygame.image.load(os.path.join("CARDS", f"{color[0]}{number}.png"))
-        
-        # Resize image
-        self.image = pygame.transform.scale(self.image, (CARD_WIDTH, CARD_HEIGHT))
-        self.back_image = pygame.image.load(os.path.join("CARDS", "BACK.png"))
-        self.back_image = pygame.transform.scale(self.back_image, (CARD_WIDTH, CARD_HEIGHT))
-        
-        self.rect = self.image.get_rect()
-    #ID: 5672969
-    # draw() method to draw the card
-    def draw(self, x, y, face_up=True):
-        """Draws the card at the specified position.
-        
         Args:
-            x: The x-coordinate where the card should be drawn.
-            y: The y-coordinate where the card should be drawn.
-            face_up: Whether the card should be drawn face up or face down.
-            
-        Returns:
-            None
+            sizes (tuple): Font sizes to load right away, the other sizes are loaded on first use.
         """
-        self.rect.x = x
-        self.rect.y = y
-        
-        #Draw highlight if card is selected
-        if self.selected:
-            pygame.draw.rect(screen, BLUE, (x - 5, y - 5, CARD_WIDTH + 10, CARD_HEIGHT + 10), 3)
-        
-        #Draw the card image
-        if face_up:
-            screen.blit(self.image, (x, y))
-        else:
-            pygame.draw.rect(screen, BLACK, (x - 2, y - 2, CARD_WIDTH + 4, CARD_HEIGHT + 4), border_radius=12)
-            screen.blit(self.back_image, (x, y))
-    
-    def __str__(self):
-        if self.card_type == "regular":
-            return f"{self.color} {self.number}"
-        else:
-            return self.card_type.capitalize()
-    #ID: 5672969
+        self.fonts: dict = {}
+        for size in sizes:
+            self.get(size)
+
+    def get(self, size: int) -> pygame.font.Font:
+        """Returns the default font in the given size, loading it on first use.
 
-    #ID: 5671165
-    #Comparison methods needed for MaxHeap
-    def __lt__(self, other: object) -> bool:
-        """Less than method to compare cards according to their number.
+        The font module is initialised by the first lookup. The default font
+        is opened directly, which is what `pygame.font.SysFont(None, size)`
+        returns after scanning all the system fonts.
 
         Args:
-            other (object): Another card to compare with.
+            size (int): The font size.
 
         Returns:
-            bool: True if self is less than other, otherwise False.
+            pygame.font.Font: The font.
         """
-        if not isinstance(other, Card):
-            return NotImplemented
+        font = self.fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+# Text surface cache
+class TextCache:
+    """Least recently used cache of rendered text surfaces.
+
+    Surfaces are keyed by (font, text, color), so labels that do not
+    change are rendered once and blitted from the cache afterwards.
+    When the cache is full the least recently used surface is evicted.
 
-        if self.number < other.number:
-            return True
-        else:
-            return False
+    Attributes:
+        max_size (int): The maximum number of cached surfaces.
+        surfaces (OrderedDict): Rendered surfaces, least recently used first.
+        hits (int): Number of texts answered from the cache.
+        misses (int): Number of texts that had to be rendered.
+    """
 
-    def __gt__(self, other: object) -> bool:
-        """Greater than method to compare cards according to their number.
+    def __init__(self, max_size: int = 256) -> None:
+        """Initialises an empty cache.
 
         Args:
-            other (object): Another card to compare with.
-
-        Returns:
-            bool: True if self is greater than other, otherwise False.
+            max_size (int): The maximum number of cached surfaces.
         """
-        if not isinstance(other, Card):
-            return NotImplemented
+        self.max_size: int = max_size
+        self.surfaces: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
 
-        if self.number > other.number:
-            return True
-        else:
-            return False
-
-    def __eq__(self, other: object) -> bool:
-        """Equality method to compare cards according to their color, number and card type.
+    def render(self, font: pygame.font.Font, text: str, color: tuple) -> pygame.Surface:
+        """Returns the rendered text, rendering it only if it is not cached.
 
         Args:
-            other (object): Another card to compare with.
+            font (pygame.font.Font): The font to render with.
+            text (str): The text to render.
+            color (tuple): The RGB color of the text.
 
         Returns:
-            bool: True if all attributes are equal, otherwise False.
+            pygame.Surface: The antialiased text surface.
         """
-        if not isinstance(other, Card):
-            return False
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+fonts = FontRegistry()
+text_cache = TextCache()
+
+def render_text(size: int, text: str, color: tuple = WHITE) -> pygame.Surface:
+    """Renders text in the default font of the given size through the text cache.
 
-        if (self.color == other.color and 
-            self.number == other.number and 
-            self.card_type == other.card_type):
-            return True
-        else:
-            return False
-        
-    def __ne__(self, other: object) -> bool:
-        """Inequality method to compare cards according to their color, number and card type.
+    Args:
+        size (int): The font size.
+        text (str): The text to render.
+        color (tuple): The RGB color of the text.
 
-        Args:
-            other (object): Another card to compare with.
+    Returns:
+        pygame.Surface: The text surface.
+    """
+    return text_cache.render(fonts.get(size), text, color)
 
-        Returns:
-            bool: True if any attribute doesn't match, otherwise False.
-        """
-        if self.__eq__(other):
-            return False
-        else:
-            return True
-    #ID: 5671165
-#ID: 5672969, 5671165
+message = ""
+#ID: 5670726
 
-#ID: 5671165
-#MaxHeap Class
-class MaxHeap:
-    """A max-heap data structure implementation for storing 
-    cards objects used for implementing Wild card.
+#ID: 5672969
+# Card image atlas
+class CardAtlas:
+    """Process-wide cache of the card images stored in the CARDS folder.
+
+    Every image file is decoded once, converted to the display pixel format
+    and scaled to CARD_WIDTH x CARD_HEIGHT the first time it is requested.
+    Later requests return the same Surface, so all Card instances share
+    their images by reference, including after the deck is dealt again.
 
-    This class adds elements to the MaxHeap list,
-    retrieves the largest element, and finds the top four largest values.
-    It uses a binary heap data structure that is stored in a list 
-    and starts at index 1.
+    If the image bundle built by assets.py exists, the images it holds are
+    wrapped over its memory-mapped pixels instead, they are already scaled
+    and nothing is decoded. The PNG files are only read for the images
+    that are not in the bundle.
 
     Attributes:
-        heap_list (List[Card]): The initial list that represents the heap.
-        count (int): Number of elements in the heap (excluding 0 index).
+        folder (str): The folder that contains the card image files.
+        bundle_path (str): The image bundle file.
+        bundle (assets.CardBundle | None): The open bundle, None if there is none.
+        bundle_opened (bool): Whether opening the bundle was tried already.
+        alpha_masks (tuple | None): The color masks of the display's per-pixel alpha format.
+        images (dict[str, pygame.Surface]): Scaled images keyed by file name.
+        hits (int): Number of requests answered from the cache.
+        misses (int): Number of requests that had to load the image file.
     """
 
-    def __init__(self) -> None:
-        """Initializes an empty max heap attributes with a
-        counter that starts at index 0.
-        """
-        self.heap_list: list = [None]
-        self.count: int = 0
-
-    def parent_idx(self, idx: int) -> int:
-        """Returns the index of the parent node.
+    def __init__(self, folder: str = "CARDS", bundle_path: str = assets.DEFAULT_BUNDLE) -> None:
+        """Initialises an empty atlas for the given image folder.
 
         Args:
-            idx (int): Index of the child node.
+            folder (str): The folder that contains the card image files.
+            bundle_path (str): The image bundle file, it is opened on the first load.
+        """
+        self.folder: str = folder
+        self.bundle_path: str = bundle_path
+        self.bundle = None
+        self.bundle_opened: bool = False
+        self.alpha_masks = None
+        self.images: dict = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def open_bundle(self) -> assets.CardBundle | None:
+        """Returns the image bundle, opening it on the first call.
 
         Returns:
-            int: Index of the parent node.
+            assets.CardBundle | None: The bundle, or None if it does not exist
+                or its card size is not CARD_WIDTH x CARD_HEIGHT.
         """
-        return idx // 2
+        if not self.bundle_opened:
+            self.bundle = assets.open_bundle(self.bundle_path, (CARD_WIDTH, CARD_HEIGHT))
+            self.bundle_opened = True
+        return self.bundle
 
-    def left_child_idx(self, idx: int) -> int:
-        """Returns the index of the left child node.
+    def get(self, filename: str) -> pygame.Surface:
+        """Returns the scaled image for a file, loading it on the first request.
 
         Args:
-            idx (int): Index of the parent node.
+            filename (str): The image file name inside the atlas folder.
 
         Returns:
-            int: Index of the left child node.
+            pygame.Surface: The shared, display-ready card image.
         """
-        return idx * 2
+        image = self.images.get(filename)
+        if image is not None:
+            self.hits += 1
+            return image
 
-    def right_child_idx(self, idx: int) -> int:
-        """Returns the index of the right child node.
-
-        Args:
-            idx (int): Index of the parent node.
+        self.misses += 1
+        bundle = self.open_bundle()
+        if bundle is not None and filename in bundle:
+            return self.add_bundled(filename)
+        return self.add(filename, self.decode(filename))
 
-        Returns:
-            int: Index of the right child node.
-        """
-        return idx * 2 + 1
-    
-    def child_present(self, idx: int) -> bool:
-        """Check if the given node index has at least one 
-        child (specifically, the left child's presence).
+    def decode(self, filename: str) -> pygame.Surface:
+        """Decodes an image file of the atlas folder, this does not need the display.
 
         Args:
-            idx (int): Index of the parent node.
+            filename (str): The image file name inside the atlas folder.
 
         Returns:
-            bool: Returns True if the left child exists, otherwise False.
+            pygame.Surface: The image in the pixel format of the file.
         """
-        return self.left_child_idx(idx) <= self.count
+        return pygame.image.load(os.path.join(self.folder, filename))
 
-    def add(self, element: object) -> None:
-        """Adds a new element to the heap list and restores the heap property.
+    def add(self, filename: str, image: pygame.Surface) -> pygame.Surface:
+        """Converts a decoded image to the display pixel format, scales it and caches it.
 
         Args:
-            element (object): The element to be added to the heap list.
+            filename (str): The image file name inside the atlas folder.
+            image (pygame.Surface): The image returned by `decode`.
 
         Returns:
-            None
-        """
-        self.count += 1
-        self.heap_list.append(element)
-        self.heapify_up()
-    
-    def heapify_up(self) -> None:
-        """Restores the max-heap property by moving the last 
-        element up to its correct position.
+            pygame.Surface: The shared, display-ready card image.
         """
-        idx = self.count
-        while self.parent_idx(idx) > 0:
-            parent_idx = self.parent_idx(idx)
-            if self.heap_list[parent_idx] < self.heap_list[idx]:
-                self.heap_list[parent_idx], self.heap_list[idx] = self.heap_list[idx], self.heap_list[parent_idx]
-                idx = parent_idx
-            else:
-                break
-    
-    def retrieve_max(self) -> object:
-        """Removes the heap elements to restore the max-heap property 
-        and returns the maximum element from the heap.
+        if image.get_flags() & pygame.SRCALPHA:
+            image = image.convert_alpha()
+        else:
+            image = image.convert()
+        image = pygame.transform.scale(image, (CARD_WIDTH, CARD_HEIGHT))
+        self.images[filename] = image
+        return image
 
-        Returns:
-            object: The maximum element, or None if the heap is empty.
-        """
-        if self.count == 0:
-            return None
-        max_value = self.heap_list[1]
-        self.heap_list[1] = self.heap_list[self.count]
-        self.count -= 1
-        self.heap_list.pop()
-        self.heapify_down()
-        return max_value
-
-    def heapify_down(self) -> None:
-        """Moves the top element to its correct position to maintain heap property.
-        """
-        idx = 1
-        while self.child_present(idx):
-            larger_child_idx = self.get_larger_child_idx(idx)
-            if self.heap_list[idx] < self.heap_list[larger_child_idx]:
-                self.heap_list[idx], self.heap_list[larger_child_idx] = self.heap_list[larger_child_idx], self.heap_list[idx]
-                idx = larger_child_idx
-            else:
-                break
+    def add_bundled(self, filename: str) -> pygame.Surface:
+        """Wraps the image of a file held by the bundle and caches it.
 
-    def get_larger_child_idx(self, idx: int) -> int:
-        """Returns the index of the larger child node.
+        The Surface shares the pixels of the bundle mapping. It is only
+        converted, which copies it, if the display uses another alpha format.
 
         Args:
-            idx (int): Index of the parent node.
+            filename (str): The image file name inside the atlas folder.
 
         Returns:
-            int: Index of the child with the larger value.
+            pygame.Surface: The shared, display-ready card image.
         """
-        if self.right_child_idx(idx) > self.count:
-            return self.left_child_idx(idx)
-        else:
-            left_child = self.heap_list[self.left_child_idx(idx)]
-            right_child = self.heap_list[self.right_child_idx(idx)]
-
-        if left_child > right_child:
-            return self.left_child_idx(idx)
-        else:
-            return self.right_child_idx(idx)
-
-    def get_largest_four(self) -> list:
-        """Returns the top four largest elements in the heap without modifying the original heap.
-
-        Returns:
-            list: A list of up to four largest elements in descending order.
+        image = self.bundle.surface(filename)
+        if self.alpha_masks is None:
+            self.alpha_masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+        if image.get_masks() != self.alpha_masks:
+            image = image.convert_alpha()
+        self.images[filename] = image
+        return image
+
+    def missing(self) -> list:
+        """Returns the image files of the atlas folder that are not cached yet.
+
+        With a bundle the folder is not listed, the images that are not
+        in the bundle are only loaded when they are requested.
         """
-        if self.count == 0:
+        if self.open_bundle() is not None:
             return []
+        return [filename for filename in sorted(os.listdir(self.folder))
+                if filename.lower().endswith(".png") and filename not in self.images]
 
-        temp_heap = MaxHeap()
-        temp_heap.heap_list = self.heap_list[:]
-        temp_heap.count = self.count
-
-        largest = []
-        for _ in range(min(4, self.count)):
-            largest.append(temp_heap.retrieve_max())
-        return largest
-#ID: 5671165
-
-#ID: 5671165
-class Queue:
-    """Fixed size queue implementation using lists.
-        
-    This queue includes a method of adding and removing items from the object 
-    list of data at the same time according to queue properties and queue size. 
-    The class also includes methods for indexing, clearing queue data and 
-    extracting queue length.
-    
-    Attributes:
-        size (int): The maximum number of elements in the queue.
-        data (List[Card]): List to store queue data in.
-    """
-    def __init__(self, size: int) -> None:
-        """Initialise queue attributes with a fixed size.
+    def decode_all(self) -> dict:
+        """Decodes every image file that is not cached yet, see `decode`.
 
-        Args:
-            size (int): The Card objects the queue countains.
+        Returns:
+            dict[str, pygame.Surface]: The decoded images keyed by file name.
         """
-        self.size: int = size
-        self.data: list = []
+        return {filename: self.decode(filename) for filename in self.missing()}
 
-    def enqueue(self, card) -> None:
-        """Add a Card object to the front of the queue.
-
-        If the queue is full of cards, the first object intered the queue
-        is removed before inserting the new one.
+    def preload(self, decoded: dict | None = None) -> None:
+        """Loads every image of the bundle, or every image file of the atlas folder, into the cache.
 
         Args:
-            card: The Card object needs to be added in the queue.
+            decoded (dict | None): Images already returned by `decode_all`,
+                the files are decoded here if None.
         """
-        if len(self.data) >= self.size:
-            self.data.pop()
-        self.data.insert(0, card)
+        bundle = self.open_bundle()
+        if bundle is not None:
+            for filename in bundle.offsets:
+                if filename not in self.images:
+                    self.add_bundled(filename)
+        if decoded is None:
+            decoded = self.decode_all()
+        for filename, image in decoded.items():
+            if filename not in self.images:
+                self.add(filename, image)
 
     def clear(self) -> None:
-        """Remove all Card objects from the queue.
-        """
-        self.data = []
-
-    def __getitem__(self, index: int):
-        """Method that gits Card object index from the queue.
-
-        Args:
-            index (int): The index of the Card object needs to be found.
-
-        Returns:
-            The Card object at that index.
-        """
-        return self.data[index]
-
-    def __len__(self) -> int:
-        """Method to get the length of a queue.
-
-        Returns:
-            The length of the queue.
-        """
-        return len(self.data)
-#ID: 5671165
-
-#ID: 5671165
-#Shuffling algorithm
-def shuffle(array: list) -> list:
-    """Shuffles the cards inside the deck in place using the Fisher-Yates algorithm.
-    
-    Args:
-        array (list): The list of unshuffled deck of cards.
-        
-    Returns:
-        list: The shuffled deck of cards as a list.
-    """
-    for i in range(len(array) - 1, 0, -1):
-        j = random.randint(0, i)
-        # Swap the card at index i with a random card at index j
-        array[i], array[j] = array[j], array[i]
-    return array
-#ID: 5671165
-
-#ID: 5671165
-#Check if a list or cards objects has a regular cards
-def has_regular(cards: list[Card]) -> bool:
-    """Checks whether the given list of cards contains any regular cards.
-
-    A regular card is categorised by the attribute `card_type` equal to "regular".
-    This is used for the Wild card implementation.
-
-    Args:
-        cards (list[Card]): A list of Card objects to be checked.
-
-    Returns:
-        bool: True if at least one card is regular, otherwise False.
-    """
-    for card in cards:
-        if card.card_type == "regular":
-            return True
-    return False
-#ID: 5671165
-
+        """Removes all cached images and resets the hit and miss counters."""
+        self.images = {}
+        self.hits = 0
+        self.misses = 0
+
+card_atlas = CardAtlas()
+
+# Image file for each special card type, regular cards use "<color initial><number>.png"
+SPECIAL_CARD_IMAGES = {
+    "wild": "WILD.png",
+    "watcher": "WATCHER.png",
+    "colorstorm": "COLORSTORM.png",
+    "ascendancy": "ASCENDANCY.png",
+    "twopoints": "TWOPOINTS.png",
+    "twopoints2": "TWOPOINTS2.png",
+    "joker": "JOKER.png",
+    "swap": "SWAP.png",
+}
 #ID: 5672969
-# Initialize the deck
-def init_deck():
-    """ Initializes the deck of cards"""
-    deck = []
-    colors = ["Red", "Blue", "Green", "Yellow"]
-    
-    # Add regular cards (1-10 in each color) in deck list
-    for color in colors:
-        for number in range(1, 11):
-            deck.append(Card(color, number))
-    
-    # Add special cards
-    deck.append(Card("", 0, "wild"))
-    deck.append(Card("", 0, "watcher"))
-    deck.append(Card("", 0, "colorstorm"))
-    deck.append(Card("", 0, "ascendancy"))
-    deck.append(Card("", 0, "twopoints"))
-    deck.append(Card("", 0, "twopoints"))
-    deck.append(Card("", 0, "joker"))
-    deck.append(Card("", 0, "swap"))
-    
-    shuffle(deck)
 
-    return deck
+# Render state of the cards
 #ID: 5672969
+class CardViews:
+    """Keeps the render state of the engine cards outside the cards.
 
-#ID: 5671165
-#Adds a card to the discard pile
-def discard_card(card: Card) -> None:
-    """Adds a Card instance to the discard pile.
+    Engine cards only hold the rules data. The images of a card are looked
+    up by its face (type, color and number) in the card atlas, while its
+    on-screen rectangle and selection are kept here keyed by card identity.
 
-    Args:
-        card (Card): The card instance to be added to the discard pile.
-
-    Returns:
-        None
+    Attributes:
+        atlas (CardAtlas): The atlas the card images come from.
+        faces (dict[tuple, pygame.Surface]): The image of each card face.
+        rects (dict[int, pygame.Rect]): The last drawn position of each card, keyed by id(card).
+        selected (int | None): The id of the selected card of the player's hand.
     """
-    global discard_pile
-
-    discard_pile.append(card)
-#ID: 5671165
-
-#ID: 5671165
-#Give the player one card
-def player_draw_card() -> None:
-    """Draws one card from the draw stack and assigns it to the player.
 
-    This function takes the top card from the draw stack and appends it to
-    the player's hand.
+    def __init__(self, atlas: CardAtlas) -> None:
+        """Initialises empty render state for the cards.
 
-    Returns:
-        None
-    """
-    if draw_stack:
-        player_hand.append(draw_stack.pop())
-#ID: 5671165
+        Args:
+            atlas (CardAtlas): The atlas the card images come from.
+        """
+        self.atlas: CardAtlas = atlas
+        self.faces: dict = {}
+        self.rects: dict = {}
+        self.selected: int | None = None
 
-#ID: 5671165
-#Give the computer one card
-def computer_draw_card() -> None:
-    """Draws one card from the draw stack and assigns it to the computer.
+    def image(self, card: engine.Card) -> pygame.Surface:
+        """Returns the face up image of a card.
 
-    This function takes the top card from the draw stack and appends it to
-    the computer's hand.
+        Args:
+            card (engine.Card): The card.
 
-    Returns:
-        None
-    """
-    if draw_stack:
-        computer_hand.append(draw_stack.pop())
-#ID: 5671165
+        Returns:
+            pygame.Surface: The shared image of the card face.
+        """
+        face = (card.type_code, card.color_code, card.number)
+        image = self.faces.get(face)
+        if image is None:
+            if card.card_type in SPECIAL_CARD_IMAGES:
+                image = self.atlas.get(SPECIAL_CARD_IMAGES[card.card_type])
+            else:
+                image = self.atlas.get(f"{card.color[0]}{card.number}.png")
+            self.faces[face] = image
+        return image
 
-#ID: 5672969
-# Deal cards
-def deal_cards():
-    """Deals the cards to the player and computer.
-    
-    This function initializes the game by dealing cards to both the player
-    and computer, resetting scores, and preparing the draw stack and discard pile.
-    
-    Returns:
-        None
-    """
-    global player_hand, computer_hand, draw_stack, player_score, computer_score, discard_pile, top_four_cards
-    
-    # Reset scores when starting a new game
-    player_score = 0
-    computer_score = 0
-    
-    draw_stack = init_deck()
-    player_hand = [draw_stack.pop() for _ in range(5)]
-    computer_hand = [draw_stack.pop() for _ in range(5)]
-    discard_pile = []
-    top_four_cards = []
-#ID: 5672969
+    def back_image(self) -> pygame.Surface:
+        """Returns the face down image shared by all cards."""
+        return self.atlas.get("BACK.png")
 
-#ID: 5671165
-#Calculate leftover cards
-def process_leftover_card(card : Card, owner : str) -> None:
-    """Processes a leftover card at the end of the game and calculates their scores.
+    def rect(self, card: engine.Card) -> pygame.Rect:
+        """Returns the rectangle where a card was last drawn.
 
-    This function calculates the point of a leftover card based on its type 
-    and gives it to the appropriate player (player or computer). 
-    The card is then added to the discard pile. 
+        Args:
+            card (engine.Card): The card.
 
-    Args:
-        card (Card): The leftover card to process.
-        owner (str): The owner of the card "player" or "computer".
+        Returns:
+            pygame.Rect: The rectangle of the card, updated in place when it is drawn.
+        """
+        rect = self.rects.get(id(card))
+        if rect is None:
+            rect = self.rects[id(card)] = pygame.Rect(0, 0, CARD_WIDTH, CARD_HEIGHT)
+        return rect
 
-    Returns:
-        None
-    """
-    global player_score, computer_score, discard_pile, leftover_points, game_state
-
-    if card.card_type == "regular":
-        leftover_points = card.number
-    elif card.card_type in ("wild", "watcher", "joker"):
-        leftover_points = 10
-    elif card.card_type in ("colorstorm", "ascendancy", "swap"):
-        leftover_points = 0
-    elif card.card_type in ("twopoints", "twopoints2"):
-        leftover_points = 2
-    if owner == "player":
-        player_score += leftover_points
-    else:
-        computer_score += leftover_points
+    def is_selected(self, card: engine.Card) -> bool:
+        """Returns True if the card is the selected card."""
+        return self.selected == id(card)
 
-    discard_pile.append(card)
-#ID: 5671165
+    def select(self, card: engine.Card | None) -> None:
+        """Selects a card, or clears the selection if card is None."""
+        self.selected = None if card is None else id(card)
 
-#ID: 5672969
-def check_game_over() -> None:
-    """Checks the end of the game and processes leftover cards.
+    def clear(self) -> None:
+        """Resets the positions and selection of the cards of the previous game.
 
-    This function checks if the game has ended according to:
-    - One card remains between both hands.
-    - Both players have one card remaining, and at least one is a Watcher card.
-    - No cards in the draw stack or either hand.
+        The engine deals the same Card objects again in the next game, so
+        their rectangles are kept and moved back to the origin instead of
+        being allocated again.
+        """
+        for rect in self.rects.values():
+            rect.topleft = (0, 0)
+        self.selected = None
 
-    Returns:
-        None
-    """
-    global player_hand, computer_hand, game_state, result_message, played_card_message
-
-    #One card remains between both hands
-    if len(player_hand) == 1 and len(computer_hand) == 0:
-        result_message = "Game ended with 1 leftover card."
-        played_card_message = f"Player played: {player_played_card} | Computer played: {computer_played_card}"
-        process_leftover_card(player_hand.pop(), "player")
-        game_state = LAST_ROUND
-
-    elif len(computer_hand) == 1 and len(player_hand) == 0:
-        result_message = "Game ended with 1 leftover card."
-        played_card_message = f"Player played: {player_played_card} | Computer played: {computer_played_card}"
-        process_leftover_card(computer_hand.pop(), "computer")
-        game_state = LAST_ROUND
-
-    #Both players have one card remaining, and at least one is a Watcher card
-    elif len(player_hand) == 1 and len(computer_hand) == 1:
-        if player_hand[0].card_type == "watcher":
-            result_message = f"Game ended with 2 leftover cards."
-            played_card_message = f"Player played: {player_played_card} | Computer played: {computer_played_card}"
-            process_leftover_card(player_hand.pop(), "player")
-            process_leftover_card(computer_hand.pop(), "computer")
-            game_state = LAST_ROUND
-
-        elif computer_hand[0].card_type == "watcher":
-            result_message = f"Game ended with 2 leftover cards."
-            played_card_message = f"Player played: {player_played_card} | Computer played: {computer_played_card}"
-            process_leftover_card(computer_hand.pop(), "computer")
-            process_leftover_card(player_hand.pop(), "player")
-            game_state = LAST_ROUND
-
-    #No cards in the draw stack or either hand
-    elif len(draw_stack) == 0 and len(player_hand) == 0 and len(computer_hand) == 0:
-        result_message = "Game ended. No cards left to play or draw."
-        game_state = LAST_ROUND
+    #ID: 5672969
+    # Draw a card
+    def draw(self, card: engine.Card, x, y, face_up=True):
+        """Draws the card at the specified position.
+        
+        Args:
+            card: The card to draw.
+            x: The x-coordinate where the card should be drawn.
+            y: The y-coordinate where the card should be drawn.
+            face_up: Whether the card should be drawn face up or face down.
+            
+        Returns:
+            None
+        """
+        rect = self.rect(card)
+        rect.x = x
+        rect.y = y
+        
+        #Draw highlight if card is selected
+        if self.selected == id(card):
+            pygame.draw.rect(screen, BLUE, (x - 5, y - 5, CARD_WIDTH + 10, CARD_HEIGHT + 10), 3)
+        
+        #Draw the card image
+        if face_up:
+            screen.blit(self.image(card), (x, y))
+        else:
+            pygame.draw.rect(screen, BLACK, (x - 2, y - 2, CARD_WIDTH + 4, CARD_HEIGHT + 4), border_radius=12)
+            screen.blit(self.back_image(), (x, y))
+    
 #ID: 5672969
 
-#ID: 5671165
-#Initialize Watcher queues
-def initialise_watcher_history() -> None:
-    """Initialise history queues for Watcher card.
-
-    Build fixed size queues to track the last two cards played by both the
-    player and the computer. These histories are used by the Watcher card logic. 
-
-    Returns:
-        None
-    """
-    global player_card_history, computer_card_history
+card_views = CardViews(card_atlas)
 
-    player_card_history = Queue(2)
-    computer_card_history = Queue(2)
-#ID: 5671165
+# Game engine holding the game state and rules
+game_engine = engine.GameEngine()
 
 #ID: 5672969
 # Draw player's hand
 def draw_player_hand():
     """Draws the player's hand"""
     # Calculate the total width of all cards with spacing
-    total_width = len(player_hand) * CARD_WIDTH + (len(player_hand) - 1) * CARD_SPACING
+    total_width = len(game_engine.player_hand) * CARD_WIDTH + (len(game_engine.player_hand) - 1) * CARD_SPACING
     
     # Calculate the starting x position to center the cards
     start_x = (SCREEN_WIDTH - total_width) // 2
     
     # Draw each card
-    for i, card in enumerate(player_hand):
+    for i, card in enumerate(game_engine.player_hand):
         x = start_x + i * (CARD_WIDTH + CARD_SPACING)
         y = SCREEN_HEIGHT - CARD_HEIGHT - 50
-        card.draw(x, y, face_up=True)
+        card_views.draw(card, x, y, face_up=True)
 #ID: 5672969
 
 #ID: 5672969
 # Draw played cards
 def draw_played_cards():
     """Draws the played cards in the center of the screen"""
-    if player_played_card:
+    if game_engine.player_played_card:
         # Player's played card (left side)
         player_x = SCREEN_WIDTH // 2 - CARD_WIDTH - 30
         player_y = SCREEN_HEIGHT // 2 - CARD_HEIGHT // 2
-        player_played_card.draw(player_x, player_y, face_up=True)
+        card_views.draw(game_engine.player_played_card, player_x, player_y, face_up=True)
         
         # Display "Player's Card" text
-        font = pygame.font.SysFont(None, 30)
-        text = font.render("Player's Card", True, WHITE)
+        text = render_text(30, "Player's Card")
         screen.blit(text, (player_x + CARD_WIDTH // 2 - text.get_width() // 2, player_y - 30))
     
-    if computer_played_card:
+    if game_engine.computer_played_card:
         # Computer's played card (right side)
         computer_x = SCREEN_WIDTH // 2 + 30
         computer_y = SCREEN_HEIGHT // 2 - CARD_HEIGHT // 2
-        computer_played_card.draw(computer_x, computer_y, face_up=True)
+        card_views.draw(game_engine.computer_played_card, computer_x, computer_y, face_up=True)
         
         # Display "Computer's Card" text
-        font = pygame.font.SysFont(None, 30)
-        text = font.render("Computer's Card", True, WHITE)
+        text = render_text(30, "Computer's Card")
         screen.blit(text, (computer_x + CARD_WIDTH // 2 - text.get_width() // 2, computer_y - 30))
-    
-    # Draw result message if in SHOWING_RESULT state
-    if (game_state == SHOWING_RESULT or game_state == LAST_ROUND) and result_message:
-        font = pygame.font.SysFont(None, 36)
-        text = font.render(result_message, True, WHITE)
-        screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 + 100))
 #ID: 5672969
 
-#ID: 5672969, 5671165
-# Computer plays a card
-def computer_play_card() -> tuple[Card | None, bool]:
-    """Computer selects a card to play.
-
-    The computer randomly selects a card from the computer's hand.
-    If a wild card is selected, it is played and discarded.
-    The computer then uses the max-heap data structure to choose one of the
-    largest four regular cards from the draw stack or discard pile randomly.
-    That card is returned as the computer played card.
-    Also, it filters the cards if the Watcher card is in the computer hand. 
-    So the computer don't choose Watcher card.
-
-    Returns:
-        tuple[Card | None, bool]: Contains:
-            - The selected Card object.
-            - A boolean indicator to tell whether the card was chosen as a result of using the Wild card (True), 
-            or from computer hand (False).
-    """
-    global draw_stack
-
-    if not computer_hand:
-        return None, False
-    
-    #Filter computer hand if Watcher card in computer hand
-    playable_cards = list(filter(lambda card: card.card_type != "watcher", computer_hand))
-    if not playable_cards:
-        return None, False
-    
-    card = random.choice(playable_cards)
-    computer_hand.remove(card)
-
-    #ID: 5671165
-    if card.card_type == "wild":
-        # Play and discard the wild card
-        discard_card(card)
-
-        # Choose source list(draw stack or discard pile) based on regular card availability
-        source = draw_stack if has_regular(draw_stack) else discard_pile
-
-        # Build a max-heap list to find the largest four cards
-        heap = MaxHeap()
-        for card in source:
-            if card.card_type == "regular":
-                heap.add(card)
-
-        largest_four = heap.get_largest_four()
-        if not largest_four:
-            return None, False
-        
-        # Remove the chosen card from draw stack
-        chosen_card = random.choice(largest_four)
-        draw_stack[:] = list(filter(lambda card: card is not chosen_card, draw_stack))
-        return chosen_card, True
-    #ID: 5671165
-
-    return card, False 
-#ID: 5672969, 5671165
+#ID: 5672969
+# Draw result message
+def draw_result_message():
+    """Draws the result message of the round in the SHOWING_RESULT and LAST_ROUND states"""
+    if (game_engine.game_state == SHOWING_RESULT or game_engine.game_state == LAST_ROUND) and game_engine.result_message:
+        text = render_text(36, game_engine.result_message)
+        screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 + 100))
+#ID: 5672969
 
 #ID: 5672969
 # Draw the winner display
@@ -822,28 +552,26 @@ def draw_winner_display():
     screen.blit(overlay, (0, 0))
     
     # Draw game over message
-    font_large = pygame.font.SysFont(None, 72)
-    game_over_text = font_large.render("GAME OVER", True, WHITE)
+    game_over_text = render_text(72, "GAME OVER")
     screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 4))
     
     # Draw final scores
-    font = pygame.font.SysFont(None, 48)
-    scores_text = font.render(f"Final Score - Player: {player_score}  Computer: {computer_score}", True, WHITE)
+    scores_text = render_text(48, f"Final Score - Player: {game_engine.player_score}  Computer: {game_engine.computer_score}")
     screen.blit(scores_text, (SCREEN_WIDTH // 2 - scores_text.get_width() // 2, SCREEN_HEIGHT // 4 + 100))
     
     # Determine and display the winner
     winner_text = ""
-    if player_score > computer_score:
+    if game_engine.player_score > game_engine.computer_score:
         winner_text = "Player Wins!"
         text_color = BLUE
-    elif computer_score > player_score:
+    elif game_engine.computer_score > game_engine.player_score:
         winner_text = "Computer Wins!"
         text_color = RED
     else:
         winner_text = "It's a Tie!"
         text_color = YELLOW
     
-    winner_display = font_large.render(winner_text, True, text_color)
+    winner_display = render_text(72, winner_text, text_color)
     screen.blit(winner_display, (SCREEN_WIDTH // 2 - winner_display.get_width() // 2, SCREEN_HEIGHT // 4 + 200))
     
     # Draw play again button
@@ -854,331 +582,13 @@ def draw_winner_display():
     
     pygame.draw.rect(screen, GREEN, (button_x, button_y, button_width, button_height))
     
-    button_text = font.render("Play Again", True, WHITE)
+    button_text = render_text(48, "Play Again")
     screen.blit(button_text, (button_x + button_width // 2 - button_text.get_width() // 2, 
                            button_y + button_height // 2 - button_text.get_height() // 2))
     
     return pygame.Rect(button_x, button_y, button_width, button_height)
 #ID: 5672969
 
-#ID: 5670726
-# Calculates points
-def calculate_points(player_card: Card, computer_card: Card,
-                       previous_player_card: Card = None,
-                       previous_computer_card: Card = None,
-                       winner: str = "") -> int:
-
-    """
-    Calculates total points for the round including any applicable bonus.
-
-    Parameters:
-        player_card (Card): The card played by the player.
-        computer_card (Card): The card played by the computer.
-        previous_player_card (Card): Previous card played by the player.
-        previous_computer_card (Card): Previous card played by the computer.
-        winner (str): Either "player" or "computer".
-
-    Returns:
-        int: Total points for the round.
-    """
-
-    total_points = player_card.number + computer_card.number
-
-    # Check for player's bonus
-    if winner == "player" and previous_player_card:
-        if player_card.number == previous_player_card.number:
-            total_points += 2
-
-    #check for computer's bonus
-    if winner == "computer" and previous_computer_card:
-        if computer_card.number == previous_computer_card.number:
-            total_points += 2
-
-    return total_points
-#ID: 5670726
-
-#ID: 5670726
-def quicksort(cards: list) -> list:
-    """
-    Sorts a lists of Cards objects in ascending order using Quicksort.
-
-    Parameters:
-        cards (list of cards): The list of Card objects to sort.
-
-    Returns:
-        list: A new list of cards sorted by their numbers
-    """
-
-    if len(cards) <= 1:
-        return cards
-    else:
-        pivot = cards[0]
-        less = [card for card in cards[1:] if card.number <= pivot.number]
-        greater = [card for card in cards[1:] if card.number > pivot.number]
-        return quicksort(less) + [pivot] + quicksort(greater)
-#ID: 5670726
-
-#ID: 5670726
-# Evaluate the round
-def resolve_round(
-    computer_used_wild: bool = False,
-    player_used_wild: bool = False,
-    player_wild_card: Card | None = None
-) -> tuple[list[Card], str, str]:
-    """Handles a single round of the game.
-
-      Compares player and computer cards.
-      Applies scoring and bonus logic.
-      Updates the discard pile, game state, and tracks previously played cards.
-
-    Args:
-        computer_used_wild (bool): True if the computer played the Wild card.
-        player_used_wild (bool): True if the player played the Wild card.
-        player_wild_card (Card): The card selected by the player using the Wild card.
-
-    Returns:
-        tuple:
-             discard_pile (list[Card]): The updated discard pile.
-             result_message (str): A message summarizing the round result.
-             played_info (str): Detailed info about which cards were played.
-    """
-    global player_played_card, computer_played_card
-    global player_score, computer_score, discard_pile, draw_stack
-    global player_hand, computer_hand, game_state, result_message
-    global previous_player_card, previous_computer_card, watcher_message
-    
-    watcher_message = ""
-
-    if not player_played_card or not computer_played_card: # Check if both player played a card
-    
-        return discard_pile, result_message, "No cards played."
-    
-    played_info = f"Player played: {player_played_card}" # Show the cards played
-    if player_used_wild and player_wild_card:
-        played_info += f" (using Wild card)"
-
-    played_info += f" | Computer played: {computer_played_card}" # Show the cards played
-    if computer_used_wild:
-        played_info += " (using Wild card)"
-
-    #Track last played cards for Watcher implementation
-    player_card_history.enqueue(player_played_card)
-    computer_card_history.enqueue(computer_played_card)
-
-    #Player Watcher card watching computer history
-    if len(computer_card_history) == 2:
-        c1, c2 = computer_card_history[0], computer_card_history[1]
-        if c1.color == c2.color:
-            for i, card in enumerate(player_hand):
-                if card.card_type == "watcher":
-                    bonus = (c1.number + c2.number + 1) // 2
-                    player_score += bonus
-                    watcher_message += f"Player's Watcher triggered! +{bonus} points."
-                    discard_card(player_hand.pop(i))
-                    player_draw_card()
-                    break
-
-    #Computer Watcher card watching computer history
-    if len(player_card_history) == 2:
-        p1, p2 = player_card_history[0], player_card_history[1]
-        if p1.color == p2.color:
-            for i, card in enumerate(computer_hand):
-                if card.card_type == "watcher":
-                    bonus = (p1.number + p2.number + 1) // 2
-                    computer_score += bonus
-                    watcher_message += f"Computer's Watcher triggered! +{bonus} points."
-                    discard_card(computer_hand.pop(i))
-                    computer_draw_card()
-                    break
-
-    # Handling special card vs special card combinations
-    twopoints_player = player_played_card.card_type == "twopoints"
-    twopoints_computer = computer_played_card.card_type == "twopoints"
-    colorstorm_played = player_played_card.card_type == "colorstorm" or computer_played_card.card_type == "colorstorm"
-    ascendancy_played = player_played_card.card_type == "ascendancy" or computer_played_card.card_type == "ascendancy"
-    joker_player = player_played_card.card_type =="joker"
-    joker_computer = computer_played_card.card_type =="joker"
-    swap_player = player_played_card.card_type =="swap"
-    swap_computer = computer_played_card.card_type =="swap"
-
-    if colorstorm_played or twopoints_player or twopoints_computer or ascendancy_played or joker_player or joker_computer or swap_player or swap_computer:
-        discard_card(player_played_card)
-        discard_card(computer_played_card)
-
-        # Handling two points card
-        if not (joker_player or joker_computer):
-            if twopoints_player:
-                player_score += 2
-            if twopoints_computer:
-                computer_score += 2
-
-        # Handling joker card
-        if joker_player:
-            if computer_played_card.card_type == "regular":
-                player_score += computer_played_card.number
-                result_message = f"Player played joker and gets {computer_played_card.number} points!"
-            else:
-                player_score += 5
-                result_message = f"Player played joker and gets 5 points! {computer_played_card.card_type.capitalize()} is not activated"
-            
-        elif joker_computer:
-            if player_played_card.card_type == "regular":
-                computer_score += player_played_card.number
-                result_message = f"Computer played joker and gets {player_played_card.number} points!"
-            else:
-                computer_score += 5
-                result_message = f"computer played joker and gets 5 points! {player_played_card.card_type.capitalize()} is not activated"
-
-        # Handling swap card
-        if not (joker_player or joker_computer):
-            if swap_player or swap_computer:
-                if draw_stack:
-                    player_draw_card()
-                if draw_stack:
-                    computer_draw_card()
-                player_hand, computer_hand = computer_hand, player_hand
-
-        # Handles if both colorstorm and ascendancy played together, one of them is randomly chosen
-        if not (joker_player or joker_computer):
-            if colorstorm_played and ascendancy_played: 
-                if len(draw_stack) >= 3:
-                    if random.choice(["colorstorm", "ascendancy"]) == "colorstorm": # Handles if colorstorm is activated
-                        grouped = defaultdict(list) # Group cards by color
-                        for card in draw_stack:
-                            grouped[card.color].append(card) 
-                        for color in grouped: # Sort each color group numbers in ascending order using quicksort
-                            grouped[color] = quicksort(grouped[color])
-                        color_order = list(grouped.keys()) # shuffle color groups randomly
-                        shuffle(color_order)
-                        draw_stack = [] # Rebuild the draw stack
-                        for color in color_order:
-                            draw_stack.extend(grouped[color])
-                    else: # Handles if ascendancy is activated
-                        draw_stack = quicksort(draw_stack)
-                    result_message = "Colorstorm and Ascendancy played! One card is activated, but it's a mystery."
-                else:
-                    result_message = "Not enough cards in the draw stack to activate special card."
-
-        # Handling only colorstorm card
-        if not (joker_player or joker_computer):
-            if colorstorm_played:
-                if len(draw_stack) >= 3:
-                    grouped = defaultdict(list) # Group cards by color
-                    for card in draw_stack:
-                        grouped[card.color].append(card) 
-                    for color in grouped: # Sort each color group numbers in ascending order using quicksort
-                        grouped[color] = quicksort(grouped[color])
-                    color_order = list(grouped.keys()) # shuffle color groups randomly
-                    shuffle(color_order)
-                    draw_stack = [] # Rebuild the draw stack
-                    for color in color_order:
-                        draw_stack.extend(grouped[color])
-                    result_message = "Colorstorm played! Draw stack reordered by color"
-                else:
-                    result_message = "Colorstorm played! There is no enough cards to reorder in the draw stack"
-
-        # Handling only acendancy card
-        if not (joker_player or joker_computer):
-            if ascendancy_played: # Sorts the draw stack by numbers
-                if len(draw_stack) >= 2:
-                    draw_stack = quicksort(draw_stack)
-                    result_message = "Ascendancy played! Draw stack is sorted in ascending order"
-                else:
-                    result_message = "Ascendancy played! There is no enough cards to sort the draw stack"
-
-        # Two points card + swap card combination result messages (if joker wasnt played)
-        if not (joker_player or joker_computer):
-            if twopoints_player and twopoints_computer:
-                result_message =  "Both players used Two points card! Each gets 2 points."
-            elif twopoints_player and colorstorm_played:
-                result_message = "Two points and Colorstorm Cards are played! Player gets 2 points and Draw stack is reordered"
-            elif twopoints_player and ascendancy_played:
-                result_message = "Two points and Ascendancy Cards are played! Player gets 2 points and Draw stack is sorted"
-            elif twopoints_computer and swap_player:
-                result_message = "Two points and Swap cards are played! Computer gets 2 points and hands are swapped"
-            elif swap_player and ascendancy_played:
-                result_message = "Swap and Ascendancy are played! Draw stack is sorted and hands are swapped"
-            elif swap_player and colorstorm_played:
-                result_message = "Swap and Colorstorm are played! Draw stack is reordered and hands are swapped"
-                
-            elif twopoints_computer and colorstorm_played:
-                result_message = "Two points and Colorstorm are played! Computer gets 2 points and draw stack is reordered"
-            elif twopoints_computer and ascendancy_played:
-                result_message = "Two points and Ascendancy are played! Computer gets 2 points and draw stack is sorted"
-            elif twopoints_player and swap_computer:
-                result_message = "Two points and Swap are Played! Player gets 2 points and hands are swapped"
-            elif swap_computer and ascendancy_played:
-                result_message = "Swap and Ascendancy are played! Draw stack is sorted and hands are swapped"
-            elif swap_computer and colorstorm_played:
-                result_message = "Swap and Colorstorm are played! Draw stack is reordered and hands are swapped"
-            elif twopoints_player:
-                result_message = "Player used two points card and gets 2 points"
-            elif twopoints_computer:
-                result_message = "Computer used two points card and gets 2 points"
-
-        if not result_message and not(joker_player or joker_computer):
-            if swap_player:
-                result_message = "Player used Swap! Hands have been exchanged"
-            elif swap_computer:
-                result_message = "Computer used Swap! Hands have been exchanged"
-                
-        draw_order = ["player", "computer"]
-        draw_order = shuffle(draw_order) # Makes drawing cards order random
-        for who in draw_order:
-            if draw_stack:
-                if who == "player" and len(player_hand) < 5:
-                    player_draw_card()
-                elif who == "computer" and len(computer_hand) < 5:
-                    computer_draw_card()
-
-        return discard_pile, result_message, played_info
-
-    # Comparing numbers if colors match
-    if player_played_card.color == computer_played_card.color:
-        if player_played_card.number > computer_played_card.number:
-            winner = "player"
-        elif player_played_card.number < computer_played_card.number:
-            winner = "computer"
-        else:
-            winner = "tie"
-
-        if winner != "tie":
-            points = calculate_points(player_played_card, computer_played_card, 
-                                      previous_player_card, previous_computer_card, winner=winner)
-            if winner == "player":
-                player_score += points
-            else:
-                computer_score += points
-            round_message = f"{winner.capitalize()} wins the round and gets {points} points!"
-        else:
-            round_message = "It's a tie! No points awarded."
-    else:
-        round_message = "Colours don't match! No points awarded."
-
-    #Illustrate Watcher card message if executed
-    if watcher_message:
-        result_message += " " + watcher_message
-
-    result_message += round_message
-
-    # Move played cards to discard pile
-    discard_card(player_played_card)
-    discard_card(computer_played_card)
-
-    # Draw new cards 
-    if draw_stack and len(player_hand) < 5:
-        player_draw_card()
-    if draw_stack and len(computer_hand) < 5:
-        computer_draw_card()
-    
-    check_game_over()
-
-    previous_player_card = player_played_card
-    previous_computer_card = computer_played_card
-
-    return discard_pile, result_message, played_info
-#ID: 5670726
-
 #ID: 5672969
 # Play button
 def draw_play_button():
@@ -1192,9 +602,9 @@ def draw_play_button():
                             None if no button is drawn.
     """
     # Check if any card is selected
-    any_selected = any(card.selected for card in player_hand)
+    any_selected = any(card_views.is_selected(card) for card in game_engine.player_hand)
     
-    if any_selected and game_state == SELECTING_CARD:
+    if any_selected and game_engine.game_state == SELECTING_CARD:
         button_width = 200
         button_height = 50
         button_x = SCREEN_WIDTH // 2 - button_width // 2
@@ -1204,8 +614,7 @@ def draw_play_button():
         pygame.draw.rect(screen, RED, (button_x, button_y, button_width, button_height))
         
         # Draw text
-        font = pygame.font.SysFont(None, 36)
-        text = font.render("Play Card", True, WHITE)
+        text = render_text(36, "Play Card")
         screen.blit(text, (button_x + button_width // 2 - text.get_width() // 2, 
                            button_y + button_height // 2 - text.get_height() // 2))
         
@@ -1229,25 +638,24 @@ def play_selected_card() -> bool:
         bool: True if a regular card was played, 
         False if a wild card was played or no card was selected.
     """
-    global player_hand, player_played_card, game_state
-
-    for i, card in enumerate(player_hand):
-        if card.selected:
-            card.selected = False
+    hand = game_engine.player_hand
+    for card in hand:
+        if card_views.is_selected(card):
+            card_views.select(None)
             
             if card.card_type == "watcher":
                 return False
 
+            # Equal cards are interchangeable, the first one is played like in a replay
+            card = hand.pop(hand.cards.index(card))
             if card.card_type == "wild":
-                wild_card_logic()
-                discard_card(card)
-                game_state = WILD_CARD
-                player_hand.pop(i)
+                game_engine.wild_card_logic()
+                game_engine.discard_card(card)
+                game_engine.game_state = WILD_CARD
                 return False
             else:
-                player_played_card = card
-                player_hand.pop(i)
-                game_state = WAITING_FOR_COMPUTER
+                game_engine.player_played_card = card
+                game_engine.game_state = WAITING_FOR_COMPUTER
                 return True
     return False
 #ID: 5672969
@@ -1263,19 +671,18 @@ def draw_wait_message():
     Returns:
         None
     """
-    if game_state == WAITING_FOR_COMPUTER:
-        font = pygame.font.SysFont(None, 36)
-        text = font.render("Computer is thinking...", True, WHITE)
+    if game_engine.game_state == WAITING_FOR_COMPUTER:
+        text = render_text(36, "Computer is thinking...")
         screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 + 100))
 #ID: 5672969
  
 #ID: 5670726
 # Draw the score and round messages
 def draw_scores_and_messages():
-    p_score = score_font.render(f"Player: {player_score}", True, WHITE)
-    c_score = score_font.render(f"Computer: {computer_score}", True, WHITE)
-    msg = message_font.render(message, True, WHITE)
-    played = played_card_font.render(played_card_message, True, WHITE)
+    p_score = render_text(36, f"Player: {game_engine.player_score}")
+    c_score = render_text(36, f"Computer: {game_engine.computer_score}")
+    msg = render_text(36, message)
+    played = render_text(30, game_engine.played_card_message)
 
     screen.blit(p_score, (50, 20))
     screen.blit(c_score, (SCREEN_WIDTH - 250, 20))
@@ -1283,35 +690,151 @@ def draw_scores_and_messages():
     screen.blit(played, (SCREEN_WIDTH // 2 - played.get_width() // 2, 10))
 #ID: 5670726
 
+#ID: 5671165
+# Pre-composited pile sprite
+class PileSprite:
+    """A pile of face down cards composited into a single cached surface.
+
+    Card i of the pile is drawn at (base_x + i * adjustment, base_y - i * adjustment),
+    so the pile grows up and to the right. The sprite keeps the pile
+    composited over the background colour and only updates it when the
+    number of cards changes: added cards are drawn on top, and for removed
+    cards only their area is cleared and the cards underneath it are drawn again.
+    Drawing the pile is then a single blit whatever its size.
+
+    Attributes:
+        base_x (int): The x-coordinate of the bottom card.
+        base_y (int): The y-coordinate of the bottom card.
+        adjustment (float): The offset between two cards of the pile.
+        background (tuple): The RGB color behind the pile.
+        count (int): The number of cards composited into the sprite.
+        capacity (int): The number of cards the sprite surface has room for.
+        surface (pygame.Surface | None): The composited pile.
+        rect (pygame.Rect | None): The position of the sprite on the screen.
+    """
+
+    def __init__(self, base_x: int, base_y: int, adjustment: float = 2.3, background: tuple = GREEN) -> None:
+        """Initialises an empty pile sprite.
+
+        Args:
+            base_x (int): The x-coordinate of the bottom card.
+            base_y (int): The y-coordinate of the bottom card.
+            adjustment (float): The offset between two cards of the pile.
+            background (tuple): The RGB color behind the pile.
+        """
+        self.base_x: int = base_x
+        self.base_y: int = base_y
+        self.adjustment: float = adjustment
+        self.background: tuple = background
+        self.count: int = 0
+        self.capacity: int = 0
+        self.surface = None
+        self.rect = None
+
+    def card_rect(self, i: int) -> pygame.Rect:
+        """Returns the screen area covered by card i of the pile, including its border.
+
+        Args:
+            i (int): The position of the card in the pile, 0 is the bottom card.
+
+        Returns:
+            pygame.Rect: The area of the card and its border.
+        """
+        x = self.base_x + i * self.adjustment
+        y = self.base_y - i * self.adjustment
+        return pygame.Rect(x - 2, y - 2, CARD_WIDTH + 4, CARD_HEIGHT + 4)
+
+    def draw_card(self, i: int) -> None:
+        """Draws card i of the pile face down onto the sprite surface.
+
+        Args:
+            i (int): The position of the card in the pile, 0 is the bottom card.
+        """
+        x = int(self.base_x + i * self.adjustment) - self.rect.x
+        y = int(self.base_y - i * self.adjustment) - self.rect.y
+        pygame.draw.rect(self.surface, BLACK, self.card_rect(i).move(-self.rect.x, -self.rect.y), border_radius=12)
+        self.surface.blit(card_atlas.get("BACK.png"), (x, y))
+
+    def rebuild(self, capacity: int) -> None:
+        """Creates a sprite surface with room for `capacity` cards and composites the pile on it.
+
+        Args:
+            capacity (int): The number of cards the new surface has room for.
+        """
+        self.capacity = max(capacity, 1)
+        self.rect = self.card_rect(0).union(self.card_rect(self.capacity - 1))
+        self.surface = pygame.Surface(self.rect.size).convert()
+        self.surface.fill(self.background)
+        for i in range(self.count):
+            self.draw_card(i)
+
+    def sync(self, count: int) -> None:
+        """Updates the sprite to show a pile of `count` cards.
+
+        Args:
+            count (int): The number of cards in the pile.
+        """
+        if self.surface is None or count > self.capacity:
+            self.rebuild(max(count, 2 * self.capacity, 48))
+
+        if count > self.count:
+            # New cards go on top of the pile
+            for i in range(self.count, count):
+                self.draw_card(i)
+
+        elif count < self.count:
+            # Clear the removed cards and draw again the cards they were covering
+            removed = self.card_rect(count).unionall([self.card_rect(i) for i in range(count + 1, self.count)])
+            removed.move_ip(-self.rect.x, -self.rect.y)
+            self.surface.fill(self.background, removed)
+            self.surface.set_clip(removed)
+            first = count
+            while first > 0 and self.card_rect(first - 1).move(-self.rect.x, -self.rect.y).colliderect(removed):
+                first -= 1
+            for i in range(first, count):
+                self.draw_card(i)
+            self.surface.set_clip(None)
+
+        self.count = count
+
+    def draw(self, count: int) -> None:
+        """Draws a pile of `count` cards on the screen with one blit.
+
+        Args:
+            count (int): The number of cards in the pile.
+        """
+        self.sync(count)
+        if count:
+            used = self.card_rect(0).union(self.card_rect(count - 1))
+            screen.blit(self.surface, used, used.move(-self.rect.x, -self.rect.y))
+
+draw_stack_sprite = PileSprite(15, (SCREEN_HEIGHT // 2) - (CARD_HEIGHT // 2))
+discard_pile_sprite = PileSprite(SCREEN_WIDTH - CARD_WIDTH - 123, (SCREEN_HEIGHT // 2) - (CARD_HEIGHT // 2))
+#ID: 5671165
+
 #ID: 5671165
 # Draw the draw_stack
 def draw_draw_stack() -> None:
     """Draws the draw stack on the screen with small positional adjustment between each card.
     
-    This function adds the label "Draw stack" and draws each card in the draw stack
+    This function adds the label "Draw stack" and draws the cards of the draw stack
     with small positional adjustment to simulate the stack shape.
-    All cards are drawn face down.
+    All cards are drawn face down, using the pre-composited `draw_stack_sprite`.
     
     Returns:
         None
     """
-    base_x = 15
-    base_y = (SCREEN_HEIGHT // 2) - (CARD_HEIGHT // 2)
-    # Adjustment to show the stack effect
-    adjustment = 2.3
+    base_x = draw_stack_sprite.base_x
+    base_y = draw_stack_sprite.base_y
     
+    #Draw the cards of the draw stack faced down
+    draw_stack_sprite.draw(len(game_engine.draw_stack))
+
     #Draw the 'Draw stack' text
-    font = pygame.font.SysFont(None, 36)
-    draw_stack_text = font.render("Draw stack", True, WHITE)
+    draw_stack_text = render_text(36, "Draw stack")
     text_x = base_x + 10
     text_y = base_y - CARD_HEIGHT // 2 - 60
     screen.blit(draw_stack_text, (text_x, text_y))
-
-    #Draw each card in the draw stack faced down
-    for i, card in enumerate(draw_stack):
-        x = base_x + (i * adjustment)
-        y = base_y - (i * adjustment)
-        card.draw(x, y, face_up=False)
 #ID: 5671165
 
 #ID: 5671165
@@ -1319,55 +842,24 @@ def draw_draw_stack() -> None:
 def draw_discard_pile() -> None:
     """Draws the discard pile on the screen with small positional adjustment between each card.
     
-    This function adds the label "Discard pile" and draws each card in the discard pile
+    This function adds the label "Discard pile" and draws the cards of the discard pile
     with small positional adjustment to simulate the pile shape.
-    All cards are drawn face down.
+    All cards are drawn face down, using the pre-composited `discard_pile_sprite`.
     
     Returns:
         None
     """
-    base_x = SCREEN_WIDTH - CARD_WIDTH - 123
-    base_y = (SCREEN_HEIGHT // 2) - (CARD_HEIGHT // 2)
-    # Adjustment to show the pile effect
-    adjustment = 2.3
+    base_x = discard_pile_sprite.base_x
+    base_y = discard_pile_sprite.base_y
+
+    #Draw the cards of the discard pile faced down
+    discard_pile_sprite.draw(len(game_engine.discard_pile))
 
     #Draw the 'Discard pile' text
-    font = pygame.font.SysFont(None, 36)
-    draw_stack_text = font.render("Discard pile", True, WHITE)
+    draw_stack_text = render_text(36, "Discard pile")
     text_x = base_x + 10
     text_y = base_y - CARD_HEIGHT // 2 - 60
     screen.blit(draw_stack_text, (text_x, text_y))
-
-    #Draw each card in the discard pile faced down
-    for i, card in enumerate(discard_pile):
-        x = base_x + (i * adjustment)
-        y = base_y - (i * adjustment)
-        card.draw(x, y, face_up=False)
-#ID: 5671165
-
-#ID: 5671165
-# Wild card logic implementation
-def wild_card_logic() -> None:
-    """Selects the top four regular cards using a max-heap strategy for the wild card effect.
-
-    This function chooses a list source (draw stack or discard pile) when 
-    the Wild card is played based on regular card availability.
-    It uses the max-heap data structure to extract the four largest 
-    values from regular cards.
-    These cards are stored in the global variable `top_four_cards`, 
-    which will be shown to the player
-    when a wild card is played.
-    """
-    global draw_stack, discard_pile, top_four_cards
-
-    source = draw_stack if has_regular(draw_stack) else discard_pile
-
-    heap = MaxHeap()
-    for card in source:
-        if card.card_type == "regular":
-            heap.add(card)
-
-    top_four_cards = heap.get_largest_four()
 #ID: 5671165
 
 #ID: 5671165
@@ -1378,56 +870,72 @@ def draw_wild_display() -> None:
     This function draws the selection screen when the Wild card is played
     on top of the game screen, displays a message to the player to choose
     one of the four cards and displays the largest four regular cards stored in 
-    the global variable `top_four_cards`.
+    the engine attribute `top_four_cards`.
     """
-    global top_four_cards
-
     overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
     overlay.fill((0, 0, 0, 180))
     screen.blit(overlay, (0, 0))
     
     # Draw game 'Choose one of these cards' message
-    font_large = pygame.font.SysFont(None, 72)
-    wild_card_text = font_large.render("Choose one of these cards", True, WHITE)
+    wild_card_text = render_text(72, "Choose one of these cards")
     screen.blit(wild_card_text, (SCREEN_WIDTH // 2 - wild_card_text.get_width() // 2, SCREEN_HEIGHT // 4))
     
     # Draw wild cards options 
-    total_width = len(top_four_cards) * CARD_WIDTH + (len(top_four_cards) - 1) * CARD_SPACING
+    total_width = len(game_engine.top_four_cards) * CARD_WIDTH + (len(game_engine.top_four_cards) - 1) * CARD_SPACING
 
     # Calculate the starting x position to center the cards
     start_x = (SCREEN_WIDTH - total_width) // 2
     
     # Draw each card
-    for i, card in enumerate(top_four_cards):
+    for i, card in enumerate(game_engine.top_four_cards):
         x = start_x + i * (CARD_WIDTH + CARD_SPACING)
         y = SCREEN_HEIGHT - CARD_HEIGHT - 50
-        card.draw(x, y, face_up=True)
+        card_views.draw(card, x, y, face_up=True)
 #ID: 5671165
 
 #ID: 5672969
-# Draw the game board
-def draw_game_board():
-    """Draws the game board.
+# Draw the instructions
+def draw_instructions():
+    """Draws the instruction text for the current game state"""
+    if game_engine.game_state == SELECTING_CARD:
+        instruction_text = render_text(36, "Select a card and click 'Play Card'")
+    elif game_engine.game_state == WAITING_FOR_COMPUTER:
+        instruction_text = render_text(36, "Waiting for computer to play...")
+    elif game_engine.game_state == SHOWING_RESULT:
+        instruction_text = render_text(36, "Click anywhere to continue")
+    elif game_engine.game_state == LAST_ROUND:
+        instruction_text = render_text(36, "Game over! Click anywhere to see the winner.")
+    else:
+        instruction_text = render_text(36, "")
+    
+    screen.blit(instruction_text, (SCREEN_WIDTH // 2 - instruction_text.get_width() // 2, 50))
+#ID: 5672969
+
+#ID: 5672969
+# Draw the whole board
+def draw_full_board():
+    """Draws every element of the board for the current game state onto the screen surface.
     
     This function draws all the game elements including the player's hand,
     played cards, discard pile, draw stack, play button, wait message, 
     the Wild card display if it is choosen by player and 
-    scores based on the current game state.
+    scores based on the current game state. The display itself is not updated.
     
     Returns:
         tuple: A tuple containing (play_button_rect, play_again_button_rect)
                where each element is a pygame.Rect or None.
     """
     #Background
-    screen.fill(GREEN)
+    screen.blit(board_renderer.background, (0, 0))
     
     # Draw relevant elements based on game state
-    if game_state != GAME_OVER:
+    if game_engine.game_state != GAME_OVER:
         # Draw player's hand
         draw_player_hand()
         
         # Draw played cards
         draw_played_cards()
+        draw_result_message()
 
         #Draw discard pile
         draw_discard_pile()
@@ -1445,46 +953,237 @@ def draw_game_board():
         draw_scores_and_messages()
         
         # Draw the Wild card select display if the Wild card is chosen
-        if game_state == WILD_CARD:
+        if game_engine.game_state == WILD_CARD:
             draw_wild_display()
 
         # Draw game state specific instructions
-        font = pygame.font.SysFont(None, 36)
-        if game_state == SELECTING_CARD:
-            instruction_text = font.render("Select a card and click 'Play Card'", True, WHITE)
-        elif game_state == WAITING_FOR_COMPUTER:
-            instruction_text = font.render("Waiting for computer to play...", True, WHITE)
-        elif game_state == SHOWING_RESULT:
-            instruction_text = font.render("Click anywhere to continue", True, WHITE)
-        elif game_state == LAST_ROUND:
-            instruction_text = font.render("Game over! Click anywhere to see the winner.", True, WHITE)
-        else:
-            instruction_text = font.render("", True, WHITE)
-        
-        screen.blit(instruction_text, (SCREEN_WIDTH // 2 - instruction_text.get_width() // 2, 50))
+        draw_instructions()
         
         play_again_button = None
     else:
         # Game is over - show winner
         play_button = None
         play_again_button = draw_winner_display()
-    
+
+    return play_button, play_again_button
+#ID: 5672969
+
+#ID: 5672969
+# Retained-mode renderer
+class BoardRenderer:
+    """Redraws only the regions of the board that changed since the last frame.
+
+    The board is split into fixed regions (top bar, draw stack, discard pile,
+    played cards, message strip and player's hand). Each region has a
+    signature built from the game state it shows. A region is repainted over
+    the cached background, and its rectangle handed to
+    `pygame.display.update`, only when its signature changes.
+    The Wild card and game over overlays cover the whole screen, so they
+    are drawn with a full redraw.
+
+    Attributes:
+        background (pygame.Surface): The cached static background layer.
+        regions (list[tuple]): (name, rect, signature function, paint function) of each region.
+        signatures (dict): The last drawn signature of each region and of the overlay.
+        full_redraw (bool): Whether the next frame must redraw the whole screen.
+        play_button (pygame.Rect | None): The last drawn play button.
+        play_again_button (pygame.Rect | None): The last drawn play again button.
+        dirty_rects (list[pygame.Rect]): The rectangles updated by the last frame.
+    """
+
+    def __init__(self) -> None:
+        """Initialises the renderer, its background layer and its regions."""
+        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.background.fill(GREEN)
+
+        pile_top = 100
+        strip_top = SCREEN_HEIGHT // 2 + CARD_HEIGHT // 2 + 5
+        hand_top = SCREEN_HEIGHT - CARD_HEIGHT - 60
+        side_width = 300
+        self.regions = [
+            ("top", pygame.Rect(0, 0, SCREEN_WIDTH, pile_top),
+             self.top_signature, self.paint_top),
+            ("draw_stack", pygame.Rect(0, pile_top, side_width, strip_top - pile_top),
+             lambda: len(game_engine.draw_stack), draw_draw_stack),
+            ("discard_pile", pygame.Rect(SCREEN_WIDTH - side_width, pile_top, side_width, strip_top - pile_top),
+             lambda: len(game_engine.discard_pile), draw_discard_pile),
+            ("played", pygame.Rect(side_width, pile_top, SCREEN_WIDTH - 2 * side_width, strip_top - pile_top),
+             lambda: (id(game_engine.player_played_card), id(game_engine.computer_played_card)), draw_played_cards),
+            ("strip", pygame.Rect(0, strip_top, SCREEN_WIDTH, hand_top - strip_top),
+             self.strip_signature, self.paint_strip),
+            ("hand", pygame.Rect(0, hand_top, SCREEN_WIDTH, SCREEN_HEIGHT - hand_top),
+             lambda: (tuple(map(id, game_engine.player_hand)), card_views.selected), draw_player_hand),
+        ]
+        self.signatures: dict = {}
+        self.full_redraw: bool = True
+        self.play_button = None
+        self.play_again_button = None
+        self.dirty_rects: list = []
+
+    def invalidate(self) -> None:
+        """Forces a full redraw on the next frame."""
+        self.full_redraw = True
+
+    def top_signature(self) -> tuple:
+        """Returns the signature of the scores, messages and instructions bar."""
+        return (game_engine.player_score, game_engine.computer_score, message,
+                game_engine.played_card_message, game_engine.game_state)
+
+    def paint_top(self) -> None:
+        """Paints the scores, messages and instructions bar."""
+        draw_scores_and_messages()
+        draw_instructions()
+
+    def strip_signature(self) -> tuple:
+        """Returns the signature of the strip holding the play button and round messages."""
+        any_selected = any(card_views.is_selected(card) for card in game_engine.player_hand)
+        return (game_engine.game_state, any_selected, game_engine.result_message)
+
+    def paint_strip(self) -> None:
+        """Paints the play button, the wait message and the round result message."""
+        self.play_button = draw_play_button()
+        draw_wait_message()
+        draw_result_message()
+
+    def overlay_signature(self) -> tuple | None:
+        """Returns the signature of the full screen overlay, or None if no overlay is shown."""
+        if game_engine.game_state == WILD_CARD:
+            return (WILD_CARD, tuple(id(card) for card in game_engine.top_four_cards))
+        if game_engine.game_state == GAME_OVER:
+            return (GAME_OVER, game_engine.player_score, game_engine.computer_score)
+        return None
+
+    def render(self) -> tuple:
+        """Draws the changes of the board since the last frame and updates the display.
+
+        Returns:
+            tuple: A tuple containing (play_button_rect, play_again_button_rect)
+                   where each element is a pygame.Rect or None.
+        """
+        self.dirty_rects = []
+        overlay = self.overlay_signature()
+
+        # The first frame and any change of the overlays need the whole screen
+        if self.full_redraw or overlay != self.signatures.get("overlay"):
+            self.play_button, self.play_again_button = draw_full_board()
+            for name, rect, signature, paint in self.regions:
+                self.signatures[name] = signature()
+            self.signatures["overlay"] = overlay
+            self.full_redraw = False
+            self.dirty_rects = [screen.get_rect()]
+            pygame.display.flip()
+            return self.play_button, self.play_again_button
+
+        # Nothing changes under an overlay that is already on screen
+        if overlay is not None:
+            return self.play_button, self.play_again_button
+
+        self.play_again_button = None
+        for name, rect, signature, paint in self.regions:
+            current = signature()
+            if current == self.signatures.get(name):
+                continue
+            self.signatures[name] = current
+            screen.set_clip(rect)
+            screen.blit(self.background, rect, rect)
+            paint()
+            screen.set_clip(None)
+            self.dirty_rects.append(rect)
+
+        if self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        return self.play_button, self.play_again_button
+
+# Created by start() once the display exists
+board_renderer = None
+#ID: 5672969
+
+#ID: 5672969
+# Startup
+def draw_splash() -> None:
+    """Draws the splash screen shown while the card images are loaded."""
+    screen.fill(GREEN)
+    title = render_text(72, "War of Colors")
+    loading = render_text(36, "Loading...")
+    screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, SCREEN_HEIGHT // 2 - title.get_height()))
+    screen.blit(loading, (SCREEN_WIDTH // 2 - loading.get_width() // 2, SCREEN_HEIGHT // 2 + 20))
     pygame.display.flip()
-    
-    if game_state == GAME_OVER:
-        return None, play_again_button
 
-    elif game_state in [SELECTING_CARD, WAITING_FOR_COMPUTER, SHOWING_RESULT, WILD_CARD]:
-        check_game_over()
-        return play_button, None
+def start(splash: bool = True) -> pygame.Surface:
+    """Opens the game window and loads the card images, once per process.
 
-    elif game_state == LAST_ROUND:
-        return play_button, None
+    Only the display is initialised here, pygame starts the font module
+    on the first font lookup and the timer on the first delay, and the
+    subsystems the game does not use (mixer, joystick) are never started.
+    The card image files are decoded by a worker thread while the window
+    is created and the splash screen drawn, then converted to the display
+    pixel format on the main thread, which owns the display. With the
+    image bundle of assets.py the worker only opens the bundle.
+
+    Args:
+        splash (bool): Whether to show the splash screen while loading.
+
+    Returns:
+        pygame.Surface: The screen surface.
+    """
+    global screen, board_renderer
+    if screen is not None:
+        return screen
 
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        decoded = executor.submit(card_atlas.decode_all)
+
+        pygame.display.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("War of Colors")
+        if splash:
+            draw_splash()
+
+        card_atlas.preload(decoded.result())
+
+    # get_ticks returns 0 until the timer is started by a delay
+    pygame.time.delay(1)
+    board_renderer = BoardRenderer()
+    return screen
+#ID: 5672969
+
+#ID: 5672969
+# Draw the game board
+def draw_game_board():
+    """Draws the game board.
+    
+    Only the parts of the board that changed since the last frame are
+    redrawn, see `BoardRenderer`. Drawing never changes the game, the
+    end of the game is checked by `update_game_over` before drawing.
+    
+    Returns:
+        tuple: A tuple containing (play_button_rect, play_again_button_rect)
+               where each element is a pygame.Rect or None.
+    """
+    play_button, play_again_button = board_renderer.render()
+    
+    if game_engine.game_state == GAME_OVER:
+        return None, play_again_button
     else:
         return play_button, None
 #ID: 5672969
 
+#ID: 5672969
+# Check the end of the game
+def update_game_over() -> None:
+    """Ends the game if the cards left allow no more rounds.
+
+    The check runs once per frame in the states of a game in progress,
+    `GameEngine.check_game_over` only evaluates it again after a hand or
+    the draw stack changed.
+
+    Returns:
+        None
+    """
+    if game_engine.game_state in (SELECTING_CARD, WAITING_FOR_COMPUTER, SHOWING_RESULT, WILD_CARD):
+        game_engine.check_game_over()
+#ID: 5672969
+
 #ID: 5672969
 # Check for card selection
 def handle_card_selection(pos):
@@ -1500,24 +1199,21 @@ def handle_card_selection(pos):
         Card or None: The selected card if a valid selection was made,
                      None if no card was selected.
     """
-    for card in player_hand:
+    for card in game_engine.player_hand:
         #Prevent choosing Watcher card
         if card.card_type == "watcher":
             continue
 
-        if card.rect.collidepoint(pos):
-            # Deselect all cards
-            for c in player_hand:
-                c.selected = False
-            # Select this card
-            card.selected = True
+        if card_views.rect(card).collidepoint(pos):
+            # Select this card, which deselects all other cards
+            card_views.select(card)
             return card
     return None
 #ID: 5672969
 
 #ID: 5672969
 # Main function
-def main():
+def main(fps: int = FPS, idle_wait: bool = IDLE_WAIT, record: str | None = None):
     """Main function to run the game.
     
     This function initializes and runs the main game loop, handling:
@@ -1529,109 +1225,185 @@ def main():
     - Wild card implementation
     - Last round resolving
 
+    The loop never runs faster than `fps` frames per second. With `idle_wait`
+    it sleeps in `pygame.event.wait` until the next event whenever nothing
+    on screen can change by itself, the computer's delayed turn wakes it 
+    up with a timer event.
+
+    Args:
+        fps (int): The frame rate cap of the main loop.
+        idle_wait (bool): Whether to sleep until the next event while idle.
+        record (str | None): A binary log file the games are appended to, see gamelog.py.
+
     Returns:
         None
     """
-    global player_score, computer_score, game_state, player_played_card, computer_played_card, result_message
-    global previous_player_card, previous_computer_card, played_card_message, selected_card
-    global top_four_cards, player_used_wild, last_player_wild_choice, discard_pile
-    global player_card_history, computer_card_history, leftover_points, watcher_message
+    global selected_card
 
     # Initialize the game
-    deal_cards()
-    initialise_watcher_history()
+    start()
+    if record is not None:
+        game_engine.recorder = gamelog.GameRecorder(record)
+    game_engine.new_game()
+    card_views.clear()
     selected_card = None
     play_button_rect = None
     play_again_button_rect = None
     computer_play_time = 0
     running = True
+    clock = pygame.time.Clock()
+
+    # Mouse movement is not used by the game, so it should not wake up the loop
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+
+    # Draw the first frame, every later frame is drawn after the events that changed the game
+    update_game_over()
+    play_button_rect, play_again_button_rect = draw_game_board()
    
     while running:
         current_time = pygame.time.get_ticks()
+        computer_due = game_engine.game_state == WAITING_FOR_COMPUTER and current_time >= computer_play_time
+
+        # The screen is up to date, so sleep until something happens
+        if idle_wait and not computer_due:
+            events = [pygame.event.wait()] + pygame.event.get()
+            current_time = pygame.time.get_ticks()
+        else:
+            events = pygame.event.get()
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+
+            if event.type == COMPUTER_TURN_EVENT:
+                computer_play_time = current_time
+
+            # The window contents were lost, so the renderer has to draw everything again
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                board_renderer.invalidate()
             
-            if game_state == SELECTING_CARD:
+            if game_engine.game_state == SELECTING_CARD:
                 # Handle mouse clicks for card selection and play button
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     # Check if play button was clicked
                     if play_button_rect and play_button_rect.collidepoint(event.pos):
                         if play_selected_card():
                             # Set the time when computer will play
-                            computer_play_time = current_time + 500
+                            computer_play_time = current_time + COMPUTER_DELAY
+                            pygame.time.set_timer(COMPUTER_TURN_EVENT, COMPUTER_DELAY, loops=1)
                     else:
                         # Check for card selection
                         selected_card = handle_card_selection(event.pos)
 
             # Handles user input if the Wild card is selected
-            if game_state == WILD_CARD:
+            if game_engine.game_state == WILD_CARD:
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    for card in top_four_cards:
-                        if card.rect.collidepoint(event.pos):
-                            # Set the selected card as the player played card
-                            player_played_card = card
-                            # Track the player's Wild card selection for info
-                            last_player_wild_choice = card
-                            # Mark that the player used the Wild card
-                            player_used_wild = True         
-                            top_four_cards.remove(card)
-                            # Checks that the chosen card is not in the draw stack 
-                            draw_stack[:] = list(filter(lambda c: c is not card, draw_stack))
-                            game_state = WAITING_FOR_COMPUTER
+                    for card in game_engine.top_four_cards:
+                        if card_views.rect(card).collidepoint(event.pos):
+                            game_engine.choose_wild_card(card)
+                            break
             
-            elif game_state == SHOWING_RESULT:
+            elif game_engine.game_state == SHOWING_RESULT:
                 # Progress to next round when user clicks
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    check_game_over()
-                    game_state = SELECTING_CARD
-                    player_played_card = None
-                    computer_played_card = None
-                    result_message = ""
+                    game_engine.check_game_over()
+                    game_engine.game_state = SELECTING_CARD
+                    game_engine.player_played_card = None
+                    game_engine.computer_played_card = None
+                    game_engine.result_message = ""
             
-            elif game_state == GAME_OVER:
+            elif game_engine.game_state == GAME_OVER:
                 # Handle play again button
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if play_again_button_rect and play_again_button_rect.collidepoint(event.pos):
                         # Reset the game
-                        deal_cards()
-                        player_card_history.clear()
-                        computer_card_history.clear()
+                        game_engine.new_game()
+                        card_views.clear()
                         selected_card = None
                         play_button_rect = None
                         play_again_button_rect = None
                         computer_play_time = 0
-                        leftover_points = 0
-                        player_played_card = None
-                        computer_played_card = None
-                        last_player_wild_choice = None
-                        result_message = ""
-                        played_card_message = ""
-                        watcher_message = ""
-                        game_state = SELECTING_CARD
             
-            elif game_state == LAST_ROUND:
+            elif game_engine.game_state == LAST_ROUND:
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    game_state = GAME_OVER
+                    game_engine.game_state = GAME_OVER
 
         # Handle computer's turn
-        if game_state == WAITING_FOR_COMPUTER and current_time >= computer_play_time:
-            computer_played_card, computer_used_wild = computer_play_card()
-            discard_pile, result_message, played_info = resolve_round(computer_used_wild, player_used_wild, last_player_wild_choice)
-            player_used_wild = False  # reset after use
-            last_player_wild_choice = None
+        if game_engine.game_state == WAITING_FOR_COMPUTER and current_time >= computer_play_time:
+            game_engine.computer_played_card, computer_used_wild = game_engine.computer_play_card()
+            _, _, played_info = game_engine.resolve_round(computer_used_wild, game_engine.player_used_wild,
+                                                          game_engine.last_player_wild_choice)
+            game_engine.player_used_wild = False  # reset after use
+            game_engine.last_player_wild_choice = None
 
 
-            played_card_message = played_info  
-            if game_state != GAME_OVER:  
-                game_state = SHOWING_RESULT
+            game_engine.played_card_message = played_info  
+            if game_engine.game_state != GAME_OVER:  
+                game_engine.game_state = SHOWING_RESULT
         
-        # Draw everything
+        # Update the game, then draw everything
+        update_game_over()
         play_button_rect, play_again_button_rect = draw_game_board()
+        clock.tick(fps)
     
+    if game_engine.recorder is not None:
+        game_engine.recorder.close()
+    pygame.quit()
+    sys.exit()
+#ID: 5672969
+
+#ID: 5672969
+# Show the games of a log
+def replay_log(path: str, speed: float = 1.0) -> None:
+    """Shows the games of a binary game log in the window.
+
+    The records are replayed through the engine one by one by a
+    `gamelog.GameReplayer`, which checks every round against the log.
+    Each round stays on screen for REPLAY_DELAY / speed milliseconds,
+    closing the window stops the replay.
+
+    Args:
+        path (str): The log file, see gamelog.py.
+        speed (float): The replay speed, 2 shows the rounds twice as fast.
+
+    Returns:
+        None
+    """
+    start()
+    replayer = gamelog.GameReplayer(game_engine)
+    delay = int(REPLAY_DELAY / speed)
+
+    for record_type in replayer.records(path):
+        if record_type == gamelog.GAME:
+            card_views.clear()
+            continue
+        elif record_type == gamelog.END:
+            game_engine.game_state = GAME_OVER
+        elif game_engine.game_state != LAST_ROUND:
+            game_engine.game_state = SHOWING_RESULT
+
+        # The board is only rendered, drawing it must not play the game on
+        board_renderer.render()
+        pygame.time.wait(delay)
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            break
+
     pygame.quit()
     sys.exit()
 #ID: 5672969
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Play War of Colors.")
+    parser.add_argument("--record", metavar="LOG", default=None, help="append the games to a binary log")
+    parser.add_argument("--replay", metavar="LOG", default=None, help="show the games of a binary log")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed")
+    parser.add_argument("--search-budget", type=float, default=None, metavar="SECONDS",
+                        help="let a search AI play the computer with this time per move")
+    args = parser.parse_args()
+
+    if args.search_budget is not None:
+        game_engine.computer_strategy = ai.SearchAI(time_budget=args.search_budget)
+    if args.replay is not None:
+        replay_log(args.replay, args.speed)
+    else:
+        main(record=args.record)
\ No newline at end of file
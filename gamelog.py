@@ -0,0 +1,439 @@
+"""
+Compact binary game logs for War of Colors.
+
+A `GameRecorder` attached to a `GameEngine` appends one record per game
+start, round and game end to a log file. A `GameReplayer` runs a log
+back through a headless engine: every round is played again with the
+logged choices and resolved by `GameEngine.resolve_round`, and the
+result is checked against the log.
+
+Every record is a little-endian u32 payload length and a u8 record type
+followed by the payload:
+-GAME: u64 game seed, u32 deck size, u8 Watcher window
+-ROUND: u8 flags, u32 player card code, u32 computer card code,
+ i32 player score change, i32 computer score change,
+ u16 player Watcher bonus, u16 computer Watcher bonus,
+ u32 draw stack size followed by its card codes if the round reordered it
+-END: i32 player score, i32 computer score, u32 rounds, u8 flags,
+ u32 code of the player's card if the game ended before it was resolved
+
+Cards are stored as `engine.Card.code`, 0 when no card was played.
+The seed and the card codes are enough to replay a game exactly because
+all randomness of the engine comes from its seeded generator. Logs are
+read through `mmap`, record by record, so replaying a log of any size
+does not load it into memory.
+
+Usage:
+    python gamelog.py record games.log --games 10000 --seed 1
+    python gamelog.py replay games.log
+
+Libraries used:
+-argparse
+-mmap
+-os
+-struct
+-time
+-array
+-engine
+
+Data structures used:
+-bytes/memoryview
+-array
+-Tuple
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+
+import engine
+
+# Record types
+GAME = 1
+ROUND = 2
+END = 3
+
+# Round flags
+PLAYER_AUTO = 1  # The player's card was chosen by auto_play_card, not by a person
+PLAYER_WILD = 2  # The player's card was chosen with a Wild card
+COMPUTER_WILD = 4  # The computer's card was chosen with a Wild card
+DRAW_STACK_REORDERED = 8  # Colorstorm or Ascendancy reordered the draw stack
+COMPUTER_CHOSEN = 16  # The computer's card was chosen by a computer strategy, not by auto_play_card
+
+HEADER = struct.Struct("<IB")
+GAME_RECORD = struct.Struct("<QIB")
+ROUND_RECORD = struct.Struct("<BIIiiHHI")
+END_RECORD = struct.Struct("<iiIBI")
+
+# Buffer of the log file, records are only written to disk when it is full
+BUFFER_SIZE = 1 << 20
+
+class ReplayMismatch(Exception):
+    """Raised when a replayed round does not match its log record, or the log is cut short."""
+
+def card_code(card: engine.Card | None) -> int:
+    """Returns the code of a card, 0 if there is no card."""
+    return 0 if card is None else card.code
+
+#ID: 5672969
+class GameRecorder:
+    """Appends the games played by an engine to a binary log file.
+
+    Attach it with `engine.recorder = GameRecorder(path)`, the engine then
+    calls it when the cards are dealt, after every resolved round and when
+    the game ends. Records go through a large `io.BufferedWriter`, so the
+    frame loop only copies bytes into memory and the disk is written in
+    big blocks.
+
+    Attributes:
+        file: The buffered log file.
+        in_game (bool): True between the start and the end record of a game.
+        game_rounds (int): The number of rounds recorded in the current game.
+        round_card (engine.Card | None): The player's card of the last recorded round.
+        games (int): The number of games started.
+        rounds (int): The number of rounds recorded.
+    """
+
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE) -> None:
+        """Opens the log file for appending.
+
+        Args:
+            path (str): The log file.
+            buffer_size (int): The size of the write buffer in bytes.
+        """
+        self.file = open(path, "ab", buffering=buffer_size)
+        self.in_game: bool = False
+        self.game_rounds: int = 0
+        self.round_card: engine.Card | None = None
+        self.games: int = 0
+        self.rounds: int = 0
+
+    def write(self, record_type: int, payload: bytes) -> None:
+        """Writes one length-prefixed record."""
+        self.file.write(HEADER.pack(len(payload), record_type))
+        self.file.write(payload)
+
+    def record_game_start(self, game: engine.GameEngine) -> None:
+        """Records the seed of a newly dealt game.
+
+        Args:
+            game (engine.GameEngine): The engine that dealt the cards.
+        """
+        self.write(GAME, GAME_RECORD.pack(game.game_seed, game.deck_spec.size(), game.watcher_window))
+        self.in_game = True
+        self.game_rounds = 0
+        self.round_card = None
+        self.games += 1
+
+    def record_round(self, game: engine.GameEngine, player_auto: bool, player_used_wild: bool,
+                     computer_used_wild: bool, draw_stack_reordered: bool, player_delta: int,
+                     computer_delta: int, player_bonus: int = 0, computer_bonus: int = 0) -> None:
+        """Records a resolved round.
+
+        Args:
+            game (engine.GameEngine): The engine that resolved the round.
+            player_auto (bool): True if the player's card was chosen by `auto_play_card`.
+            player_used_wild (bool): True if the player's card was chosen with a Wild card.
+            computer_used_wild (bool): True if the computer's card was chosen with a Wild card.
+            draw_stack_reordered (bool): True if Colorstorm or Ascendancy reordered the draw stack.
+            player_delta (int): The change of the player's score during the round.
+            computer_delta (int): The change of the computer's score during the round.
+            player_bonus (int): The points of the player's triggered Watcher card.
+            computer_bonus (int): The points of the computer's triggered Watcher card.
+        """
+        flags = ((PLAYER_AUTO if player_auto else 0) | (PLAYER_WILD if player_used_wild else 0)
+                 | (COMPUTER_WILD if computer_used_wild else 0)
+                 | (DRAW_STACK_REORDERED if draw_stack_reordered else 0)
+                 | (COMPUTER_CHOSEN if game.computer_strategy is not None else 0))
+        if draw_stack_reordered:
+            codes = array("I", (card.code for card in game.draw_stack))
+        else:
+            codes = array("I")
+        self.write(ROUND, ROUND_RECORD.pack(flags, card_code(game.player_played_card),
+                                            card_code(game.computer_played_card), player_delta,
+                                            computer_delta, player_bonus, computer_bonus, len(codes))
+                   + codes.tobytes())
+        self.round_card = game.player_played_card
+        self.game_rounds += 1
+        self.rounds += 1
+
+    def record_game_end(self, game: engine.GameEngine, game_state: int = engine.SELECTING_CARD) -> None:
+        """Records the final scores, only once per game.
+
+        The pygame front end can end a game after the player took a card
+        out of the hand but before the round was resolved, that card is
+        recorded too so the leftover cards can be replayed.
+
+        Args:
+            game (engine.GameEngine): The engine whose game ended.
+            game_state (int): The state of the game just before it ended.
+        """
+        if not self.in_game:
+            return
+        flags, code = 0, 0
+        if game_state == engine.WILD_CARD:
+            flags = PLAYER_WILD
+        elif game_state == engine.WAITING_FOR_COMPUTER and game.player_played_card is not self.round_card:
+            flags = PLAYER_WILD if game.player_used_wild else 0
+            code = card_code(game.player_played_card)
+        self.write(END, END_RECORD.pack(game.player_score, game.computer_score, self.game_rounds, flags, code))
+        self.in_game = False
+
+    def close(self) -> None:
+        """Flushes the buffer and closes the log file."""
+        self.file.close()
+
+    def __enter__(self) -> "GameRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+#ID: 5672969
+
+# Read the records of a log
+def read_records(path: str):
+    """Yields the records of a log file, reading them from a memory mapping of the file.
+
+    Args:
+        path (str): The log file.
+
+    Yields:
+        tuple[int, tuple]: The record type and its unpacked fields. Round records
+            end with the draw stack codes, an array that is empty unless the
+            draw stack was reordered.
+
+    Raises:
+        ReplayMismatch: If the log ends inside a record, like a log cut short
+            by a crash while it was written.
+    """
+    # An empty file cannot be mapped
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        offset = 0
+        while offset < len(data):
+            try:
+                length, record_type = HEADER.unpack_from(data, offset)
+                start = offset + HEADER.size
+                if start + length > len(data):
+                    raise ReplayMismatch(f"The log is truncated in the record at byte {offset}")
+                if record_type == GAME:
+                    record = GAME_RECORD.unpack_from(data, start)
+                elif record_type == ROUND:
+                    codes = array("I")
+                    codes.frombytes(data[start + ROUND_RECORD.size:start + length])
+                    record = ROUND_RECORD.unpack_from(data, start) + (codes,)
+                elif record_type == END:
+                    record = END_RECORD.unpack_from(data, start)
+                else:
+                    record = None
+            except struct.error as error:
+                raise ReplayMismatch(f"The log is truncated in the record at byte {offset}") from error
+            if record is not None:
+                yield record_type, record
+            offset = start + length
+
+#ID: 5672969
+class GameReplayer:
+    """Replays the games of a log through a headless engine.
+
+    Each round is played again with the logged cards: the cards the
+    engine picked itself are picked again with the replayed seed, the
+    cards a person or a computer strategy picked are taken from the hand
+    by their code. The
+    round is then resolved by `GameEngine.resolve_round` and compared
+    with the log.
+
+    Attributes:
+        game (engine.GameEngine): The engine the games are replayed in.
+        game_rounds (int): The number of rounds replayed in the current game.
+        games (int): The number of games replayed.
+        rounds (int): The number of rounds replayed.
+    """
+
+    def __init__(self, game: engine.GameEngine | None = None) -> None:
+        """Initialises the replayer.
+
+        Args:
+            game (engine.GameEngine | None): The engine to replay in, it must use the deck
+                the log was recorded with. A new engine with the standard deck if None.
+        """
+        self.game: engine.GameEngine = game if game is not None else engine.GameEngine()
+        self.game_rounds: int = 0
+        self.games: int = 0
+        self.rounds: int = 0
+
+    def check(self, what: str, logged, replayed) -> None:
+        """Raises ReplayMismatch if a replayed value differs from the logged one."""
+        if logged != replayed:
+            raise ReplayMismatch(f"Game {self.games}, round {self.game_rounds}: "
+                                 f"{what} is {replayed}, the log says {logged}")
+
+    def start_game(self, seed: int, deck_size: int, watcher_window: int) -> None:
+        """Deals the game of a GAME record."""
+        self.check("deck size", deck_size, self.game.deck_spec.size())
+        self.game.watcher_window = watcher_window
+        self.game.new_game(seed)
+        self.game_rounds = 0
+        self.games += 1
+
+    def play_player_card(self, flags: int, code: int) -> None:
+        """Plays the player's card of a ROUND record like the pygame front end or play_round did."""
+        game = self.game
+        if flags & PLAYER_AUTO:
+            card, used_wild = game.auto_play_card(game.player_hand)
+            game.player_played_card = card
+            game.player_used_wild = used_wild
+            game.last_player_wild_choice = card if used_wild else None
+        elif flags & PLAYER_WILD:
+            game.discard_card(game.player_hand.pop(game.player_hand.index_of_type(engine.WILD)))
+            game.wild_card_logic()
+            choices = [card for card in game.top_four_cards if card.code == code]
+            if not choices:
+                raise ReplayMismatch(f"Game {self.games}: Wild choice {code} is not offered")
+            game.choose_wild_card(choices[0])
+        elif code:
+            codes = [card.code for card in game.player_hand]
+            if code not in codes:
+                raise ReplayMismatch(f"Game {self.games}: player card {code} is not in the hand")
+            game.player_played_card = game.player_hand.pop(codes.index(code))
+
+    def play_computer_card(self, flags: int, code: int) -> tuple[engine.Card | None, bool]:
+        """Plays the computer's card of a ROUND record like computer_play_card did."""
+        game = self.game
+        hand = game.computer_hand
+        if not flags & COMPUTER_CHOSEN:
+            return game.auto_play_card(hand)
+
+        # A card chosen by a strategy is taken by its code, a Wild card without choices played no card
+        if flags & COMPUTER_WILD:
+            code, wild_choice = engine.WILD_CODE, code
+        elif not code and hand.playable_count():
+            code, wild_choice = engine.WILD_CODE, 0
+        elif not code:
+            return None, False
+        else:
+            wild_choice = 0
+        try:
+            return game.play_card_by_code(hand, code, wild_choice)
+        except ValueError:
+            raise ReplayMismatch(f"Game {self.games}: computer card {code} ({wild_choice}) "
+                                 f"cannot be played") from None
+
+    def play_round(self, flags: int, player_code: int, computer_code: int, player_delta: int,
+                   computer_delta: int, player_bonus: int, computer_bonus: int, draw_stack_size: int,
+                   draw_stack: array) -> None:
+        """Plays and resolves the round of a ROUND record and checks it against the record."""
+        game = self.game
+        game.check_game_over()
+        game.player_played_card = None
+        game.computer_played_card = None
+        game.result_message = ""
+        player_score, computer_score = game.player_score, game.computer_score
+
+        self.play_player_card(flags, player_code)
+        self.check("player card", player_code, card_code(game.player_played_card))
+
+        game.computer_played_card, computer_used_wild = self.play_computer_card(flags, computer_code)
+        self.check("computer card", computer_code, card_code(game.computer_played_card))
+        self.check("computer Wild card", bool(flags & COMPUTER_WILD), computer_used_wild)
+
+        _, _, game.played_card_message = game.resolve_round(computer_used_wild, game.player_used_wild,
+                                                            game.last_player_wild_choice)
+        game.player_used_wild = False
+        game.last_player_wild_choice = None
+        self.game_rounds += 1
+        self.rounds += 1
+
+        # Leftover points of a game that ended this round are only in the END record
+        if game.game_state != engine.LAST_ROUND:
+            self.check("player score change", player_delta, game.player_score - player_score)
+            self.check("computer score change", computer_delta, game.computer_score - computer_score)
+        if flags & DRAW_STACK_REORDERED:
+            self.check("draw stack", draw_stack, array("I", (card.code for card in game.draw_stack)))
+
+    def end_game(self, player_score: int, computer_score: int, rounds: int, flags: int, code: int) -> None:
+        """Ends the game of an END record and checks the final scores."""
+        game = self.game
+        if flags & PLAYER_WILD and not code:
+            game.discard_card(game.player_hand.pop(game.player_hand.index_of_type(engine.WILD)))
+            game.wild_card_logic()
+        elif flags or code:
+            self.play_player_card(flags, code)
+        game.check_game_over()
+        if game.game_state not in (engine.LAST_ROUND, engine.GAME_OVER) and not game.player_hand.playable_count():
+            game.end_with_leftovers()
+        self.check("final scores", (player_score, computer_score), (game.player_score, game.computer_score))
+        self.check("rounds", rounds, self.game_rounds)
+
+    def records(self, path: str):
+        """Replays a log record by record.
+
+        Args:
+            path (str): The log file.
+
+        Yields:
+            int: The type of each record, after the engine has replayed it.
+
+        Raises:
+            ReplayMismatch: If the replay differs from the log or the log is truncated.
+        """
+        for record_type, fields in read_records(path):
+            if record_type == GAME:
+                self.start_game(*fields)
+            elif record_type == ROUND:
+                self.play_round(*fields)
+            elif record_type == END:
+                self.end_game(*fields)
+            yield record_type
+
+    def replay(self, path: str) -> "GameReplayer":
+        """Replays a whole log at full speed.
+
+        Args:
+            path (str): The log file.
+
+        Returns:
+            GameReplayer: The replayer, with the number of games and rounds replayed.
+
+        Raises:
+            ReplayMismatch: If the replay differs from the log or the log is truncated.
+        """
+        for _ in self.records(path):
+            pass
+        return self
+#ID: 5672969
+
+def main() -> None:
+    """Records headless games to a log, or replays and checks a log."""
+    parser = argparse.ArgumentParser(description="Record and replay binary War of Colors game logs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="play headless games and record them")
+    record_parser.add_argument("log", help="log file, games are appended")
+    record_parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    record_parser.add_argument("--seed", type=int, default=None, help="seed the game seeds are drawn from")
+
+    replay_parser = subparsers.add_parser("replay", help="replay a log and check every round")
+    replay_parser.add_argument("log", help="log file")
+
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    if args.command == "record":
+        game = engine.GameEngine(seed=args.seed)
+        with GameRecorder(args.log) as recorder:
+            game.recorder = recorder
+            for _ in range(args.games):
+                engine.simulate_game(game)
+        print(f"Recorded {recorder.games} games, {recorder.rounds} rounds "
+              f"in {time.perf_counter() - start_time:.2f} s")
+    else:
+        replayer = GameReplayer().replay(args.log)
+        print(f"Replayed {replayer.games} games, {replayer.rounds} rounds "
+              f"in {time.perf_counter() - start_time:.2f} s, no mismatches")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Binary snapshots of a War of Colors game in progress.
+
+`snapshot_game` packs the whole state of a `GameEngine` into a compact
+bytes buffer: hands, draw stack order, discard pile, scores, Watcher
+histories, played and previous cards, the game state and optionally the
+state of the engine's random generator. `restore_game` loads it back into
+any engine with the same deck, which takes a few tens of microseconds,
+so an AI can branch many hypothetical futures from one position.
+
+A snapshot is a fixed header followed by the card codes of all piles:
+-header: u8 game state, u8 Watcher window, u8 flags, u64 game seed,
+ i32 player score, i32 computer score, i32 leftover points, u32 rounds played,
+ u32 codes of the player's and computer's played and previous cards and of
+ the player's Wild card choice (0 if none), u32 counts of the player hand,
+ computer hand, draw stack, discard pile, Wild card offer, player history
+ and computer history, u32 counts of the regular cards of the draw stack
+ and of the discard pile, u32 count of the shared cards
+-u32 card codes of those seven piles in that order, bottom to top and the
+ Watcher histories oldest first
+-625 u32 words of the random generator state if the RNG_STATE flag is set
+-u16 positions of the regular cards of the draw stack and of the discard
+ pile in the order of their `RegularCardIndex`, which decides the order
+ of the cards offered by a Wild card, u32 if the WIDE_POSITIONS flag is
+ set because a pile has more cards than a u16 can number
+-u32 pairs of slots of the shared cards, see below
+
+Cards are stored as `engine.Card.code`. The engine finds cards in piles
+by identity, for instance a Wild card choice is taken out of the draw
+stack, so a card the state refers to from several places (the Wild card
+offer and the draw stack, the played card and the discard pile) must be
+one object again after a restore. The cards of
+the seven piles and then the five played, previous and chosen cards are
+numbered as slots, and each slot holding the same object as an earlier
+slot is stored with that earlier slot. Messages shown by the front end
+and the special card statistics of `play_round` are not part of the
+state, they are cleared on restore.
+
+A snapshot library is a file of u32 length-prefixed snapshots. It is
+read through `mmap`, so opening a library of any size is immediate and a
+snapshot is only paged in when it is restored.
+
+Usage:
+    python snapshot.py build scenarios.snap --games 1000 --seed 1
+
+Libraries used:
+-argparse
+-mmap
+-struct
+-time
+-array
+-collections.Counter
+-engine
+
+Data structures used:
+-bytes/memoryview
+-array
+-List
+"""
+
+import argparse
+import mmap
+import struct
+import time
+from array import array
+from collections import Counter
+
+import engine
+
+# Snapshot flags
+PLAYER_USED_WILD = 1  # The player's card was chosen with a Wild card
+HAS_GAME_SEED = 2  # The cards have been dealt, game_seed is set
+RNG_STATE = 4  # The state of the random generator follows the card codes
+WIDE_POSITIONS = 8  # The positions of the regular cards are u32
+
+STATE = struct.Struct("<BBBQiiiI5I10I")
+LENGTH = struct.Struct("<I")
+
+# State of a random.Random: the Mersenne Twister array and its position
+RNG = struct.Struct("<625I")
+
+def card_code(card: engine.Card | None) -> int:
+    """Returns the code of a card, 0 if there is no card."""
+    return 0 if card is None else card.code
+
+def history_cards(history: engine.Queue | None) -> list:
+    """Returns the cards of a Watcher history, oldest first."""
+    if history is None:
+        return []
+    return [history[i] for i in range(len(history) - 1, -1, -1)]
+
+def index_positions(pile: engine.CardPile) -> list:
+    """Returns the positions in a pile of its regular cards, in the order of its index."""
+    positions = {id(card): i for i, card in enumerate(pile)}
+    return [positions[id(card)] for card in pile.regular_index]
+
+def shared_slots(cards: list) -> list:
+    """Returns each slot holding the same object as an earlier slot, followed by that earlier slot.
+
+    Args:
+        cards (list[Card | None]): The card of each slot, None for an empty slot.
+
+    Returns:
+        list[int]: The slot pairs, flattened.
+    """
+    first = {}
+    pairs = []
+    for slot, card in enumerate(cards):
+        if card is None:
+            continue
+        earlier = first.setdefault(id(card), slot)
+        if earlier != slot:
+            pairs += (slot, earlier)
+    return pairs
+
+#ID: 5672969
+# Save the state of a game
+def snapshot_game(game: engine.GameEngine, include_rng: bool = True) -> bytes:
+    """Packs the state of a game into a binary snapshot.
+
+    Args:
+        game (engine.GameEngine): The engine holding the game.
+        include_rng (bool): Whether to include the state of the engine's random
+            generator, which makes the snapshot about 2.5 kB larger. Without it the
+            random choices after a restore differ from the original game.
+
+    Returns:
+        bytes: The snapshot.
+    """
+    piles = (
+        list(game.player_hand),
+        list(game.computer_hand),
+        list(game.draw_stack),
+        list(game.discard_pile),
+        list(game.top_four_cards),
+        history_cards(game.player_card_history),
+        history_cards(game.computer_card_history),
+    )
+    played = (game.player_played_card, game.computer_played_card, game.previous_player_card,
+              game.previous_computer_card, game.last_player_wild_choice)
+    draw_positions = index_positions(game.draw_stack)
+    discard_positions = index_positions(game.discard_pile)
+    wide = max(len(game.draw_stack), len(game.discard_pile)) > 0xFFFF
+    flags = ((PLAYER_USED_WILD if game.player_used_wild else 0)
+             | (HAS_GAME_SEED if game.game_seed is not None else 0)
+             | (RNG_STATE if include_rng else 0)
+             | (WIDE_POSITIONS if wide else 0))
+    codes = array("I")
+    slots = []
+    for pile in piles:
+        codes.extend(card.code for card in pile)
+        slots += pile
+    shared = shared_slots(slots + list(played))
+    if include_rng:
+        codes.extend(game.rng.getstate()[1])
+
+    header = STATE.pack(game.game_state, game.watcher_window, flags, game.game_seed or 0,
+                        game.player_score, game.computer_score, game.leftover_points, game.rounds_played,
+                        *map(card_code, played), *map(len, piles),
+                        len(draw_positions), len(discard_positions), len(shared) // 2)
+    return (header + codes.tobytes() + array("I" if wide else "H", draw_positions + discard_positions).tobytes()
+            + array("I", shared).tobytes())
+
+# Load a game from a snapshot
+def restore_game(game: engine.GameEngine, buffer, offset: int = 0) -> int:
+    """Restores the state of a game from a binary snapshot.
+
+    The cards are rebuilt from their codes with the engine's card factory,
+    so the restored game shares no card with the one that was saved. A
+    card that was in several places of the saved game is one object in all
+    of them again.
+
+    Args:
+        game (engine.GameEngine): The engine to restore into, it must use the same deck.
+        buffer: The snapshot, any object supporting the buffer protocol (bytes, memoryview, mmap).
+        offset (int): The position of the snapshot in the buffer.
+
+    Returns:
+        int: The position right after the snapshot in the buffer.
+    """
+    fields = STATE.unpack_from(buffer, offset)
+    (game_state, watcher_window, flags, game_seed, player_score, computer_score,
+     leftover_points, rounds_played) = fields[:8]
+    played_codes = fields[8:13]
+    counts = fields[13:20]
+    draw_regulars, discard_regulars, shared_count = fields[20:]
+    offset += STATE.size
+
+    view = memoryview(buffer)
+    codes = array("I")
+    codes.frombytes(view[offset:offset + 4 * sum(counts)])
+    offset += 4 * sum(counts)
+    if flags & RNG_STATE:
+        game.rng.setstate((3, RNG.unpack_from(buffer, offset), None))
+        offset += RNG.size
+    positions = array("I" if flags & WIDE_POSITIONS else "H")
+    positions_size = positions.itemsize * (draw_regulars + discard_regulars)
+    positions.frombytes(view[offset:offset + positions_size])
+    offset += positions_size
+    shared = array("I")
+    shared.frombytes(view[offset:offset + 8 * shared_count])
+    offset += 8 * shared_count
+
+    from_code = game.card_factory.from_code
+    cards = list(map(from_code, codes))
+    cards += [from_code(code) if code else None for code in played_codes]
+    for i in range(0, len(shared), 2):
+        cards[shared[i]] = cards[shared[i + 1]]
+    piles = []
+    start = 0
+    for count in counts:
+        piles.append(cards[start:start + count])
+        start += count
+    player_hand, computer_hand, draw_stack, discard_pile, top_four_cards, player_history, computer_history = piles
+
+    game.player_hand = engine.Hand(player_hand)
+    game.computer_hand = engine.Hand(computer_hand)
+    game.draw_stack = engine.CardPile(draw_stack, [draw_stack[i] for i in positions[:draw_regulars]])
+    game.discard_pile = engine.CardPile(discard_pile, [discard_pile[i] for i in positions[draw_regulars:]])
+    game.top_four_cards = top_four_cards
+
+    game.watcher_window = watcher_window
+    game.initialise_watcher_history()
+    for card in player_history:
+        game.player_card_history.enqueue(card)
+    for card in computer_history:
+        game.computer_card_history.enqueue(card)
+
+    game.player_played_card, game.computer_played_card, game.previous_player_card, \
+        game.previous_computer_card, game.last_player_wild_choice = cards[start:]
+
+    game.game_state = game_state
+    game.game_seed = game_seed if flags & HAS_GAME_SEED else None
+    game.player_used_wild = bool(flags & PLAYER_USED_WILD)
+    game.player_score = player_score
+    game.computer_score = computer_score
+    game.leftover_points = leftover_points
+    game.rounds_played = rounds_played
+
+    game.result_message = ""
+    game.played_card_message = ""
+    game.watcher_message = ""
+    game.special_card_counts = Counter()
+    return offset
+#ID: 5672969
+
+#ID: 5672969
+# Write many snapshots to one file
+def write_library(path: str, snapshots) -> int:
+    """Writes snapshots to a library file.
+
+    Args:
+        path (str): The library file, it is overwritten.
+        snapshots: The snapshots, as returned by `snapshot_game`.
+
+    Returns:
+        int: The number of snapshots written.
+    """
+    count = 0
+    with open(path, "wb") as file:
+        for snapshot in snapshots:
+            file.write(LENGTH.pack(len(snapshot)))
+            file.write(snapshot)
+            count += 1
+    return count
+
+class SnapshotLibrary:
+    """A library file of snapshots, memory-mapped for reading.
+
+    Only the length prefixes are read when the library is opened, the
+    snapshots themselves are read from the mapping when they are restored.
+    Slices returned by indexing are views into the mapping and must be
+    released before the library is closed.
+
+    Attributes:
+        file: The library file.
+        map (mmap.mmap): The memory mapping of the file.
+        view (memoryview): A view of the whole mapping.
+        offsets (list[int]): The position of each snapshot in the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Opens and maps a library file.
+
+        Args:
+            path (str): The library file.
+        """
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.offsets: list = []
+        offset = 0
+        while offset < len(self.map):
+            (length,) = LENGTH.unpack_from(self.map, offset)
+            self.offsets.append(offset + LENGTH.size)
+            offset += LENGTH.size + length
+
+    def __len__(self) -> int:
+        """Returns the number of snapshots in the library."""
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> memoryview:
+        """Returns a snapshot of the library as a view into the mapping, without copying it."""
+        offset = self.offsets[index]
+        (length,) = LENGTH.unpack_from(self.map, offset - LENGTH.size)
+        return self.view[offset:offset + length]
+
+    def restore(self, game: engine.GameEngine, index: int) -> None:
+        """Restores a snapshot of the library into an engine.
+
+        Args:
+            game (engine.GameEngine): The engine to restore into.
+            index (int): The number of the snapshot in the library.
+        """
+        restore_game(game, self.view, self.offsets[index])
+
+    def close(self) -> None:
+        """Unmaps and closes the library file."""
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "SnapshotLibrary":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+#ID: 5672969
+
+def main() -> None:
+    """Builds a library of the positions of headless games."""
+    parser = argparse.ArgumentParser(description="Build libraries of War of Colors game snapshots.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="snapshot every round of headless games")
+    build_parser.add_argument("library", help="library file, it is overwritten")
+    build_parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    build_parser.add_argument("--seed", type=int, default=None, help="seed the game seeds are drawn from")
+    build_parser.add_argument("--no-rng", action="store_true", help="leave out the random generator state")
+
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    game = engine.GameEngine(seed=args.seed)
+
+    def positions():
+        for _ in range(args.games):
+            game.new_game()
+            yield snapshot_game(game, not args.no_rng)
+            while game.play_round():
+                yield snapshot_game(game, not args.no_rng)
+
+    count = write_library(args.library, positions())
+    print(f"Wrote {count} snapshots of {args.games} games in {time.perf_counter() - start_time:.2f} s")
+
+if __name__ == "__main__":
+    main()
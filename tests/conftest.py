@@ -0,0 +1,11 @@
+"""
+Shared setup of the War of Colors tests.
+
+The game modules live at the top of the repository, not in a package,
+so its folder is put on the import path before the tests import them.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
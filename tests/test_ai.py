@@ -0,0 +1,105 @@
+"""
+Tests of the look-ahead search AI.
+"""
+
+import itertools
+from collections import Counter
+
+import ai
+import engine
+
+
+def game_in_progress(deck_spec: engine.DeckSpec = engine.DEFAULT_DECK, seed: int = 1,
+                     rounds: int = 3) -> engine.GameEngine:
+    """Returns a headless game after a few rounds."""
+    game = engine.GameEngine(deck_spec=deck_spec)
+    game.new_game(seed)
+    for _ in range(rounds):
+        game.play_round()
+    return game
+
+
+def test_moves_stay_within_the_time_budget():
+    # The clock moves one second every time the search reads it
+    ticks = itertools.count()
+    search = ai.SearchAI(time_budget=10, seed=1, clock=lambda: next(ticks))
+    deck_spec = engine.DeckSpec(decks=25)
+    game = engine.GameEngine(deck_spec=deck_spec, seed=4)
+    trial = engine.GameEngine(deck_spec=deck_spec)
+    game.new_game()
+    searched = 0
+    for _ in range(60):
+        trial.copy_state(game)
+        plays = search.candidates(trial)
+        search.choose(trial)
+        # The deadline is read once, then the clock before each future
+        assert search.playouts == (9 if len(plays) > 1 else 0)
+        searched += len(plays) > 1
+        if not game.play_round():
+            break
+    assert searched > 10
+
+
+def test_search_stops_after_the_future_that_passes_the_deadline():
+    times = iter([0.0, 0.001, 0.0015, 0.0035, 1.0])
+    search = ai.SearchAI(time_budget=0.002, seed=1, clock=lambda: next(times))
+    game = game_in_progress(seed=2)
+    assert len(search.candidates(game)) > 1
+    search.choose(game)
+    assert search.playouts == 2
+
+
+def test_deal_unknown_keeps_the_unknown_cards():
+    game = game_in_progress(engine.DeckSpec(decks=10))
+    game.player_played_card = game.player_hand.pop()
+    search = ai.SearchAI(seed=2)
+    scratch = engine.GameEngine(game.card_factory, game.deck_spec)
+    scratch.copy_state(game)
+    search.deal_unknown(scratch)
+
+    def unknown(engine_game):
+        return Counter(map(id, [engine_game.player_played_card, *engine_game.player_hand,
+                                *engine_game.draw_stack]))
+
+    assert unknown(scratch) == unknown(game)
+    assert len(scratch.player_hand) == len(game.player_hand)
+    assert list(scratch.computer_hand) == list(game.computer_hand)
+
+    # Only the slots a future can draw are dealt, each one swaps with at most one other card
+    reach = len(game.player_hand) + 1 + ai.DRAWS_PER_ROUND * (search.horizon + 1)
+    changed = sum(card is not dealt for card, dealt in zip(game.draw_stack, scratch.draw_stack))
+    assert 0 < changed <= 2 * reach < len(game.draw_stack)
+
+    stack = scratch.draw_stack
+    assert stack.regular_index.count == sum(card.type_code == engine.REGULAR for card in stack)
+    assert sorted(map(id, stack.regular_index)) == sorted(
+        {id(card) for card in stack if card.type_code == engine.REGULAR})
+
+
+def test_choose_plays_a_card_of_the_hand():
+    for seed in range(5):
+        game = game_in_progress(seed=seed)
+        hand = list(game.computer_hand)
+        card, used_wild = ai.SearchAI(max_playouts=30, seed=seed).choose(game)
+        if used_wild:
+            assert any(hand_card.type_code == engine.WILD for hand_card in hand)
+        else:
+            assert any(card is hand_card for hand_card in hand)
+            assert all(card is not hand_card for hand_card in game.computer_hand)
+
+
+def test_choose_without_time_for_a_playout():
+    game = game_in_progress()
+    search = ai.SearchAI(time_budget=0, seed=3)
+    card, _ = search.choose(game)
+    assert card is not None
+    assert search.playouts == 0
+
+
+def test_search_is_repeatable_with_a_seed():
+    choices = []
+    for _ in range(2):
+        game = game_in_progress(seed=7)
+        search = ai.SearchAI(time_budget=10, max_playouts=50, seed=5)
+        choices.append((search.choose(game)[0].code, search.values))
+    assert choices[0] == choices[1]
@@ -0,0 +1,62 @@
+"""
+Tests of the packed card image bundle.
+"""
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import assets
+
+
+def write_images(folder, names, size=(6, 4)) -> list:
+    """Writes small PNG images of different colors and returns them."""
+    images = []
+    for i, name in enumerate(names):
+        image = pygame.Surface(size, pygame.SRCALPHA, 32)
+        image.fill((40 * i, 255 - 30 * i, 7 * i, 255 - i))
+        pygame.image.save(image, str(folder / name))
+        images.append(image)
+    return images
+
+
+def test_bundle_round_trip(tmp_path):
+    names = ["blue_3.png", "red_10.png", "wild.png"]
+    images = write_images(tmp_path, names)
+    path = tmp_path / "cards.bundle"
+    assert assets.build_bundle(str(tmp_path), str(path), (6, 4)) == 3
+
+    bundle = assets.open_bundle(str(path), (6, 4))
+    assert bundle is not None
+    with bundle:
+        assert len(bundle) == 3
+        assert all(name in bundle for name in names)
+        for name, image in zip(names, images):
+            surface = bundle.surface(name)
+            assert pygame.image.tobytes(surface, "RGBA") == pygame.image.tobytes(image, "RGBA")
+            del surface
+
+
+def test_bundle_of_another_card_size_is_ignored(tmp_path):
+    write_images(tmp_path, ["card.png"])
+    path = tmp_path / "cards.bundle"
+    assets.build_bundle(str(tmp_path), str(path), (6, 4))
+    assert assets.open_bundle(str(path), (12, 8)) is None
+    assert assets.open_bundle(str(tmp_path / "missing.bundle"), (6, 4)) is None
+
+
+def test_long_file_names_are_refused(tmp_path):
+    long_name = "a_card_image_with_a_very_long_name.png"
+    assert len(long_name.encode()) > assets.NAME_SIZE
+    write_images(tmp_path, ["card.png", long_name])
+    with pytest.raises(ValueError):
+        assets.build_bundle(str(tmp_path), str(tmp_path / "cards.bundle"), (6, 4))
+
+
+def test_names_of_the_longest_size_are_found(tmp_path):
+    name = "x" * (assets.NAME_SIZE - 4) + ".png"
+    write_images(tmp_path, [name])
+    path = tmp_path / "cards.bundle"
+    assets.build_bundle(str(tmp_path), str(path), (6, 4))
+    with assets.CardBundle(str(path)) as bundle:
+        assert name in bundle
@@ -0,0 +1,73 @@
+"""
+Tests of the NumPy batch simulator.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import batch
+import engine
+
+
+def test_card_codes_decode_like_the_engine():
+    deck_spec = engine.DeckSpec.generate(colors=8, max_number=engine.MAX_NUMBER)
+    deck_spec.special_cards = {}
+    cards = deck_spec.build()
+    codes = np.array([card.code for card in cards], dtype=np.int32)
+    assert batch.card_numbers(codes).tolist() == [card.number for card in cards]
+    assert batch.card_colors(codes).tolist() == [card.color_code for card in cards]
+
+
+def test_batch_games_finish():
+    games = batch.BatchGames(200, seed=3).run()
+    stats = games.stats()
+    assert stats["games"] == 200
+    assert stats["player_wins"] + stats["computer_wins"] + stats["ties"] == 200
+
+
+def engine_game(games: batch.BatchGames, index: int, deck_spec: engine.DeckSpec) -> engine.GameEngine:
+    """Returns a GameEngine game dealt like one game of a batch."""
+    def cards(codes: np.ndarray) -> list:
+        return [engine.Card.from_code(code) for code in codes.tolist()]
+
+    hand_counts = games.hand_counts[index]
+    game = engine.GameEngine(deck_spec=deck_spec)
+    game.new_game(0)
+    game.draw_stack = engine.CardPile(cards(games.draw_stack[index, :games.draw_counts[index]]))
+    game.discard_pile = engine.CardPile()
+    game.player_hand = engine.Hand(cards(games.hands[index, 0, :hand_counts[0]]))
+    game.computer_hand = engine.Hand(cards(games.hands[index, 1, :hand_counts[1]]))
+    return game
+
+
+@pytest.mark.parametrize("deck_spec", [batch.REGULAR_DECK, engine.DeckSpec(special_cards={}, decks=2)])
+def test_batch_games_play_like_the_engine(deck_spec):
+    games = batch.BatchGames(40, deck_spec, seed=5)
+    engine_games = [engine_game(games, index, deck_spec) for index in range(games.games)]
+
+    while True:
+        discard_counts = games.discard_counts.copy()
+        rounds = games.rounds.copy()
+        if not games.step():
+            break
+        for index, game in enumerate(engine_games):
+            if games.rounds[index] == rounds[index]:
+                continue
+            # The cards the batch played are the first two it discarded this round
+            player_code, computer_code = games.discard_pile[index, discard_counts[index]:discard_counts[index] + 2]
+            game.player_played_card, _ = game.play_card_by_code(game.player_hand, int(player_code))
+            game.computer_played_card, _ = game.play_card_by_code(game.computer_hand, int(computer_code))
+            game.resolve_round()
+
+            assert (game.player_score, game.computer_score) == tuple(games.scores[index])
+            assert (game.game_state == engine.LAST_ROUND) == games.finished[index]
+            assert len(game.draw_stack) == games.draw_counts[index]
+            assert [card.code for card in game.discard_pile] == \
+                games.discard_pile[index, :games.discard_counts[index]].tolist()
+            for side, hand in enumerate((game.player_hand, game.computer_hand)):
+                assert sorted(card.code for card in hand) == \
+                    sorted(games.hands[index, side, :games.hand_counts[index, side]].tolist())
+
+    assert games.finished.all()
+    assert all(game.game_state == engine.LAST_ROUND for game in engine_games)
@@ -0,0 +1,512 @@
+"""
+Tests of the data structures of the display-free engine.
+
+Each structure is driven through long random sequences of operations
+next to a plain list that plays the same operations, and its invariants
+are checked after every step.
+"""
+
+import copy
+import pickle
+import random
+
+import pytest
+
+import engine
+
+
+def make_cards(rng: random.Random, count: int) -> list:
+    """Returns random regular and special cards with many equal numbers."""
+    cards = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            cards.append(engine.Card("", 0, rng.choice(["wild", "watcher", "swap"])))
+        else:
+            cards.append(engine.Card(rng.choice(engine.DEFAULT_COLORS), rng.randint(1, 6)))
+    return cards
+
+
+def unused(cards: list, model: list) -> list:
+    """Returns the cards that are not in the model, a Card object is in at most one pile or hand."""
+    held = set(map(id, model))
+    return [card for card in cards if id(card) not in held]
+
+
+def run_model(rng: random.Random, structure, model: list, operations: list, check, steps: int):
+    """Drives a structure through random operations next to a list model of it.
+
+    Args:
+        rng (random.Random): Picks the operations.
+        structure: The pile, hand or queue under test.
+        model (list): The cards the structure should hold, in its order.
+        operations (list[tuple[float, Callable]]): Weighted operations, called as
+            operation(structure, model). An operation changes both in place and
+            may return a new structure to go on with, such as a copy.
+        check (Callable): Called as check(structure, model) after every step.
+
+    Returns:
+        The structure after the last step.
+    """
+    weights = [weight for weight, _ in operations]
+    for _ in range(steps):
+        operation = rng.choices(operations, weights)[0][1]
+        structure = operation(structure, model) or structure
+        check(structure, model)
+    return structure
+
+
+def add_card(rng: random.Random, cards: list):
+    """Returns an operation putting one of the cards that is not in the model on top."""
+    def operation(structure, model):
+        spare = unused(cards, model)
+        if spare:
+            card = rng.choice(spare)
+            structure.append(card)
+            model.append(card)
+    return operation
+
+
+def add_cards(rng: random.Random, cards: list):
+    """Returns an operation putting up to five cards that are not in the model on top."""
+    def operation(structure, model):
+        spare = unused(cards, model)
+        added = rng.sample(spare, min(5, len(spare)))
+        structure.extend(added)
+        model.extend(added)
+    return operation
+
+
+def remove_card(rng: random.Random):
+    """Returns an operation removing a random card of the model."""
+    def operation(structure, model):
+        if model:
+            card = rng.choice(model)
+            structure.remove(card)
+            del model[next(i for i, held in enumerate(model) if held is card)]
+    return operation
+
+
+def shuffle_pile(rng: random.Random):
+    """Returns an operation reordering a pile at random."""
+    def operation(pile, model):
+        model[:] = rng.sample(model, len(model))
+        pile.reorder(list(model))
+    return operation
+
+
+def pop_card(structure, model):
+    """Takes the top card off the structure."""
+    if model:
+        assert structure.pop() is model.pop()
+
+
+def sort_pile(pile, model):
+    """Sorts a pile by card number."""
+    pile.sort_by_number()
+    model.sort(key=engine.card_number)
+
+
+def copy_structure(structure, model):
+    """Goes on with a copy of the structure."""
+    return structure.copy()
+
+
+def check_index(pile: engine.CardPile, model: list) -> None:
+    """Checks the RegularCardIndex of a pile against the cards the pile should hold."""
+    regular = [card for card in model if card.type_code == engine.REGULAR]
+    index = pile.regular_index
+    assert index.count == len(regular)
+    assert pile.has_regular() == bool(regular)
+    assert sorted(map(id, index)) == sorted(map(id, regular))
+    assert index.numbers == sorted({card.number for card in regular})
+
+    expected = sorted((card.number for card in regular), reverse=True)
+    for k in (1, 4, len(regular) + 1):
+        largest = pile.largest_regular(k)
+        assert [card.number for card in largest] == expected[:k]
+        assert len(set(map(id, largest))) == len(largest)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_regular_card_index_follows_pile_changes(seed):
+    rng = random.Random(seed)
+    cards = make_cards(rng, 40)
+    pile = run_model(rng, engine.CardPile(cards[:20]), cards[:20], [
+        (3, add_card(rng, cards)),
+        (2, pop_card),
+        (2, remove_card(rng)),
+        (1, sort_pile),
+        (1, copy_structure),
+        (0.5, add_cards(rng, cards)),
+        (0.5, shuffle_pile(rng)),
+    ], check_index, steps=300)
+
+    pile.clear()
+    check_index(pile, [])
+
+
+def test_reordering_a_pile_keeps_its_index():
+    rng = random.Random(3)
+    pile = engine.CardPile(make_cards(rng, 50))
+    index = pile.regular_index
+    buckets = dict(index.buckets)
+    order = list(index)
+
+    pile.sort_by_number()
+    pile.reorder(rng.sample(list(pile), len(pile)))
+    removed = pile[0]
+    pile.remove(removed)
+    pile.compact()
+    assert pile.regular_index is index
+    assert all(index.buckets[number] is bucket for number, bucket in buckets.items() if number in index.buckets)
+    assert list(index) == [card for card in order if card is not removed]
+
+
+@pytest.mark.parametrize("deck_spec", [engine.DEFAULT_DECK, engine.DeckSpec(decks=3)])
+def test_game_piles_keep_their_index(deck_spec):
+    game = engine.GameEngine(deck_spec=deck_spec, seed=4)
+    for _ in range(20):
+        game.new_game()
+        while game.play_round():
+            check_index(game.draw_stack, list(game.draw_stack))
+            check_index(game.discard_pile, list(game.discard_pile))
+
+
+def test_regular_card_index_offers_equal_numbers_in_insertion_order():
+    cards = [engine.Card(color, 7) for color in engine.DEFAULT_COLORS]
+    pile = engine.CardPile([engine.Card("Red", 3)] + cards)
+    assert pile.largest_regular(3) == cards[:3]
+    assert all(offered is card for offered, card in zip(pile.largest_regular(3), cards))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_regular_card_index_offers_the_numbers_of_the_max_heap(seed):
+    # The Wild card used the heap before, equal numbers can come in another order
+    cards = [card for card in make_cards(random.Random(seed), 60) if card.type_code == engine.REGULAR]
+    heap = engine.MaxHeap()
+    for card in cards:
+        heap.add(card)
+    offered = engine.CardPile(cards).largest_regular(4)
+    assert [card.number for card in offered] == [card.number for card in heap.get_largest_four()]
+    assert heap.count == len(cards)
+
+
+def test_restored_pile_keeps_index_order():
+    cards = [engine.Card(color, 5) for color in engine.DEFAULT_COLORS]
+    pile = engine.CardPile(cards, cards[::-1])
+    assert [card.color for card in pile.largest_regular(4)] == engine.DEFAULT_COLORS[::-1]
+
+
+def check_pile(pile: engine.CardPile, model: list) -> None:
+    """Checks the order, length and tombstone counts of a pile against a list of its cards."""
+    assert len(pile) == len(model)
+    assert all(card is expected for card, expected in zip(pile, model))
+    assert pile.cards.count(None) == pile.tombstones
+    assert len(pile.cards) - pile.tombstones == pile.live
+    if pile.tombstones > 16:
+        assert pile.tombstones * 2 <= len(pile.cards)
+
+
+def peek_pile(pile, model):
+    """Looks at the top and bottom cards of a pile."""
+    if model:
+        assert pile[-1] is model[-1]
+        assert pile[0] is model[0]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_card_pile_removal_keeps_order(seed):
+    rng = random.Random(seed)
+    cards = make_cards(rng, 200)
+
+    def check(pile, model):
+        check_pile(pile, model)
+        check_index(pile, model)
+
+    run_model(rng, engine.CardPile(cards), list(cards), [
+        (10, remove_card(rng)),
+        (4, pop_card),
+        (3, add_card(rng, cards)),
+        (1, peek_pile),
+        (1, sort_pile),
+        (1, copy_structure),
+    ], check, steps=400)
+
+
+def test_card_pile_positions_are_rebuilt_once_after_a_reorder():
+    cards = [engine.Card(color, number) for number in range(10, 0, -1) for color in engine.DEFAULT_COLORS]
+    pile = engine.CardPile(cards)
+    pile.sort_by_number()
+    assert pile.positions is None
+
+    pile.remove(cards[0])
+    positions = pile.positions
+    for card in cards[1:10]:
+        assert pile.remove(card)
+        assert pile.positions is positions
+    pile.append(cards[0])
+    assert pile.pop() is cards[0]
+
+    # Compacting an already sorted pile keeps the positions
+    pile.sort_by_number()
+    assert pile.tombstones == 0
+    pile.replace(0, cards[1])
+    pile.swap(0, -1)
+    assert pile.remove(cards[1])
+    assert pile.positions is positions
+    assert len(positions) == len(pile) == 29
+
+
+def test_card_pile_compacts_a_logarithmic_number_of_times():
+    cards = [engine.Card("Blue", 1 + number % 10) for number in range(4096)]
+    pile = engine.CardPile(cards)
+    compactions = []
+    compact = pile.compact
+    pile.compact = lambda: compactions.append(len(pile)) or compact()
+    for card in cards[::2] + cards[1::2]:
+        pile.remove(card)
+    assert len(pile) == 0
+    assert len(compactions) <= 12
+
+
+def test_card_pile_remove_matches_identity():
+    red = engine.Card("Red", 4)
+    pile = engine.CardPile([red, engine.Card("Blue", 9)])
+    assert not pile.remove(engine.Card("Red", 4))
+    assert pile.remove(red)
+    assert not pile.remove(red)
+    assert [str(card) for card in pile] == ["Blue 9"]
+
+
+def test_card_pile_pop_skips_tombstones():
+    cards = [engine.Card("Red", number) for number in range(1, 6)]
+    pile = engine.CardPile(cards)
+    pile.remove(cards[4])
+    pile.remove(cards[3])
+    assert pile.pop() is cards[2]
+    assert pile.tombstones == 0
+    check_pile(pile, cards[:2])
+
+
+def test_card_pile_compacts_when_mostly_tombstones():
+    cards = [engine.Card("Green", 1 + number % 10) for number in range(100)]
+    pile = engine.CardPile(cards)
+    for card in cards[:60]:
+        pile.remove(card)
+    assert pile.tombstones < 50
+    check_pile(pile, cards[60:])
+
+
+def test_cards_hold_interned_codes_in_slots():
+    card = engine.Card("Green", 4)
+    assert not hasattr(card, "__dict__")
+    assert card.color_code == engine.COLOR_CODES.code("Green") == engine.Card("Green", 9).color_code
+    assert (card.color, card.number, card.card_type) == ("Green", 4, "regular")
+    wild = engine.Card("", 0, "wild")
+    assert (wild.type_code, wild.color_code, str(wild)) == (engine.WILD, 0, "Wild")
+
+    assert card == engine.Card("Green", 4)
+    assert card != engine.Card("Blue", 4)
+    assert engine.Card("Red", 2) < card < engine.Card("Blue", 9)
+    for copied in (copy.copy(card), copy.deepcopy(card), pickle.loads(pickle.dumps(card))):
+        assert copied == card and copied is not card
+
+
+@pytest.mark.parametrize("deck_spec", [
+    engine.DEFAULT_DECK,
+    engine.DeckSpec.generate(colors=12, max_number=engine.MAX_NUMBER, decks=2),
+    engine.DeckSpec(numbers=[0, 1, engine.MAX_NUMBER]),
+])
+def test_card_codes_round_trip(deck_spec):
+    cards = deck_spec.build()
+    for card in cards:
+        decoded = engine.Card.from_code(card.code)
+        assert decoded == card
+        assert decoded.code == card.code
+    distinct = {(card.color, card.number, card.card_type) for card in cards}
+    assert len({card.code for card in cards}) == len(distinct)
+
+
+def test_deck_spec_rejects_numbers_that_do_not_fit_in_a_code():
+    with pytest.raises(ValueError):
+        engine.DeckSpec.generate(max_number=engine.MAX_NUMBER + 1)
+    with pytest.raises(ValueError):
+        engine.DeckSpec(numbers=[-1, 5])
+
+
+def test_deck_spec_rejects_colors_that_do_not_fit_in_a_code():
+    with pytest.raises(ValueError):
+        engine.DeckSpec.generate(colors=engine.MAX_COLOR_CODE + 1)
+
+
+def test_color_codes_stop_at_the_code_limit():
+    table = engine.CodeTable(["", "Red"], max_code=2)
+    assert table.code("Blue") == 2
+    assert table.code("Red") == 1
+    with pytest.raises(ValueError):
+        table.code("Green")
+
+
+def check_queue(queue: engine.Queue, model: list) -> None:
+    """Checks a Watcher history against the list of its cards, newest first."""
+    assert len(queue) == len(model)
+    assert [queue[i] for i in range(len(queue))] == model
+    assert queue.number_total == sum(card.number for card in model)
+    run = 0
+    while run < len(model) and model[run].color_code == model[0].color_code:
+        run += 1
+    assert queue.color_run == run
+    for k in range(1, queue.size + 1):
+        assert queue.last_share_color(k) == (len(model) >= k and run >= k)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 50])
+def test_queue_ring_buffer_keeps_the_newest_cards(size):
+    rng = random.Random(size)
+
+    def enqueue(queue, model):
+        card = engine.Card(rng.choice(engine.DEFAULT_COLORS[:2]), rng.randint(1, 10))
+        queue.enqueue(card)
+        model.insert(0, card)
+        del model[size:]
+
+    def clear(queue, model):
+        queue.clear()
+        model.clear()
+
+    model = []
+    queue = run_model(rng, engine.Queue(size), model, [
+        (30, enqueue),
+        (1, copy_structure),
+        (0.3, clear),
+    ], check_queue, steps=500)
+
+    with pytest.raises(IndexError):
+        queue[len(model)]
+    if model:
+        assert queue[-1] is model[-1]
+
+
+def test_queue_slots_are_allocated_once():
+    queue = engine.Queue(3)
+    slots = queue.slots
+    for number in range(1, 11):
+        queue.enqueue(engine.Card("Red", number))
+    queue.clear()
+    queue.enqueue(engine.Card("Blue", 4))
+    assert queue.slots is slots
+    assert len(slots) == 3
+    assert len(queue) == 1 and queue[0].number == 4
+
+
+def check_hand(hand: engine.Hand, model: list) -> None:
+    """Checks the type and color counts of a hand against the list of its cards."""
+    assert hand.cards == model
+    for type_code in range(len(engine.CARD_TYPE_CODES.names)):
+        assert hand.count_type(type_code) == sum(card.type_code == type_code for card in model)
+        index = next((i for i, card in enumerate(model) if card.type_code == type_code), -1)
+        assert hand.index_of_type(type_code) == index
+    for color_code in range(len(engine.COLOR_CODES.names)):
+        assert hand.count_color(color_code) == sum(
+            card.type_code == engine.REGULAR and card.color_code == color_code for card in model)
+    assert hand.has_regular() == any(card.type_code == engine.REGULAR for card in model)
+    assert hand.playable_count() == sum(card.type_code != engine.WATCHER for card in model)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_hand_counts_follow_changes(seed):
+    rng = random.Random(seed)
+    cards = make_cards(rng, 30)
+
+    def pop_at(hand, model):
+        if model:
+            index = rng.randrange(len(model))
+            assert hand.pop(index) is model.pop(index)
+
+    def check_copy(hand, model):
+        copied = hand.copy()
+        assert copied.listener is None
+        check_hand(copied, model)
+
+    def clear(hand, model):
+        hand.clear()
+        model.clear()
+
+    hand = engine.Hand(cards[:5])
+    changes = []
+    hand.listener = changes.append
+    run_model(rng, hand, cards[:5], [
+        (40, add_card(rng, cards)),
+        (20, pop_at),
+        (20, remove_card(rng)),
+        (10, check_copy),
+        (2, clear),
+    ], check_hand, steps=300)
+    assert changes and all(changed is hand for changed in changes)
+
+
+class UnscannedList(list):
+    """A card list that fails the test when it is iterated."""
+
+    def __iter__(self):
+        raise AssertionError("the cards were scanned")
+
+
+def test_counts_answer_without_scanning_the_cards():
+    hand = engine.Hand([engine.Card("Red", 3), engine.Card("", 0, "swap"), engine.Card("Blue", 5)])
+    hand.cards = UnscannedList(hand.cards)
+    assert hand.index_of_type(engine.WATCHER) == -1
+    assert hand.count_type(engine.CARD_TYPE_CODES.code("swap")) == 1
+    assert hand.count_color(engine.COLOR_CODES.code("Blue")) == 1
+    assert hand.has_regular()
+    assert hand.playable_count() == 3
+
+    pile = engine.CardPile([engine.Card("", 0, "wild"), engine.Card("Green", 2)])
+    pile.cards = UnscannedList(pile.cards)
+    assert pile.has_regular()
+    assert [card.number for card in pile.largest_regular(4)] == [2]
+
+
+@pytest.mark.parametrize("deck_spec", [engine.DEFAULT_DECK, engine.DeckSpec(decks=3)])
+def test_game_hands_keep_their_counts(deck_spec):
+    game = engine.GameEngine(deck_spec=deck_spec, seed=6)
+    for _ in range(20):
+        game.new_game()
+        while game.play_round():
+            check_hand(game.player_hand, list(game.player_hand.cards))
+            check_hand(game.computer_hand, list(game.computer_hand.cards))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_card_pile_replace_keeps_the_index(seed):
+    rng = random.Random(seed)
+    cards = make_cards(rng, 60)
+
+    def replace_card(pile, model):
+        spare = unused(cards, model)
+        if model and spare:
+            index = rng.randrange(-len(model), len(model))
+            card = rng.choice(spare)
+            assert pile.replace(index, card) is model[index]
+            model[index] = card
+
+    def check(pile, model):
+        check_pile(pile, model)
+        check_index(pile, model)
+
+    run_model(rng, engine.CardPile(cards[:30]), cards[:30], [
+        (1, remove_card(rng)),
+        (4, replace_card),
+    ], check, steps=100)
+
+
+def test_card_pile_swap_keeps_positions():
+    cards = [engine.Card("Red", number) for number in range(1, 9)]
+    pile = engine.CardPile(cards)
+    pile.remove(cards[0])
+    pile.swap(1, -1)
+    model = [cards[1], cards[7], *cards[3:7], cards[2]]
+    check_pile(pile, model)
+    assert pile.remove(cards[2]) and pile.remove(cards[7])
+    check_pile(pile, [cards[1], *cards[3:7]])
+    check_index(pile, [cards[1], *cards[3:7]])
@@ -0,0 +1,64 @@
+"""
+Tests of the pygame front end that do not need a window.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import engine
+import game
+
+# Run in a fresh interpreter, the display state of pygame is global
+STARTUP_SCRIPT = """
+import pygame
+import game
+print(game.screen is None, pygame.display.get_init(), pygame.font.get_init())
+screen = game.start(splash=False)
+print(game.start() is screen, pygame.display.get_init(), pygame.mixer.get_init(), len(game.card_atlas.images) > 0)
+game.game_engine.new_game(1)
+game.board_renderer.render()
+"""
+
+
+class BlankAtlas:
+    """Stands in for the CardAtlas with one blank image per file name."""
+
+    def __init__(self) -> None:
+        """Initialises the atlas without images."""
+        self.images = {}
+
+    def get(self, filename: str) -> pygame.Surface:
+        """Returns the image of a file name, the same one on every call."""
+        return self.images.setdefault(filename, pygame.Surface((1, 1)))
+
+
+def test_card_views_share_faces_and_keep_state_by_identity():
+    views = game.CardViews(BlankAtlas())
+    first, second = engine.Card("Red", 7), engine.Card("Red", 7)
+    assert views.image(first) is views.image(second)
+    assert views.image(engine.Card("", 0, "wild")) is views.atlas.images["WILD.png"]
+    assert views.rect(first) is not views.rect(second)
+
+    views.select(second)
+    assert views.is_selected(second)
+    assert not views.is_selected(first)
+
+    rect = views.rect(first)
+    rect.topleft = (40, 50)
+    views.clear()
+    assert views.rect(first) is rect
+    assert rect.topleft == (0, 0)
+    assert views.selected is None
+
+
+def test_start_opens_the_window_once_and_not_on_import():
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=folder, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.splitlines() == ["True False False", "True True None True"]
@@ -0,0 +1,87 @@
+"""
+Tests of the binary game logs: recorded games replay exactly.
+"""
+
+import pytest
+
+import ai
+import engine
+import gamelog
+
+
+def record_games(path, game: engine.GameEngine, games: int, max_rounds: int = 1000) -> list:
+    """Records headless games and returns the final scores and rounds of each one."""
+    results = []
+    with gamelog.GameRecorder(str(path)) as recorder:
+        game.recorder = recorder
+        for _ in range(games):
+            engine.simulate_game(game, max_rounds)
+            results.append((game.player_score, game.computer_score, game.rounds_played))
+    game.recorder = None
+    return results
+
+
+def test_replay_equals_the_live_games(tmp_path):
+    path = tmp_path / "games.log"
+    results = record_games(path, engine.GameEngine(seed=5), 300)
+
+    replayer = gamelog.GameReplayer()
+    replayed = []
+    for record_type in replayer.records(str(path)):
+        if record_type == gamelog.END:
+            game = replayer.game
+            replayed.append((game.player_score, game.computer_score, replayer.game_rounds))
+    assert replayed == results
+    assert replayer.games == 300
+    assert replayer.rounds == sum(rounds for _, _, rounds in results)
+
+
+def test_replay_of_a_search_computer(tmp_path):
+    path = tmp_path / "search.log"
+    game = engine.GameEngine(seed=2)
+    game.computer_strategy = ai.SearchAI(max_playouts=20, seed=1)
+    results = record_games(path, game, 5)
+
+    replayer = gamelog.GameReplayer().replay(str(path))
+    assert replayer.games == 5
+    assert (replayer.game.player_score, replayer.game.computer_score) == results[-1][:2]
+
+
+def test_records_of_large_decks(tmp_path):
+    # The reordered draw stacks of this deck are longer than a u16 payload
+    path = tmp_path / "large.log"
+    deck_spec = engine.DeckSpec(decks=350)
+    record_games(path, engine.GameEngine(deck_spec=deck_spec, seed=4), 1, max_rounds=300)
+
+    largest = max(len(fields[-1]) for record_type, fields in gamelog.read_records(str(path))
+                  if record_type == gamelog.ROUND)
+    assert largest * 4 > 0xFFFF
+    replayer = gamelog.GameReplayer(engine.GameEngine(deck_spec=deck_spec)).replay(str(path))
+    assert replayer.rounds == 300
+
+
+def test_replay_detects_a_changed_log(tmp_path):
+    path = tmp_path / "games.log"
+    record_games(path, engine.GameEngine(seed=8), 3)
+    data = bytearray(path.read_bytes())
+    # Change the player score change of the first round
+    offset = gamelog.HEADER.size + gamelog.GAME_RECORD.size + gamelog.HEADER.size + 9
+    data[offset] ^= 0x7F
+    path.write_bytes(bytes(data))
+    with pytest.raises(gamelog.ReplayMismatch):
+        gamelog.GameReplayer().replay(str(path))
+
+
+@pytest.mark.parametrize("cut", [1, 3, gamelog.HEADER.size + 2])
+def test_replay_detects_a_truncated_log(tmp_path, cut):
+    path = tmp_path / "games.log"
+    record_games(path, engine.GameEngine(seed=8), 3)
+    path.write_bytes(path.read_bytes()[:-cut])
+    with pytest.raises(gamelog.ReplayMismatch, match="truncated"):
+        gamelog.GameReplayer().replay(str(path))
+
+
+def test_empty_log(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_bytes(b"")
+    assert list(gamelog.read_records(str(path))) == []
@@ -0,0 +1,607 @@
+"""
+Tests of the game rules of the display-free engine.
+
+Rounds are set up with chosen hands and piles and resolved directly, and
+seeded headless games are checked against the rules round by round.
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+import engine
+
+
+def make(name: str) -> engine.Card:
+    """Builds a card from its name, such as "Red 5" or "Wild"."""
+    if " " in name:
+        color, number = name.split()
+        return engine.Card(color, int(number))
+    return engine.Card("", 0, name.lower())
+
+
+def game_with(player=(), computer=(), draw=(), discard=(), seed: int = 0) -> engine.GameEngine:
+    """Returns a new game whose hands and piles hold the named cards, top cards last."""
+    game = engine.GameEngine(seed=seed)
+    game.new_game(seed)
+    game.player_hand = engine.Hand(map(make, player))
+    game.computer_hand = engine.Hand(map(make, computer))
+    game.draw_stack = engine.CardPile(map(make, draw))
+    game.discard_pile = engine.CardPile(map(make, discard))
+    return game
+
+
+def names(cards) -> list:
+    """Returns the names of some cards."""
+    return [str(card) for card in cards]
+
+
+@pytest.mark.parametrize("player, computer, previous, player_points, computer_points, message", [
+    ("Red 7", "Red 4", None, 11, 0, "Player wins the round and gets 11 points!"),
+    ("Red 2", "Red 9", None, 0, 11, "Computer wins the round and gets 11 points!"),
+    ("Red 7", "Red 4", ("Blue 7", "Blue 1"), 13, 0, "Player wins the round and gets 13 points!"),
+    ("Red 2", "Red 9", ("Blue 2", "Green 9"), 0, 13, "Computer wins the round and gets 13 points!"),
+    ("Red 2", "Red 9", ("Blue 9", "Green 2"), 0, 11, "Computer wins the round and gets 11 points!"),
+    ("Red 5", "Red 5", None, 0, 0, "It's a tie! No points awarded."),
+    ("Red 5", "Blue 9", None, 0, 0, "Colours don't match! No points awarded."),
+])
+def test_resolve_round_compares_cards_of_the_same_color(player, computer, previous, player_points,
+                                                       computer_points, message):
+    game = game_with(["Green 3"], ["Green 4", "Yellow 1"], ["Blue 1", "Blue 2", "Blue 3"])
+    if previous is not None:
+        game.previous_player_card, game.previous_computer_card = map(make, previous)
+    game.player_played_card = make(player)
+    game.computer_played_card = make(computer)
+
+    discard_pile, result_message, played_info = game.resolve_round()
+    assert (game.player_score, game.computer_score) == (player_points, computer_points)
+    assert result_message == game.result_message == message
+    assert played_info == f"Player played: {player} | Computer played: {computer}"
+    assert discard_pile is game.discard_pile
+    assert names(game.discard_pile) == [player, computer]
+    assert names(game.player_hand) == ["Green 3", "Blue 3"]
+    assert names(game.computer_hand) == ["Green 4", "Yellow 1", "Blue 2"]
+    assert game.previous_player_card is game.player_played_card
+    assert game.previous_computer_card is game.computer_played_card
+
+
+def test_resolve_round_without_both_cards():
+    game = game_with(["Red 1"], ["Red 2"], ["Red 3"])
+    game.player_played_card = make("Red 4")
+    assert game.resolve_round()[2] == "No cards played."
+    assert len(game.discard_pile) == 0
+    assert (game.player_score, game.computer_score) == (0, 0)
+
+
+def test_watcher_watches_the_opponent_history():
+    game = game_with(["Watcher", "Green 1"], ["Yellow 2"], ["Blue 8", "Green 5"])
+    game.computer_card_history.enqueue(make("Blue 3"))
+    game.player_played_card = make("Red 2")
+    game.computer_played_card = make("Blue 6")
+
+    _, result_message, _ = game.resolve_round()
+    # The average of the watched Blue 3 and Blue 6, rounded up
+    assert game.player_score == 5
+    assert game.computer_score == 0
+    assert "Player's Watcher triggered! +5 points." in result_message
+    assert result_message.endswith("Colours don't match! No points awarded.")
+    assert names(game.discard_pile) == ["Watcher", "Red 2", "Blue 6"]
+    # The Watcher is replaced first, then the hands are refilled from the draw stack
+    assert names(game.player_hand) == ["Green 1", "Green 5", "Blue 8"]
+    assert names(game.computer_hand) == ["Yellow 2"]
+
+
+def test_watcher_needs_a_full_history_of_one_color():
+    game = game_with(["Watcher"], ["Watcher"], ["Blue 8"])
+    game.computer_card_history.enqueue(make("Blue 3"))
+    game.player_card_history.enqueue(make("Red 3"))
+    game.player_played_card = make("Green 2")
+    game.computer_played_card = make("Yellow 6")
+    game.resolve_round()
+    assert (game.player_score, game.computer_score) == (0, 0)
+    assert game.watcher_message == ""
+    assert names(game.player_hand)[0] == names(game.computer_hand)[0] == "Watcher"
+
+
+@pytest.mark.parametrize("history, bonus", [(["Blue 3", "Blue 5"], 0), (["Blue 3", "Blue 5", "Blue 1"], 4)])
+def test_watcher_window_can_be_larger(history, bonus):
+    game = game_with(["Watcher", "Green 1"], ["Yellow 2"], ["Blue 8", "Green 5"])
+    game.watcher_window = 4
+    game.initialise_watcher_history()
+    for name in history:
+        game.computer_card_history.enqueue(make(name))
+    game.player_played_card = make("Red 2")
+    game.computer_played_card = make("Blue 6")
+    game.resolve_round()
+    assert (game.player_score, game.computer_score) == (bonus, 0)
+
+
+@pytest.mark.parametrize("player, computer, message", [
+    ("Swap", "Red 4", "Player used Swap! Hands have been exchanged"),
+    ("Red 4", "Swap", "Computer used Swap! Hands have been exchanged"),
+])
+def test_swap_exchanges_the_hands(player, computer, message):
+    game = game_with(["Green 1"], ["Yellow 1", "Yellow 2"], ["Blue 1", "Blue 2", "Blue 3", "Blue 4"])
+    game.player_played_card = make(player)
+    game.computer_played_card = make(computer)
+
+    _, result_message, _ = game.resolve_round()
+    assert result_message == message
+    assert (game.player_score, game.computer_score) == (0, 0)
+    # Both drew one card before the hands were exchanged
+    assert names(game.computer_hand)[:2] == ["Green 1", "Blue 4"]
+    assert names(game.player_hand)[:3] == ["Yellow 1", "Yellow 2", "Blue 3"]
+    assert len(game.player_hand) + len(game.computer_hand) == 7
+    assert names(game.discard_pile) == [player, computer]
+
+
+def quicksort(cards: list) -> list:
+    """The sort of the first version of the game, it does not keep the order of equal numbers."""
+    if len(cards) <= 1:
+        return cards
+    pivot = cards[0]
+    return (quicksort([card for card in cards[1:] if card.number <= pivot.number]) + [pivot]
+            + quicksort([card for card in cards[1:] if card.number > pivot.number]))
+
+
+def stable_sort(cards: list) -> list:
+    """Sorts cards by number like `engine.sort_by_number`, keeping the order of equal numbers."""
+    return sorted(cards, key=engine.card_number)
+
+
+def first_version_special_round(player_card, computer_card, player_hand, computer_hand, draw_stack, rng, sort):
+    """Resolves a round of special cards with the if-chain of the first version of the game.
+
+    The lists are changed in place like the globals of the first version,
+    its random module is replaced by `rng` and its quicksort by `sort`.
+
+    Returns:
+        tuple | None: The points of both sides, the result message, the hands, the
+            draw stack and the discard pile, or None if the round is resolved by
+            comparing the cards.
+    """
+    player_type, computer_type = player_card.card_type, computer_card.card_type
+    twopoints_player = player_type == "twopoints"
+    twopoints_computer = computer_type == "twopoints"
+    colorstorm_played = "colorstorm" in (player_type, computer_type)
+    ascendancy_played = "ascendancy" in (player_type, computer_type)
+    joker_player = player_type == "joker"
+    joker_computer = computer_type == "joker"
+    swap_player = player_type == "swap"
+    swap_computer = computer_type == "swap"
+    if not (colorstorm_played or ascendancy_played or twopoints_player or twopoints_computer
+            or joker_player or joker_computer or swap_player or swap_computer):
+        return None
+
+    def colorstorm():
+        grouped = {}
+        for card in draw_stack:
+            grouped.setdefault(card.color, []).append(card)
+        color_order = engine.shuffle(list(grouped), rng)
+        draw_stack[:] = [card for color in color_order for card in sort(grouped[color])]
+
+    points = [0, 0]
+    hands = [player_hand, computer_hand]
+    message = ""
+    discard = [player_card, computer_card]
+    joker = joker_player or joker_computer
+    if not joker:
+        points[0] += 2 * twopoints_player
+        points[1] += 2 * twopoints_computer
+    if joker_player:
+        if computer_type == "regular":
+            points[0] += computer_card.number
+            message = f"Player played joker and gets {computer_card.number} points!"
+        else:
+            points[0] += 5
+            message = f"Player played joker and gets 5 points! {computer_type.capitalize()} is not activated"
+    elif joker_computer:
+        if player_type == "regular":
+            points[1] += player_card.number
+            message = f"Computer played joker and gets {player_card.number} points!"
+        else:
+            points[1] += 5
+            message = f"computer played joker and gets 5 points! {player_type.capitalize()} is not activated"
+
+    if not joker and (swap_player or swap_computer):
+        for hand in hands:
+            if draw_stack:
+                hand.append(draw_stack.pop())
+        hands.reverse()
+    if not joker and colorstorm_played and ascendancy_played:
+        if len(draw_stack) >= 3:
+            if rng.choice(["colorstorm", "ascendancy"]) == "colorstorm":
+                colorstorm()
+            else:
+                draw_stack[:] = sort(draw_stack)
+            message = "Colorstorm and Ascendancy played! One card is activated, but it's a mystery."
+        else:
+            message = "Not enough cards in the draw stack to activate special card."
+    if not joker and colorstorm_played:
+        if len(draw_stack) >= 3:
+            colorstorm()
+            message = "Colorstorm played! Draw stack reordered by color"
+        else:
+            message = "Colorstorm played! There is no enough cards to reorder in the draw stack"
+    if not joker and ascendancy_played:
+        if len(draw_stack) >= 2:
+            draw_stack[:] = sort(draw_stack)
+            message = "Ascendancy played! Draw stack is sorted in ascending order"
+        else:
+            message = "Ascendancy played! There is no enough cards to sort the draw stack"
+
+    if not joker:
+        combinations = (
+            (twopoints_player and twopoints_computer, "Both players used Two points card! Each gets 2 points."),
+            (twopoints_player and colorstorm_played,
+             "Two points and Colorstorm Cards are played! Player gets 2 points and Draw stack is reordered"),
+            (twopoints_player and ascendancy_played,
+             "Two points and Ascendancy Cards are played! Player gets 2 points and Draw stack is sorted"),
+            (twopoints_computer and swap_player,
+             "Two points and Swap cards are played! Computer gets 2 points and hands are swapped"),
+            (swap_player and ascendancy_played,
+             "Swap and Ascendancy are played! Draw stack is sorted and hands are swapped"),
+            (swap_player and colorstorm_played,
+             "Swap and Colorstorm are played! Draw stack is reordered and hands are swapped"),
+            (twopoints_computer and colorstorm_played,
+             "Two points and Colorstorm are played! Computer gets 2 points and draw stack is reordered"),
+            (twopoints_computer and ascendancy_played,
+             "Two points and Ascendancy are played! Computer gets 2 points and draw stack is sorted"),
+            (twopoints_player and swap_computer,
+             "Two points and Swap are Played! Player gets 2 points and hands are swapped"),
+            (swap_computer and ascendancy_played,
+             "Swap and Ascendancy are played! Draw stack is sorted and hands are swapped"),
+            (swap_computer and colorstorm_played,
+             "Swap and Colorstorm are played! Draw stack is reordered and hands are swapped"),
+            (twopoints_player, "Player used two points card and gets 2 points"),
+            (twopoints_computer, "Computer used two points card and gets 2 points"),
+        )
+        message = next((text for applies, text in combinations if applies), message)
+        if not message and swap_player:
+            message = "Player used Swap! Hands have been exchanged"
+        elif not message and swap_computer:
+            message = "Computer used Swap! Hands have been exchanged"
+
+    for who in engine.shuffle([0, 1], rng):
+        if draw_stack and len(hands[who]) < 5:
+            hands[who].append(draw_stack.pop())
+    return tuple(points), message, hands[0], hands[1], draw_stack, discard
+
+
+CARD_TYPES = ["regular", "wild", "watcher", "colorstorm", "ascendancy", "twopoints", "joker", "swap"]
+SPECIAL_ROUND_DRAW_STACKS = [
+    ["Red 4"],
+    ["Red 4", "Blue 2", "Green 4", "Red 1", "Blue 4", "Yellow 2", "Red 4", "Green 9", "Blue 1", "Yellow 4"],
+]
+
+
+@pytest.mark.parametrize("draw", SPECIAL_ROUND_DRAW_STACKS)
+@pytest.mark.parametrize("computer_type", CARD_TYPES)
+@pytest.mark.parametrize("player_type", CARD_TYPES)
+def test_special_rules_match_the_first_version(player_type, computer_type, draw):
+    player_card = make("Red 6") if player_type == "regular" else engine.Card("", 0, player_type)
+    computer_card = make("Blue 3") if computer_type == "regular" else engine.Card("", 0, computer_type)
+
+    for seed in range(4):
+        game = game_with(["Green 1", "Blue 2", "Yellow 9", "Red 7"], ["Yellow 3", "Green 3"], draw)
+        first_version = {
+            sort: first_version_special_round(player_card, computer_card, list(game.player_hand),
+                                              list(game.computer_hand), list(game.draw_stack),
+                                              random.Random(seed), sort)
+            for sort in (stable_sort, quicksort)
+        }
+        if first_version[stable_sort] is None:
+            assert engine.special_rule(player_card.type_code, computer_card.type_code) is None
+            return
+
+        game.rng.seed(seed)
+        game.player_played_card = player_card
+        game.computer_played_card = computer_card
+        _, result_message, _ = game.resolve_round()
+        played = ((game.player_score, game.computer_score), result_message, game.player_hand,
+                  game.computer_hand, game.draw_stack, game.discard_pile)
+
+        points, message, *cards = first_version[stable_sort]
+        assert played[:2] == (points, message)
+        for pile, expected in zip(played[2:], cards):
+            assert list(map(id, pile)) == list(map(id, expected))
+
+        # The quicksort of the first version gave the same numbers, equal numbers in another order
+        points, message, *cards = first_version[quicksort]
+        assert played[:2] == (points, message)
+        for pile, expected in zip(played[2:], cards):
+            assert [card.number for card in pile] == [card.number for card in expected]
+
+
+def test_game_over_is_checked_on_the_hands_left_by_a_swap():
+    game = game_with(["Swap", "Red 1"], ["Red 4", "Red 3", "Red 2"])
+    game.check_game_over()
+    game.player_played_card = game.player_hand.pop(0)
+    game.computer_played_card = game.computer_hand.pop()
+    game.resolve_round()
+    game.check_game_over()
+    assert game.game_state == engine.SELECTING_CARD
+    assert names(game.player_hand) == ["Red 4", "Red 3"]
+
+    # The exchanged hands are still watched
+    game.player_hand.pop()
+    game.player_hand.pop()
+    game.check_game_over()
+    assert game.game_state == engine.LAST_ROUND
+    assert game.result_message == "Game ended with 1 leftover card."
+    assert game.computer_score == 1
+
+
+def test_game_over_is_checked_on_the_cards_of_a_new_game():
+    game = engine.GameEngine(seed=5)
+    game.new_game()
+    while game.play_round():
+        pass
+    assert game.game_state == engine.LAST_ROUND
+
+    game.new_game()
+    game.check_game_over()
+    assert game.game_state == engine.SELECTING_CARD
+    game.draw_stack.clear()
+    game.computer_hand.clear()
+    while len(game.player_hand) > 1:
+        game.player_hand.pop()
+    game.check_game_over()
+    assert game.game_state == engine.LAST_ROUND
+    assert game.result_message == "Game ended with 1 leftover card."
+
+
+def test_auto_play_card_of_a_wild_takes_a_largest_card_of_the_draw_stack():
+    game = game_with(draw=["Red 9", "Blue 2", "Red 8", "Joker", "Green 10", "Yellow 7", "Blue 9"])
+    hand = engine.Hand([make("Wild")])
+    largest = game.draw_stack.largest_regular(4)
+    assert names(largest) == ["Green 10", "Red 9", "Blue 9", "Red 8"]
+
+    card, used_wild = game.auto_play_card(hand)
+    assert used_wild
+    assert any(card is offered for offered in largest)
+    assert all(card is not pile_card for pile_card in game.draw_stack)
+    assert len(game.draw_stack) == 6
+    assert names(game.discard_pile) == ["Wild"]
+    assert len(hand) == 0
+
+
+def test_auto_play_card_of_a_wild_takes_from_the_discard_pile_without_regular_cards_to_draw():
+    game = game_with(draw=["Joker", "Swap"], discard=["Red 3", "Blue 6"])
+    card, used_wild = game.auto_play_card(engine.Hand([make("Wild")]))
+    assert used_wild
+    assert str(card) in ("Red 3", "Blue 6")
+    assert names(game.draw_stack) == ["Joker", "Swap"]
+    # The chosen card is taken out of the discard pile, it is discarded again after the round
+    assert all(card is not discarded for discarded in game.discard_pile)
+    assert len(game.discard_pile) == 2
+
+
+def test_auto_play_card_of_a_wild_without_regular_cards():
+    game = game_with(draw=["Joker"], discard=["Swap"])
+    assert game.auto_play_card(engine.Hand([make("Wild")])) == (None, False)
+    assert names(game.discard_pile) == ["Swap", "Wild"]
+
+
+def test_auto_play_card_never_plays_a_watcher():
+    game = game_with(draw=["Red 1"])
+    for _ in range(20):
+        hand = engine.Hand(map(make, ["Watcher", "Red 4", "Watcher"]))
+        card, used_wild = game.auto_play_card(hand)
+        assert str(card) == "Red 4" and not used_wild
+        assert names(hand) == ["Watcher", "Watcher"]
+    assert game.auto_play_card(engine.Hand([make("Watcher")])) == (None, False)
+
+
+def test_played_card_leaves_a_hand_of_equal_cards():
+    game = game_with(draw=["Red 1"])
+    for _ in range(20):
+        held = list(map(make, ["Twopoints", "Red 4", "Twopoints", "Red 4"]))
+        hand = engine.Hand(held)
+        card, _ = game.auto_play_card(hand)
+        assert sum(card is hand_card for hand_card in held) == 1
+        assert all(card is not hand_card for hand_card in hand)
+        assert len(hand) == 3
+
+
+def test_player_chooses_a_wild_card_offer_of_the_discard_pile():
+    game = game_with(draw=["Joker"], discard=["Red 3", "Blue 6", "Red 3"])
+    discarded = list(game.discard_pile)
+    game.wild_card_logic()
+    chosen = game.top_four_cards[1]
+    assert chosen is discarded[0]
+    game.choose_wild_card(chosen)
+    assert list(game.discard_pile) == discarded[1:]
+
+
+def test_player_chooses_a_wild_card_offer():
+    game = game_with(draw=["Red 2", "Blue 5", "Green 7", "Red 1", "Yellow 9", "Red 6"])
+    game.wild_card_logic()
+    assert names(game.top_four_cards) == ["Yellow 9", "Green 7", "Red 6", "Blue 5"]
+    chosen = game.top_four_cards[2]
+    game.choose_wild_card(chosen)
+    assert game.player_played_card is chosen
+    assert game.last_player_wild_choice is chosen
+    assert game.player_used_wild
+    assert game.game_state == engine.WAITING_FOR_COMPUTER
+    assert names(game.top_four_cards) == ["Yellow 9", "Green 7", "Blue 5"]
+    assert names(game.draw_stack) == ["Red 2", "Blue 5", "Green 7", "Red 1", "Yellow 9"]
+
+
+def test_play_card_by_code():
+    game = game_with(draw=["Red 2", "Blue 5", "Green 7"])
+    hand = engine.Hand(map(make, ["Red 4", "Wild"]))
+    card, used_wild = game.play_card_by_code(hand, make("Red 4").code)
+    assert str(card) == "Red 4" and not used_wild
+    card, used_wild = game.play_card_by_code(hand, make("Wild").code, make("Blue 5").code)
+    assert str(card) == "Blue 5" and used_wild
+    assert names(game.draw_stack) == ["Red 2", "Green 7"]
+    with pytest.raises(ValueError):
+        game.play_card_by_code(engine.Hand([make("Red 1")]), make("Red 9").code)
+    with pytest.raises(ValueError):
+        game.play_card_by_code(engine.Hand([make("Wild")]), make("Wild").code, make("Blue 5").code)
+
+
+@pytest.mark.parametrize("player, computer, draw, player_score, computer_score, message", [
+    (["Red 5"], [], [], 5, 0, "Game ended with 1 leftover card."),
+    ([], ["Wild"], [], 0, 10, "Game ended with 1 leftover card."),
+    (["Watcher"], ["Red 3"], ["Blue 1"], 10, 3, "Game ended with 2 leftover cards."),
+    (["Twopoints"], ["Watcher"], [], 2, 10, "Game ended with 2 leftover cards."),
+    ([], [], [], 0, 0, "Game ended. No cards left to play or draw."),
+])
+def test_check_game_over_ends_the_game(player, computer, draw, player_score, computer_score, message):
+    game = game_with(player, computer, draw)
+    game.check_game_over()
+    assert game.game_state == engine.LAST_ROUND
+    assert game.result_message == message
+    assert (game.player_score, game.computer_score) == (player_score, computer_score)
+    assert len(game.player_hand) == len(game.computer_hand) == 0
+    assert len(game.discard_pile) == len(player) + len(computer)
+
+
+@pytest.mark.parametrize("player, computer, draw", [
+    (["Red 5"], ["Red 3"], []),
+    ([], [], ["Red 1"]),
+    (["Red 5", "Watcher"], ["Watcher"], []),
+])
+def test_check_game_over_lets_the_game_go_on(player, computer, draw):
+    game = game_with(player, computer, draw)
+    game.check_game_over()
+    assert game.game_state == engine.SELECTING_CARD
+    assert names(game.player_hand) == player and names(game.computer_hand) == computer
+
+
+def test_play_round_plays_one_round():
+    game = engine.GameEngine(seed=1)
+    game.new_game(11)
+    assert game.play_round()
+    assert game.rounds_played == 1
+    played = [game.player_played_card, game.computer_played_card]
+    assert all(any(card is discarded for discarded in game.discard_pile) for card in played)
+    assert game.played_card_message.startswith(f"Player played: {played[0]}")
+    assert not game.player_used_wild and game.last_player_wild_choice is None
+
+
+def test_play_round_ends_a_hand_of_watcher_cards():
+    game = game_with(["Watcher", "Watcher"], ["Red 2", "Red 3"], ["Red 1"])
+    assert not game.play_round()
+    assert game.game_state == engine.LAST_ROUND
+    assert (game.player_score, game.computer_score) == (20, 5)
+    assert not game.play_round()
+
+
+def round_points(player_card: engine.Card, computer_card: engine.Card, previous_player: engine.Card | None,
+                 previous_computer: engine.Card | None) -> tuple:
+    """Returns the points of a round of two regular cards according to the rules."""
+    if player_card.color != computer_card.color or player_card.number == computer_card.number:
+        return 0, 0
+    points = player_card.number + computer_card.number
+    if player_card.number > computer_card.number:
+        if previous_player is not None and previous_player.number == player_card.number:
+            points += 2
+        return points, 0
+    if previous_computer is not None and previous_computer.number == computer_card.number:
+        points += 2
+    return 0, points
+
+
+def check_cards_in_one_place(game: engine.GameEngine, lost: set) -> None:
+    """Checks that every card of the deck is in one hand or pile, the lost cards in none."""
+    places = Counter(map(id, [*game.player_hand, *game.computer_hand, *game.draw_stack, *game.discard_pile]))
+    assert set(places.values()) <= {1}
+    assert {id(card) for card in game.card_pool} - places.keys() == lost
+
+
+@pytest.mark.parametrize("deck_spec", [engine.DEFAULT_DECK, engine.DeckSpec(decks=3)])
+def test_seeded_games_follow_the_rules(deck_spec):
+    game = engine.GameEngine(deck_spec=deck_spec, seed=9)
+    checked = 0
+    for _ in range(100):
+        game.new_game()
+        # A card played against no card is not discarded and leaves the game
+        lost = set()
+        while True:
+            scores = (game.player_score, game.computer_score)
+            previous = (game.previous_player_card, game.previous_computer_card)
+            if not game.play_round():
+                break
+            player_card, computer_card = game.player_played_card, game.computer_played_card
+            if player_card is None or computer_card is None:
+                assert (game.player_score, game.computer_score) == scores
+                lost.update(id(card) for card in (player_card, computer_card) if card is not None)
+            elif (player_card.type_code == computer_card.type_code == engine.REGULAR and not game.watcher_message
+                    and game.game_state != engine.LAST_ROUND):
+                points = round_points(player_card, computer_card, *previous)
+                assert (game.player_score - scores[0], game.computer_score - scores[1]) == points
+                checked += 1
+            assert len(game.player_hand) <= 5 and len(game.computer_hand) <= 5
+            check_cards_in_one_place(game, lost)
+
+        assert game.game_state == engine.LAST_ROUND
+        assert len(game.player_hand) == len(game.computer_hand) == 0
+        assert game.rounds_played > 0
+        assert game.winner() == ("player" if game.player_score > game.computer_score else
+                                 "computer" if game.computer_score > game.player_score else "tie")
+    assert checked > 500
+
+
+def transcript(game: engine.GameEngine) -> list:
+    """Plays a game to its end and returns what happened in each round."""
+    rounds = []
+    while game.play_round():
+        rounds.append((str(game.player_played_card), str(game.computer_played_card), game.result_message,
+                       game.player_score, game.computer_score, names(game.draw_stack)))
+    return rounds
+
+
+def test_games_of_the_same_seed_are_identical(monkeypatch):
+    def global_random(*args, **kwargs):
+        raise AssertionError("the global random generator was used")
+
+    for name in ("random", "randint", "randrange", "choice", "choices", "sample", "shuffle", "getrandbits"):
+        monkeypatch.setattr(random, name, global_random)
+
+    deck_spec = engine.DeckSpec(decks=2)
+    first, second = (engine.GameEngine(deck_spec=deck_spec, seed=11) for _ in range(2))
+    for _ in range(10):
+        first.new_game()
+        second.new_game()
+        assert first.game_seed == second.game_seed
+        played = transcript(first)
+        assert played and transcript(second) == played
+
+        # The recorded seed of a game deals it again
+        replayed = engine.GameEngine(deck_spec=deck_spec)
+        replayed.new_game(first.game_seed)
+        assert transcript(replayed) == played
+
+
+def test_new_game_deals_the_same_cards_in_new_hands_and_piles():
+    game = engine.GameEngine(deck_spec=engine.DeckSpec(decks=2), seed=3)
+    game.new_game()
+    pool = game.card_pool
+    for _ in range(5):
+        game.play_round()
+    old = (game.player_hand, game.computer_hand, game.draw_stack, game.discard_pile)
+    old_cards = [list(cards) for cards in old]
+
+    game.new_game()
+    assert game.card_pool is pool
+    check_cards_in_one_place(game, set())
+    current = (game.player_hand, game.computer_hand, game.draw_stack, game.discard_pile)
+    assert not any(new is kept for new in current for kept in old)
+
+    # The old hands and piles are left as they were and no longer reach the game
+    game.check_game_over()
+    assert [list(cards) for cards in old] == old_cards
+    assert all(cards.listener is None for cards in old)
+    old[0].clear()
+    old[2].pop()
+    assert not game.game_over_pending
+    assert game.play_round()
+
+    game.deck_spec = engine.DEFAULT_DECK
+    game.new_game()
+    assert game.card_pool is not pool
+    check_cards_in_one_place(game, set())
@@ -0,0 +1,211 @@
+"""
+Tests of game snapshots: a restored game plays on like the saved one.
+"""
+
+import random
+
+import pytest
+
+import engine
+import snapshot
+
+
+def step(game: engine.GameEngine, rng: random.Random) -> bool:
+    """Advances a game by one state change, like the pygame front end does.
+
+    The player's cards are chosen with `rng`, the computer plays with the
+    engine's own generator.
+
+    Returns:
+        bool: False once the game is over.
+    """
+    state = game.game_state
+    if state in (engine.SELECTING_CARD, engine.WAITING_FOR_COMPUTER, engine.SHOWING_RESULT, engine.WILD_CARD):
+        game.check_game_over()
+        if game.game_state != state:
+            return True
+
+    if state == engine.SELECTING_CARD:
+        hand = game.player_hand
+        if not hand.playable_count():
+            game.end_with_leftovers()
+            return True
+        wild = hand.index_of_type(engine.WILD)
+        if wild >= 0 and rng.random() < 0.7:
+            index = wild
+        else:
+            index = rng.choice([i for i, card in enumerate(hand) if card.type_code != engine.WATCHER])
+        card = hand.pop(index)
+        if card.type_code == engine.WILD:
+            game.wild_card_logic()
+            game.discard_card(card)
+            game.game_state = engine.WILD_CARD
+        else:
+            game.player_played_card = card
+            game.game_state = engine.WAITING_FOR_COMPUTER
+    elif state == engine.WILD_CARD:
+        if game.top_four_cards:
+            game.choose_wild_card(rng.choice(game.top_four_cards))
+        else:
+            game.game_state = engine.WAITING_FOR_COMPUTER
+    elif state == engine.WAITING_FOR_COMPUTER:
+        game.computer_played_card, computer_used_wild = game.computer_play_card()
+        game.resolve_round(computer_used_wild, game.player_used_wild, game.last_player_wild_choice)
+        game.player_used_wild = False
+        game.last_player_wild_choice = None
+        if game.game_state != engine.GAME_OVER:
+            game.game_state = engine.SHOWING_RESULT
+    elif state == engine.SHOWING_RESULT:
+        game.game_state = engine.SELECTING_CARD
+        game.player_played_card = None
+        game.computer_played_card = None
+    elif state == engine.LAST_ROUND:
+        game.game_state = engine.GAME_OVER
+    return game.game_state != engine.GAME_OVER
+
+
+def codes(cards) -> list:
+    """Returns the codes of some cards, 0 for a missing card."""
+    return [snapshot.card_code(card) for card in cards]
+
+
+def state_of(game: engine.GameEngine) -> tuple:
+    """Returns everything that decides how a game goes on."""
+    return (
+        game.game_state, game.player_score, game.computer_score, game.leftover_points,
+        codes(game.player_hand), codes(game.computer_hand), codes(game.draw_stack), codes(game.discard_pile),
+        codes(game.top_four_cards), codes(game.draw_stack.largest_regular(4)),
+        codes(game.discard_pile.largest_regular(4)), game.draw_stack.regular_index.count,
+        codes(snapshot.history_cards(game.player_card_history)),
+        codes(snapshot.history_cards(game.computer_card_history)),
+        codes((game.player_played_card, game.computer_played_card, game.previous_player_card,
+               game.previous_computer_card, game.last_player_wild_choice)),
+        game.player_used_wild,
+    )
+
+
+def play_on(game: engine.GameEngine, rng: random.Random) -> list:
+    """Plays a game to its end and returns its state after every step."""
+    states = []
+    while step(game, rng):
+        states.append(state_of(game))
+    states.append(state_of(game))
+    return states
+
+
+@pytest.mark.parametrize("seed", range(9))
+def test_restored_game_plays_on_like_the_saved_one(seed):
+    deck_spec = engine.DeckSpec(decks=2) if seed % 3 == 2 else engine.DEFAULT_DECK
+    game = engine.GameEngine(deck_spec=deck_spec)
+    game.new_game(seed)
+    rng = random.Random(seed)
+
+    # Save the game before every step of the uninterrupted game
+    saved = []
+    states = []
+    playing = True
+    while playing:
+        saved.append((snapshot.snapshot_game(game), rng.getstate()))
+        playing = step(game, rng)
+        states.append(state_of(game))
+
+    restored = engine.GameEngine(deck_spec=deck_spec)
+    for i, (buffer, rng_state) in enumerate(saved):
+        assert snapshot.restore_game(restored, buffer) == len(buffer)
+        assert snapshot.snapshot_game(restored) == buffer
+        rng.setstate(rng_state)
+        assert play_on(restored, rng) == states[i:]
+
+
+def test_every_game_state_is_restored():
+    seen_states = set()
+    for seed in range(40):
+        game = engine.GameEngine()
+        game.new_game(seed)
+        rng = random.Random(seed)
+        playing = True
+        while playing:
+            playing = step(game, rng)
+            seen_states.add(game.game_state)
+            if game.game_state == engine.WILD_CARD:
+                restored = engine.GameEngine()
+                snapshot.restore_game(restored, snapshot.snapshot_game(game))
+                offered = restored.top_four_cards[0]
+                before = len(restored.draw_stack)
+                restored.choose_wild_card(offered)
+                in_draw_stack = game.draw_stack.has_regular()
+                assert len(restored.draw_stack) == before - in_draw_stack
+                assert all(card is not offered for card in restored.draw_stack)
+    assert seen_states >= {engine.SELECTING_CARD, engine.WAITING_FOR_COMPUTER, engine.SHOWING_RESULT,
+                           engine.WILD_CARD, engine.LAST_ROUND, engine.GAME_OVER}
+
+
+def test_game_over_is_checked_after_a_restore():
+    ended = engine.GameEngine(seed=1)
+    ended.new_game()
+    ended.player_hand = engine.Hand([engine.Card("Red", 5)])
+    ended.computer_hand = engine.Hand()
+    ended.draw_stack = engine.CardPile()
+    saved = snapshot.snapshot_game(ended)
+
+    game = engine.GameEngine(seed=2)
+    game.new_game()
+    game.check_game_over()
+    snapshot.restore_game(game, saved)
+    game.check_game_over()
+    assert game.game_state == engine.LAST_ROUND
+    assert game.player_score == 5
+
+    # The restored hands are watched
+    game.new_game()
+    game.check_game_over()
+    snapshot.restore_game(game, snapshot.snapshot_game(game))
+    game.check_game_over()
+    assert game.game_state == engine.SELECTING_CARD
+    game.draw_stack.clear()
+    game.player_hand.clear()
+    game.computer_hand.clear()
+    game.check_game_over()
+    assert game.game_state == engine.LAST_ROUND
+    assert game.result_message == "Game ended. No cards left to play or draw."
+
+
+def test_snapshot_library(tmp_path):
+    game = engine.GameEngine(seed=3)
+    saved = []
+
+    def positions():
+        for _ in range(20):
+            game.new_game()
+            while game.play_round():
+                saved.append(snapshot.snapshot_game(game))
+                yield saved[-1]
+
+    path = tmp_path / "scenarios.snap"
+    count = snapshot.write_library(str(path), positions())
+    assert count == len(saved)
+    restored = engine.GameEngine()
+    with snapshot.SnapshotLibrary(str(path)) as library:
+        assert len(library) == count
+        for i in (0, count // 2, count - 1):
+            view = library[i]
+            assert bytes(view) == saved[i]
+            view.release()
+            library.restore(restored, i)
+            assert snapshot.snapshot_game(restored) == saved[i]
+
+
+def test_snapshot_of_a_pile_larger_than_u16_positions():
+    deck_spec = engine.DeckSpec.generate(colors=40, max_number=50, decks=35)
+    game = engine.GameEngine(deck_spec=deck_spec, seed=6)
+    game.new_game()
+    for _ in range(5):
+        game.play_round()
+    assert len(game.draw_stack) > 0xFFFF
+
+    saved = snapshot.snapshot_game(game, include_rng=False)
+    restored = engine.GameEngine(deck_spec=deck_spec)
+    snapshot.restore_game(restored, saved)
+    assert snapshot.snapshot_game(restored, include_rng=False) == saved
+    assert codes(restored.draw_stack) == codes(game.draw_stack)
+    assert codes(restored.draw_stack.largest_regular(4)) == codes(game.draw_stack.largest_regular(4))
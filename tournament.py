@@ -0,0 +1,216 @@
+"""
+Monte Carlo tournament runner for the computer AI.
+
+Plays many seeded headless games of War of Colors across a pool of worker
+processes and prints aggregated win/tie rates, mean scores and special
+card frequencies. Every game has its own seed derived from the base seed
+and the game number, so results do not depend on the number of workers.
+
+Usage:
+    python tournament.py --games 100000 --seed 1 --workers 8
+    python tournament.py --games 1000 --decks 10 --colors 8 --max-number 20
+    python tournament.py --games 10000 --watcher-window 3
+    python tournament.py --games 200 --search-budget 0.02
+
+Libraries used:
+-argparse
+-concurrent.futures.ProcessPoolExecutor
+-os
+-time
+-collections.Counter
+-engine
+-ai
+
+Data structures used:
+-Dictionary
+-Counter
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import ai
+import engine
+
+#ID: 5672969
+# Deterministic seed of a single game
+def game_seed(base_seed: int, index: int) -> int:
+    """Returns the seed of one game of a tournament.
+
+    Args:
+        base_seed (int): The seed of the whole tournament.
+        index (int): The number of the game inside the tournament.
+
+    Returns:
+        int: The seed used to play that game.
+    """
+    return (base_seed << 32) | index
+
+# Empty tournament statistics
+def new_stats() -> dict:
+    """Returns an empty statistics dictionary.
+
+    Returns:
+        dict: Counters for games, wins, ties, scores, rounds and special cards.
+    """
+    return {
+        "games": 0,
+        "player_wins": 0,
+        "computer_wins": 0,
+        "ties": 0,
+        "player_score": 0,
+        "computer_score": 0,
+        "rounds": 0,
+        "special_cards": Counter(),
+    }
+
+# Combine statistics of two batches
+def merge_stats(total: dict, part: dict) -> dict:
+    """Adds the statistics of one batch of games to the running total.
+
+    Args:
+        total (dict): The running total, updated in place.
+        part (dict): The statistics of one batch.
+
+    Returns:
+        dict: The updated running total.
+    """
+    for key, value in part.items():
+        total[key] += value
+    return total
+
+# Play a batch of games inside one worker
+def play_batch(base_seed: int, start: int, stop: int, deck_spec: engine.DeckSpec = engine.DEFAULT_DECK,
+               watcher_window: int = 2, search_budget: float | None = None) -> dict:
+    """Plays the games with numbers start to stop - 1 and returns their statistics.
+
+    Args:
+        base_seed (int): The seed of the whole tournament.
+        start (int): The number of the first game of the batch.
+        stop (int): The number after the last game of the batch.
+        deck_spec (engine.DeckSpec): The cards that make up the deck.
+        watcher_window (int): How many cards the Watcher cards look back.
+        search_budget (float | None): Seconds per move of a `SearchAI` computer,
+            the computer plays randomly if None.
+
+    Returns:
+        dict: The statistics of the batch, see `new_stats`.
+    """
+    stats = new_stats()
+    game = engine.GameEngine(deck_spec=deck_spec, watcher_window=watcher_window)
+    if search_budget is not None:
+        game.computer_strategy = ai.SearchAI(time_budget=search_budget)
+
+    for index in range(start, stop):
+        engine.simulate_game(game, seed=game_seed(base_seed, index))
+
+        winner = game.winner()
+        stats["games"] += 1
+        if winner == "player":
+            stats["player_wins"] += 1
+        elif winner == "computer":
+            stats["computer_wins"] += 1
+        else:
+            stats["ties"] += 1
+        stats["player_score"] += game.player_score
+        stats["computer_score"] += game.computer_score
+        stats["rounds"] += game.rounds_played
+        stats["special_cards"].update(game.special_card_counts)
+
+    return stats
+
+# Run the whole tournament
+def run_tournament(games: int, base_seed: int = 0, workers: int | None = None,
+                   batch_size: int | None = None, deck_spec: engine.DeckSpec = engine.DEFAULT_DECK,
+                   watcher_window: int = 2, search_budget: float | None = None) -> dict:
+    """Plays a tournament of seeded games, spread over a pool of worker processes.
+
+    Args:
+        games (int): The number of games to play.
+        base_seed (int): The seed of the whole tournament.
+        workers (int | None): The number of worker processes, one per CPU core if None.
+            With one worker the games are played in the current process.
+        batch_size (int | None): The number of games sent to a worker at once.
+        deck_spec (engine.DeckSpec): The cards that make up the deck.
+        watcher_window (int): How many cards the Watcher cards look back.
+        search_budget (float | None): Seconds per move of a `SearchAI` computer,
+            the computer plays randomly if None.
+
+    Returns:
+        dict: The aggregated statistics, see `new_stats`.
+    """
+    workers = workers or os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = max(1, min(2000, games // (workers * 8) or 1))
+
+    total = new_stats()
+    if workers == 1:
+        return merge_stats(total, play_batch(base_seed, 0, games, deck_spec, watcher_window, search_budget))
+
+    starts = range(0, games, batch_size)
+    stops = [min(start + batch_size, games) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for part in executor.map(play_batch, [base_seed] * len(starts), starts, stops,
+                                 [deck_spec] * len(starts), [watcher_window] * len(starts),
+                                 [search_budget] * len(starts)):
+            merge_stats(total, part)
+    return total
+
+# Build a text report
+def format_report(stats: dict, elapsed: float | None = None) -> str:
+    """Formats tournament statistics as a text report.
+
+    Args:
+        stats (dict): The aggregated statistics, see `new_stats`.
+        elapsed (float | None): The wall clock time of the tournament in seconds.
+
+    Returns:
+        str: The report.
+    """
+    games = stats["games"] or 1
+    lines = [
+        f"Games played:        {stats['games']}",
+        f"Player win rate:     {stats['player_wins'] / games:.2%}",
+        f"Computer win rate:   {stats['computer_wins'] / games:.2%}",
+        f"Tie rate:            {stats['ties'] / games:.2%}",
+        f"Mean player score:   {stats['player_score'] / games:.2f}",
+        f"Mean computer score: {stats['computer_score'] / games:.2f}",
+        f"Mean rounds:         {stats['rounds'] / games:.2f}",
+        "Special cards per game:",
+    ]
+    for card_type, count in sorted(stats["special_cards"].items()):
+        lines.append(f"  {card_type:<12} {count / games:.3f}")
+    if elapsed is not None:
+        lines.append(f"Elapsed: {elapsed:.2f} s ({stats['games'] / max(elapsed, 1e-9):.0f} games/s)")
+    return "\n".join(lines)
+#ID: 5672969
+
+def main() -> None:
+    """Parses the command line and runs the tournament."""
+    parser = argparse.ArgumentParser(description="Play seeded headless War of Colors games in parallel.")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the tournament")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--batch-size", type=int, default=None, help="games sent to a worker at once")
+    parser.add_argument("--decks", type=int, default=1, help="decks shuffled together")
+    parser.add_argument("--colors", type=int, default=4, help="colors of regular cards")
+    parser.add_argument("--max-number", type=int, default=10, help="largest regular card number")
+    parser.add_argument("--watcher-window", type=int, default=2, help="cards a Watcher card looks back")
+    parser.add_argument("--search-budget", type=float, default=None,
+                        help="seconds per move of a search AI computer (default: random computer)")
+    args = parser.parse_args()
+
+    try:
+        deck_spec = engine.DeckSpec.generate(args.colors, args.max_number, args.decks)
+    except ValueError as error:
+        parser.error(str(error))
+    start_time = time.perf_counter()
+    stats = run_tournament(args.games, args.seed, args.workers, args.batch_size, deck_spec, args.watcher_window,
+                           args.search_budget)
+    print(format_report(stats, time.perf_counter() - start_time))
+
+if __name__ == "__main__":
+    main()